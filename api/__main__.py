@@ -1,13 +1,23 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from api.routes import router
+from graph.config import close_async_driver
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    await close_async_driver()
 
 
 app = FastAPI(
     title='Research Agent API',
     description='API for research agent with chat capabilities',
-    version='1.0.0'
+    version='1.0.0',
+    lifespan=lifespan
 )
 
 app.add_middleware(
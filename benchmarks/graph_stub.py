@@ -0,0 +1,92 @@
+"""
+In-memory stand-in for the Neo4j driver that records every query.
+
+Implements the subset of the driver API used by `graph.*.operations`
+(`driver.session()`, `execute_write`/`execute_read`, `tx.run`, and result
+`single`/`consume`/`data`/iteration). Nothing is stored; queries return no
+records, so only write paths produce meaningful numbers.
+"""
+from collections import Counter
+from dataclasses import dataclass, field
+
+
+@dataclass
+class QueryStats:
+    """Counters accumulated by a RecordingDriver."""
+    sessions: int = 0
+    transactions: int = 0
+    queries: int = 0
+    rows: int = 0
+    by_query: Counter = field(default_factory=Counter)
+
+    def reset(self) -> None:
+        self.sessions = self.transactions = self.queries = self.rows = 0
+        self.by_query.clear()
+
+
+class _Result:
+    def __iter__(self):
+        return iter(())
+
+    def single(self):
+        return None
+
+    def consume(self):
+        return None
+
+    def data(self) -> list:
+        return []
+
+
+class _Transaction:
+    def __init__(self, stats: QueryStats):
+        self._stats = stats
+
+    def run(self, query: str, parameters: dict | None = None, **kwargs) -> _Result:
+        params = {**(parameters or {}), **kwargs}
+        self._stats.queries += 1
+        # UNWIND batches pass their rows as $rows.
+        self._stats.rows += len(params.get("rows") or ())
+        self._stats.by_query[" ".join(query.split())[:80]] += 1
+        return _Result()
+
+
+class _Session:
+    def __init__(self, stats: QueryStats):
+        self._stats = stats
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        return None
+
+    def close(self) -> None:
+        return None
+
+    def execute_write(self, fn, *args, **kwargs):
+        self._stats.transactions += 1
+        return fn(_Transaction(self._stats), *args, **kwargs)
+
+    execute_read = execute_write
+
+    def run(self, query: str, parameters: dict | None = None, **kwargs) -> _Result:
+        self._stats.transactions += 1
+        return _Transaction(self._stats).run(query, parameters, **kwargs)
+
+
+class RecordingDriver:
+    """Drop-in for `neo4j.Driver` that counts sessions, transactions and queries."""
+
+    def __init__(self):
+        self.stats = QueryStats()
+
+    def session(self, **kwargs) -> _Session:
+        self.stats.sessions += 1
+        return _Session(self.stats)
+
+    def verify_connectivity(self) -> None:
+        return None
+
+    def close(self) -> None:
+        return None
@@ -0,0 +1,153 @@
+"""
+Benchmark the ingestion hot path on a synthetic corpus, offline.
+
+Generates arXiv-like source trees, then times each stage per paper:
+
+    read    read_paper (flatten \\input/\\include tree)
+    parse   parse_paper without the parse cache (includes read)
+    tree    paper_tree (row building and citation resolution)
+    write   insert_paper_tree against a recording in-memory driver
+
+and reports latency percentiles per stage, end-to-end papers/sec, peak RSS
+and graph round-trips per paper.
+
+Usage:
+    python -m benchmarks.ingest [--papers N] [--sections N] [--subsections N]
+        [--math-density F] [--citations N] [--fanout N] [--incremental]
+"""
+import argparse
+import resource
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+from pathlib import Path
+
+from benchmarks.graph_stub import RecordingDriver
+from benchmarks.synthetic import synthetic_source_tree
+from graph.insert import operations
+from ingestion.arxiv.parse import parse_paper
+from ingestion.arxiv.pipeline import paper_tree
+from ingestion.arxiv.read import read_paper
+
+STAGES = ("read", "parse", "tree", "write")
+
+
+def percentiles(samples: list[float]) -> dict:
+    """p50/p90/p99/max of `samples`, in milliseconds."""
+    if len(samples) < 2:
+        value = samples[0] * 1000 if samples else 0.0
+        return {"p50": value, "p90": value, "p99": value, "max": value}
+    cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    return {
+        "p50": cuts[49] * 1000,
+        "p90": cuts[89] * 1000,
+        "p99": cuts[98] * 1000,
+        "max": max(samples) * 1000,
+    }
+
+
+def peak_rss_mib() -> float:
+    """Peak resident set size of this process in MiB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux and bytes on macOS.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def generate_corpus(directory: Path, papers: int, fanout: int, **kwargs) -> list[Path]:
+    """Write `papers` synthetic source trees with distinct seeds under `directory`."""
+    return [
+        synthetic_source_tree(directory / f"2401.{i:05d}", fanout=fanout, seed=i, **kwargs)
+        for i in range(papers)
+    ]
+
+
+def run(paths: list[Path], incremental: bool = False) -> dict:
+    """Time every stage for each paper in `paths` and collect driver counters."""
+    driver = RecordingDriver()
+    operations.driver = driver
+    write = operations.update_paper_tree if incremental else operations.insert_paper_tree
+    timings = {stage: [] for stage in STAGES}
+    sections = 0
+
+    start = time.perf_counter()
+    for path in paths:
+        t0 = time.perf_counter()
+        read_paper(str(path))
+        t1 = time.perf_counter()
+        paper = parse_paper(str(path), use_cache=False)
+        t2 = time.perf_counter()
+        tree = paper_tree(path.name, paper)
+        t3 = time.perf_counter()
+        write(**tree)
+        t4 = time.perf_counter()
+        for stage, seconds in zip(STAGES, (t1 - t0, t2 - t1, t3 - t2, t4 - t3), strict=True):
+            timings[stage].append(seconds)
+        sections += len(tree["sections"])
+    elapsed = time.perf_counter() - start
+
+    return {
+        "papers": len(paths),
+        "sections": sections,
+        "seconds": elapsed,
+        # `read` is repeated inside `parse`, so it is left out of the end-to-end rate.
+        "papers_per_second": len(paths) / (elapsed - sum(timings["read"])) if paths else 0.0,
+        "stages": {stage: percentiles(samples) for stage, samples in timings.items()},
+        "peak_rss_mib": peak_rss_mib(),
+        "transactions": driver.stats.transactions,
+        "queries": driver.stats.queries,
+        "rows": driver.stats.rows,
+        "by_query": driver.stats.by_query.most_common(),
+    }
+
+
+def report(result: dict) -> None:
+    papers = result["papers"] or 1
+    print(
+        f"{result['papers']} papers, {result['sections']} sections in {result['seconds']:.2f}s "
+        f"({result['papers_per_second']:.1f} papers/sec), peak RSS {result['peak_rss_mib']:.0f} MiB"
+    )
+    print(f"{'stage':<8} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for stage, p in result["stages"].items():
+        print(f"{stage:<8} {p['p50']:>9.2f} {p['p90']:>9.2f} {p['p99']:>9.2f} {p['max']:>9.2f}")
+    print(
+        f"graph: {result['transactions'] / papers:.1f} transactions, "
+        f"{result['queries'] / papers:.1f} queries, {result['rows'] / papers:.0f} rows per paper"
+    )
+    for query, count in result["by_query"]:
+        print(f"  {count:>7}  {query}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--papers", type=int, default=50)
+    parser.add_argument("--sections", type=int, default=10)
+    parser.add_argument("--subsections", type=int, default=3)
+    parser.add_argument("--math-density", type=float, default=0.2)
+    parser.add_argument("--citations", type=int, default=40)
+    parser.add_argument("--fanout", type=int, default=4, help="\\input files per paper")
+    parser.add_argument("--incremental", action="store_true", help="time update_paper_tree instead")
+    parser.add_argument("--keep", help="write the corpus here and keep it")
+    args = parser.parse_args()
+
+    directory = Path(args.keep or tempfile.mkdtemp(prefix="bench_corpus_"))
+    try:
+        paths = generate_corpus(
+            directory,
+            args.papers,
+            args.fanout,
+            sections=args.sections,
+            subsections=args.subsections,
+            math_density=args.math_density,
+            citations=args.citations,
+        )
+        report(run(paths, incremental=args.incremental))
+    finally:
+        if not args.keep:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark the single-pass scanner parser against the legacy regex cascade.
+
+Usage:
+    python -m benchmarks.parse_scanner [--sections N] [--repeat N] [file.tex ...]
+
+Without files, synthetic papers of increasing size are generated.
+
+`legacy` and `scanner` time the whole `parse_texts`. The scanner version
+also extracts, normalizes and hashes every formula and parses the
+bibliography, which the legacy parser never did, so their ratio understates
+the gain. `scan` times `scan_latex` alone: the single pass that replaced the
+legacy parser's full-text regex sweeps.
+"""
+import argparse
+import statistics
+import time
+
+from pathlib import Path
+
+from benchmarks import legacy_parse
+from benchmarks.synthetic import synthetic_paper
+from ingestion.arxiv import parse
+from ingestion.arxiv.scanner import scan_latex
+
+
+def _time(fn, texts: list[str], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(texts)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def run(label: str, text: str, repeat: int) -> None:
+    legacy = _time(legacy_parse.parse_texts, [text], repeat)
+    scanner = _time(parse.parse_texts, [text], repeat)
+    scan = _time(lambda texts: [scan_latex(t) for t in texts], [text], repeat)
+    sections = (
+        legacy_parse.parse_texts([text])["num_sections"],
+        parse.parse_texts([text])["num_sections"],
+    )
+    print(
+        f"{label:<28} {len(text) / 1024:>9.0f} KiB  legacy {legacy * 1000:>9.1f} ms  "
+        f"scanner {scanner * 1000:>8.1f} ms  speedup {legacy / scanner:>5.1f}x  "
+        f"scan {scan * 1000:>8.1f} ms  "
+        f"sections {sections[0]}/{sections[1]}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("files", nargs="*", type=Path)
+    parser.add_argument("--sections", type=int, nargs="+", default=[10, 40, 160])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.files:
+        for path in args.files:
+            run(path.name, path.read_text(encoding="utf-8", errors="replace"), args.repeat)
+        return
+    for sections in args.sections:
+        run(f"synthetic {sections} sections", synthetic_paper(sections=sections), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
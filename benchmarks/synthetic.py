@@ -0,0 +1,120 @@
+"""
+Generators for synthetic arXiv-like LaTeX sources used by the benchmarks.
+"""
+import random
+
+from pathlib import Path
+
+WORDS = (
+    "model data learning graph network attention training result method "
+    "loss optimization section proof theorem bound sample error layer"
+).split()
+
+
+def _sentence(rng: random.Random, words: int = 14) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def _paragraph(rng: random.Random, sentences: int, math_density: float, citations: int) -> str:
+    parts = []
+    for i in range(sentences):
+        parts.append(_sentence(rng))
+        if rng.random() < math_density:
+            parts.append(f"We have $x_{i} = \\alpha^{{{i}}} + \\beta$.")
+        if citations and rng.random() < 0.3:
+            keys = ",".join(f"ref{rng.randrange(citations)}" for _ in range(rng.randint(1, 3)))
+            parts.append(f"\\citep{{{keys}}}")
+    if rng.random() < math_density:
+        parts.append(
+            "\\begin{equation}\\label{eq:%d}\n  f(x) = \\sum_{k=1}^{n} w_k x^k\n\\end{equation}"
+            % rng.randrange(10**6)
+        )
+    return " ".join(parts)
+
+
+def synthetic_body(
+    sections: int = 10,
+    subsections: int = 3,
+    paragraphs: int = 4,
+    sentences: int = 6,
+    math_density: float = 0.2,
+    citations: int = 40,
+    seed: int = 0,
+) -> list[str]:
+    """Generate section sources, one string per top-level section."""
+    rng = random.Random(seed)
+    out = []
+    for s in range(sections):
+        chunks = [f"\\section{{Section {{\\em {s}}} {rng.choice(WORDS)}}}\\label{{sec:{s}}}"]
+        chunks += [_paragraph(rng, sentences, math_density, citations) for _ in range(paragraphs)]
+        for sub in range(subsections):
+            chunks.append(f"\\subsection{{Part {s}.{sub}}}")
+            chunks += [_paragraph(rng, sentences, math_density, citations) for _ in range(paragraphs)]
+        out.append("\n\n".join(chunks))
+    return out
+
+
+def _document(body: str) -> str:
+    return (
+        "\\documentclass{article}\n"
+        "\\title{A {Synthetic} Study of \\textbf{Things}}\n"
+        "\\author{Ada Lovelace, Alan Turing}\n"
+        "\\begin{document}\n\\maketitle\n"
+        "\\begin{abstract}\nWe study synthetic papers.\n\\end{abstract}\n\n"
+        f"{body}\n\n\\bibliography{{refs}}\n\\end{{document}}\n"
+    )
+
+
+def synthetic_paper(**kwargs) -> str:
+    """Generate a single-file LaTeX paper. Accepts `synthetic_body` arguments."""
+    return _document("\n\n".join(synthetic_body(**kwargs)))
+
+
+def synthetic_bib(citations: int) -> str:
+    """A BibTeX file defining `ref0` .. `ref{citations - 1}`."""
+    entries = []
+    for i in range(citations):
+        entries.append(
+            f"@article{{ref{i},\n"
+            f"  title = {{On the {WORDS[i % len(WORDS)]} of synthetic paper {i}}},\n"
+            f"  author = {{Doe, Jane}},\n"
+            + (f"  eprint = {{2101.{i:05d}}},\n" if i % 3 == 0 else "")
+            + (f"  doi = {{10.1000/synthetic.{i}}},\n" if i % 3 == 1 else "")
+            + "  year = {2021}\n}\n"
+        )
+    return "\n".join(entries)
+
+
+def synthetic_source_tree(directory: str | Path, fanout: int = 1, **kwargs) -> Path:
+    """
+    Write an extracted arXiv-like source tree to `directory`.
+
+    With `fanout` > 1 the sections are split across that many files under
+    `sections/` pulled in from main.tex with `\\input`. A `refs.bib` with
+    every citation key used in the body is written alongside.
+
+    Args:
+        directory: Destination, created if missing
+        fanout: Number of `\\input` files the body is split into
+        kwargs: `synthetic_body` arguments
+
+    Returns:
+        The directory path
+    """
+    root = Path(directory)
+    root.mkdir(parents=True, exist_ok=True)
+    sections = synthetic_body(**kwargs)
+    if fanout <= 1:
+        body = "\n\n".join(sections)
+    else:
+        (root / "sections").mkdir(exist_ok=True)
+        per_file = -(-len(sections) // fanout)
+        inputs = []
+        for part in range(fanout):
+            chunk = sections[part * per_file:(part + 1) * per_file]
+            (root / "sections" / f"part{part}.tex").write_text("\n\n".join(chunk), encoding="utf-8")
+            inputs.append(f"\\input{{sections/part{part}}}")
+        body = "\n".join(inputs)
+    (root / "main.tex").write_text(_document(body), encoding="utf-8")
+    (root / "refs.bib").write_text(synthetic_bib(kwargs.get("citations", 40)), encoding="utf-8")
+    return root
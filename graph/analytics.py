@@ -0,0 +1,311 @@
+"""
+Citation-graph analytics, precomputed and written back to the graph.
+
+    PAPER.references        citation ids cited anywhere in the paper
+    PAPER.reference_count   size of references
+    PAPER.cited_by_count    ingested papers citing this paper
+    PAPER.influence         PageRank of the paper (mean 1.0 over all works)
+    CITATION.cited_by_count ingested papers citing this work
+    CITATION.influence      PageRank of the work
+    (:CITATION) - [:CO_CITED {count, score}] -> (:CITATION)
+                            works cited together by at least
+                            MIN_CO_CITATIONS papers; stored once per pair,
+                            from the smaller to the larger citation id, with
+                            score = count / sqrt(cited_by_a * cited_by_b)
+
+A paper and the CITATION for the same arXiv id (`arxiv:<id>`) are one work in
+the citation graph.
+
+Runs are incremental: only papers whose `ingested_at` is newer than the last
+run, recorded on `(:ANALYTICS_RUN {name: "citations"})`, are re-read, and
+counts and co-citations are recomputed only for the works those papers cite
+now or cited before. PageRank is global, so it is recomputed from the stored
+`references` lists whenever any paper changed, and only nodes whose score
+moved by more than INFLUENCE_TOLERANCE are written. All writes go out in
+chunked transactions of `chunk_size` rows.
+
+Usage:
+    python -m graph.analytics [--full] [--chunk-size N]
+"""
+import argparse
+import itertools
+import os
+import sys
+import time
+
+from collections import Counter, defaultdict
+from collections.abc import Iterable, Iterator
+
+from graph.config import driver as default_driver
+
+ANALYTICS_CHUNK_SIZE = int(os.getenv("ANALYTICS_CHUNK_SIZE", "1000"))
+MIN_CO_CITATIONS = int(os.getenv("ANALYTICS_MIN_CO_CITATIONS", "2"))
+DAMPING = 0.85
+INFLUENCE_TOLERANCE = 1e-3
+
+LAST_RUN_QUERY = """
+OPTIONAL MATCH (r:ANALYTICS_RUN {name: 'citations'})
+RETURN r.last_run AS last_run, datetime() AS now
+"""
+RECORD_RUN_QUERY = """
+MERGE (r:ANALYTICS_RUN {name: 'citations'})
+SET r.last_run = $started
+"""
+ALL_PAPERS_QUERY = """
+MATCH (p:PAPER)
+RETURN p.arxiv_id AS arxiv_id
+"""
+CHANGED_PAPERS_QUERY = """
+MATCH (p:PAPER)
+WHERE p.ingested_at > $since
+RETURN p.arxiv_id AS arxiv_id
+"""
+PAPER_REFERENCES_QUERY = """
+UNWIND $ids AS id
+MATCH (p:PAPER {arxiv_id: id})
+OPTIONAL MATCH (s:SECTION {paper_id: id})<-[:CITED_IN]-(c:CITATION)
+RETURN id, p.references AS previous, collect(DISTINCT c.citation_id) AS references
+"""
+WRITE_REFERENCES_QUERY = """
+UNWIND $rows AS row
+MATCH (p:PAPER {arxiv_id: row.id})
+SET p.references = row.references,
+    p.reference_count = size(row.references),
+    p.cited_by_count = coalesce(p.cited_by_count, 0)
+"""
+CITING_PAPERS_QUERY = """
+UNWIND $ids AS id
+MATCH (c:CITATION {citation_id: id})
+OPTIONAL MATCH (c)-[:CITED_IN]->(s:SECTION)
+RETURN id, collect(DISTINCT s.paper_id) AS papers
+"""
+WRITE_CITED_BY_QUERY = """
+UNWIND $rows AS row
+MATCH (c:CITATION {citation_id: row.id})
+SET c.cited_by_count = row.count
+WITH c, row
+MATCH (p:PAPER {arxiv_id: c.arxiv_id})
+SET p.cited_by_count = row.count
+"""
+# Affected works are labelled for the duration of a run so the co-citation
+# delete can test "b is affected" per edge without shipping the whole set.
+CLEAR_AFFECTED_QUERY = """
+MATCH (c:ANALYTICS_AFFECTED)
+REMOVE c:ANALYTICS_AFFECTED
+"""
+MARK_AFFECTED_QUERY = """
+UNWIND $ids AS id
+MATCH (c:CITATION {citation_id: id})
+SET c:ANALYTICS_AFFECTED
+"""
+DELETE_CO_CITED_QUERY = """
+UNWIND $ids AS id
+MATCH (a:CITATION {citation_id: id})-[r:CO_CITED]->(b:ANALYTICS_AFFECTED)
+DELETE r
+"""
+WRITE_CO_CITED_QUERY = """
+UNWIND $rows AS row
+MATCH (a:CITATION {citation_id: row.a})
+MATCH (b:CITATION {citation_id: row.b})
+MERGE (a)-[r:CO_CITED]->(b)
+SET r.count = row.count
+"""
+SCORE_CO_CITED_QUERY = """
+UNWIND $ids AS id
+MATCH (a:CITATION {citation_id: id})-[r:CO_CITED]-(b:CITATION)
+SET r.score = r.count / sqrt(toFloat(a.cited_by_count * b.cited_by_count))
+"""
+ALL_REFERENCES_QUERY = """
+MATCH (p:PAPER)
+WHERE p.references IS NOT NULL
+RETURN p.arxiv_id AS arxiv_id, p.references AS references
+"""
+WRITE_CITATION_INFLUENCE_QUERY = """
+UNWIND $rows AS row
+MATCH (c:CITATION {citation_id: row.id})
+WITH c, row
+WHERE c.influence IS NULL OR abs(c.influence - row.influence) > $tolerance
+SET c.influence = row.influence
+"""
+WRITE_PAPER_INFLUENCE_QUERY = """
+UNWIND $rows AS row
+MATCH (p:PAPER {arxiv_id: row.id})
+WITH p, row
+WHERE p.influence IS NULL OR abs(p.influence - row.influence) > $tolerance
+SET p.influence = row.influence
+"""
+
+
+def paper_work_id(arxiv_id: str) -> str:
+    """Citation id under which other papers cite an ingested paper."""
+    return f"arxiv:{arxiv_id}"
+
+
+def pagerank(edges: dict[str, list[str]], damping: float = DAMPING,
+             tolerance: float = 1e-6, max_iterations: int = 100) -> dict[str, float]:
+    """
+    PageRank over a citing -> cited adjacency list.
+
+    Rank held by works without outgoing edges is spread evenly over all
+    works. Scores are scaled so their mean is 1.0, which keeps them
+    comparable as the graph grows.
+    """
+    out = {source: [t for t in dict.fromkeys(targets) if t != source] for source, targets in edges.items()}
+    nodes = set(out).union(*out.values()) if out else set()
+    n = len(nodes)
+    if not n:
+        return {}
+    rank = dict.fromkeys(nodes, 1 / n)
+    for _ in range(max_iterations):
+        dangling = sum(rank[node] for node in nodes if not out.get(node))
+        new = dict.fromkeys(nodes, (1 - damping) / n + damping * dangling / n)
+        for source, targets in out.items():
+            if targets:
+                share = damping * rank[source] / len(targets)
+                for target in targets:
+                    new[target] += share
+        delta = sum(abs(new[node] - rank[node]) for node in nodes)
+        rank = new
+        if delta < tolerance:
+            break
+    return {node: score * n for node, score in rank.items()}
+
+
+def co_citation_counts(citing: dict[str, list[str]], min_count: int = MIN_CO_CITATIONS) -> Iterator[tuple[tuple, int]]:
+    """
+    Count papers citing each pair of works.
+
+    Pairs are counted one work at a time, so only the counts for the
+    current work are held in memory rather than every pair in the corpus.
+
+    Args:
+        citing: work id -> ids of the papers citing it
+
+    Yields:
+        ((a, b), count) with a < b, for pairs cited together at least `min_count` times
+    """
+    cited_by_paper = defaultdict(set)
+    for work, papers in citing.items():
+        for paper in papers:
+            cited_by_paper[paper].add(work)
+    for work in sorted(citing):
+        counts = Counter()
+        for paper in set(citing[work]):
+            counts.update(other for other in cited_by_paper[paper] if other > work)
+        for other, count in sorted(counts.items()):
+            if count >= min_count:
+                yield (work, other), count
+
+
+def _chunks(items: Iterable, size: int) -> Iterator[list]:
+    for chunk in itertools.batched(items, size):
+        yield list(chunk)
+
+
+def _read(tx, query: str, **params) -> list[dict]:
+    return [record.data() for record in tx.run(query, **params)]
+
+
+def _write(tx, query: str, **params) -> None:
+    tx.run(query, **params).consume()
+
+
+def _read_chunked(session, query: str, ids: list, chunk_size: int) -> list[dict]:
+    records = []
+    for chunk in _chunks(ids, chunk_size):
+        records.extend(session.execute_read(_read, query, ids=chunk))
+    return records
+
+
+def _write_chunked(session, query: str, chunk_size: int, rows: Iterable = None, ids: list = None,
+                   **params) -> int:
+    key, items = ("rows", rows) if rows is not None else ("ids", ids)
+    written = 0
+    for chunk in _chunks(items, chunk_size):
+        session.execute_write(_write, query, **{key: chunk}, **params)
+        written += len(chunk)
+    return written
+
+
+def run_citation_analytics(driver=None, full: bool = False, chunk_size: int = ANALYTICS_CHUNK_SIZE) -> dict:
+    """
+    Recompute citation analytics for papers ingested since the last run.
+
+    Args:
+        full: Ignore the last run and recompute for every paper
+        chunk_size: Rows per write transaction
+
+    Returns:
+        {"papers": n, "works": n, "co_cited": n, "influence": n} counts of
+        what was recomputed
+    """
+    driver = driver or default_driver
+    with driver.session() as session:
+        run = session.execute_read(_read, LAST_RUN_QUERY)[0]
+        started, since = run["now"], None if full else run["last_run"]
+        if since is None:
+            papers = session.execute_read(_read, ALL_PAPERS_QUERY)
+        else:
+            papers = session.execute_read(_read, CHANGED_PAPERS_QUERY, since=since)
+        changed = [r["arxiv_id"] for r in papers]
+        if not changed:
+            session.execute_write(_write, RECORD_RUN_QUERY, started=started)
+            return {"papers": 0, "works": 0, "co_cited": 0, "influence": 0}
+
+        # References: works cited by the changed papers now or before.
+        references = _read_chunked(session, PAPER_REFERENCES_QUERY, changed, chunk_size)
+        _write_chunked(session, WRITE_REFERENCES_QUERY, chunk_size,
+                       rows=[{"id": r["id"], "references": r["references"]} for r in references])
+        affected = {paper_work_id(arxiv_id) for arxiv_id in changed}
+        for r in references:
+            affected.update(r["references"], r["previous"] or [])
+        affected = sorted(affected)
+
+        # Citation counts.
+        citing = {r["id"]: r["papers"] for r in _read_chunked(session, CITING_PAPERS_QUERY, affected, chunk_size)}
+        _write_chunked(session, WRITE_CITED_BY_QUERY, chunk_size,
+                       rows=[{"id": work, "count": len(papers)} for work, papers in citing.items()])
+
+        # Co-citation: a pair's count only changes when both works are affected.
+        # Labels left by an interrupted run are cleared first.
+        session.execute_write(_write, CLEAR_AFFECTED_QUERY)
+        _write_chunked(session, MARK_AFFECTED_QUERY, chunk_size, ids=affected)
+        _write_chunked(session, DELETE_CO_CITED_QUERY, chunk_size, ids=affected)
+        session.execute_write(_write, CLEAR_AFFECTED_QUERY)
+        co_cited = _write_chunked(session, WRITE_CO_CITED_QUERY, chunk_size, rows=(
+            {"a": a, "b": b, "count": count} for (a, b), count in co_citation_counts(citing)
+        ))
+        _write_chunked(session, SCORE_CO_CITED_QUERY, chunk_size, ids=affected)
+
+        # Influence.
+        edges = {
+            paper_work_id(r["arxiv_id"]): r["references"]
+            for r in session.execute_read(_read, ALL_REFERENCES_QUERY)
+        }
+        scores = pagerank(edges)
+        rows = [{"id": work, "influence": score} for work, score in scores.items()]
+        _write_chunked(session, WRITE_CITATION_INFLUENCE_QUERY, chunk_size, rows=rows,
+                       tolerance=INFLUENCE_TOLERANCE)
+        _write_chunked(session, WRITE_PAPER_INFLUENCE_QUERY, chunk_size, tolerance=INFLUENCE_TOLERANCE, rows=[
+            {"id": work.removeprefix("arxiv:"), "influence": scores[work]} for work in edges
+        ])
+
+        session.execute_write(_write, RECORD_RUN_QUERY, started=started)
+    return {"papers": len(changed), "works": len(affected), "co_cited": co_cited, "influence": len(scores)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Recompute citation analytics in the graph.")
+    parser.add_argument("--full", action="store_true", help="recompute for every paper, not just new ones")
+    parser.add_argument("--chunk-size", type=int, default=ANALYTICS_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    counts = run_citation_analytics(full=args.full, chunk_size=args.chunk_size)
+    elapsed = time.perf_counter() - start
+    print(", ".join(f"{count} {name}" for name, count in counts.items()) + f" in {elapsed:.1f}s",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
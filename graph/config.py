@@ -1,12 +1,42 @@
 import os
-from neo4j import GraphDatabase
+from neo4j import AsyncGraphDatabase, GraphDatabase
 
 neo4j_url = os.getenv('NEO4J_URL', 'neo4j://localhost:7687')
 neo4j_user = os.getenv('NEO4J_USER', 'neo4j')
 neo4j_password = os.getenv('NEO4J_PASSWORD', 'your_password')
 
+# Connection pool settings shared by the sync and async drivers.
+pool_settings = {
+    'max_connection_pool_size': int(os.getenv('NEO4J_MAX_POOL_SIZE', '100')),
+    'connection_acquisition_timeout': float(os.getenv('NEO4J_ACQUISITION_TIMEOUT', '60')),
+    'max_connection_lifetime': float(os.getenv('NEO4J_MAX_CONNECTION_LIFETIME', '3600')),
+}
+
 
 driver = GraphDatabase.driver(
     neo4j_url,
-    auth=(neo4j_user, neo4j_password)
-)
\ No newline at end of file
+    auth=(neo4j_user, neo4j_password),
+    **pool_settings
+)
+
+_async_driver = None
+
+
+def get_async_driver():
+    '''Process-wide async driver, created on first use inside the running event loop.'''
+    global _async_driver
+    if _async_driver is None:
+        _async_driver = AsyncGraphDatabase.driver(
+            neo4j_url,
+            auth=(neo4j_user, neo4j_password),
+            **pool_settings
+        )
+    return _async_driver
+
+
+async def close_async_driver():
+    '''Close the async driver, e.g. on application shutdown.'''
+    global _async_driver
+    if _async_driver is not None:
+        await _async_driver.close()
+        _async_driver = None
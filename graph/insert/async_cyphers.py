@@ -0,0 +1,159 @@
+"""
+Async counterparts of `graph.insert.cyphers` for the async Neo4j driver.
+
+Queries are shared with the sync module; only the transaction plumbing
+differs.
+"""
+from graph.insert.cyphers import (
+    CHILD_ROWS_QUERY,
+    CREATE_CITATION_QUERY,
+    CREATE_CITATIONS_IN_SECTIONS_QUERY,
+    CREATE_FORMULA_QUERY,
+    CREATE_FORMULAS_IN_SECTIONS_QUERY,
+    CREATE_PAPER_QUERY,
+    CREATE_SECTION_QUERY,
+    DELETE_ORPHAN_CITATIONS_QUERY,
+    DELETE_ORPHAN_FORMULAS_QUERY,
+    DELETE_SECTIONS_QUERY,
+    FIND_SECTION_HASHES_QUERY,
+    LINK_CITATION_TO_SECTION_QUERY,
+    LINK_FORMULA_TO_SECTION_QUERY,
+    LINK_SECTION_CHILD_QUERY,
+    LINK_SECTION_SIBLING_QUERY,
+    LINK_SECTION_TO_PAPER_QUERY,
+    SECTION_ROWS_QUERY,
+    SIBLING_ROWS_QUERY,
+    UNLINK_SECTION_CITATIONS_QUERY,
+    UNLINK_SECTION_FORMULAS_QUERY,
+    UNWIND_BATCH_SIZE,
+    diff_paper_tree,
+)
+
+async def _single(tx, query: str, **params):
+    result = await tx.run(query, **params)
+    return await result.single()
+
+async def _consume(tx, query: str, **params):
+    result = await tx.run(query, **params)
+    return await result.consume()
+
+async def _run_batched(tx, query: str, rows: list, batch_size: int = UNWIND_BATCH_SIZE, **params):
+    """Run an UNWIND $rows query over `rows` in fixed-size batches inside `tx`."""
+    for start in range(0, len(rows), batch_size):
+        await _consume(tx, query, rows=rows[start:start + batch_size], **params)
+
+async def create_paper(tx, arxiv_id: str, title: str, authors: list, abstract: str = None, outline: str = None,
+                       changed: bool = True):
+    """Create a paper node in Neo4j."""
+    return await _single(tx, CREATE_PAPER_QUERY,
+                         arxiv_id=arxiv_id,
+                         title=title,
+                         authors=authors,
+                         abstract=abstract,
+                         url=f"https://arxiv.org/abs/{arxiv_id}",
+                         outline=outline,
+                         changed=changed)
+
+async def create_section(tx, section_id: str, title: str, content: str):
+    """Create a section node in Neo4j."""
+    return await _single(tx, CREATE_SECTION_QUERY, section_id=section_id, title=title, content=content)
+
+async def create_formula(tx, formula_id: str, latex: str):
+    """Create a formula node in Neo4j."""
+    return await _single(tx, CREATE_FORMULA_QUERY, formula_id=formula_id, latex=latex)
+
+async def create_citation(tx, citation_id: str, citation_key: str):
+    """Create a citation node in Neo4j."""
+    return await _single(tx, CREATE_CITATION_QUERY, citation_id=citation_id, citation_key=citation_key)
+
+async def link_section_to_paper(tx, arxiv_id: str, section_id: str):
+    """Link a section to a paper with WITHIN relationship."""
+    return await _single(tx, LINK_SECTION_TO_PAPER_QUERY, arxiv_id=arxiv_id, section_id=section_id)
+
+async def link_citation_to_section(tx, citation_id: str, section_id: str):
+    """Link a citation to a section with CITED_IN relationship."""
+    return await _single(tx, LINK_CITATION_TO_SECTION_QUERY, citation_id=citation_id, section_id=section_id)
+
+async def link_formula_to_section(tx, formula_id: str, section_id: str):
+    """Link a formula to a section with USED_IN relationship."""
+    return await _single(tx, LINK_FORMULA_TO_SECTION_QUERY, formula_id=formula_id, section_id=section_id)
+
+async def link_section_child(tx, parent_section_id: str, child_section_id: str):
+    """Link a child section to its parent section with LEFT_CHILD relationship."""
+    return await _single(tx, LINK_SECTION_CHILD_QUERY,
+                         parent_section_id=parent_section_id, child_section_id=child_section_id)
+
+async def link_section_sibling(tx, left_section_id: str, right_section_id: str):
+    """Link sibling sections with RIGHT_SIBLING relationship."""
+    return await _single(tx, LINK_SECTION_SIBLING_QUERY,
+                         left_section_id=left_section_id, right_section_id=right_section_id)
+
+async def create_formulas_in_sections(tx, rows: list):
+    """Create formula nodes and link them to sections with USED_IN relationships in one batch."""
+    return await _consume(tx, CREATE_FORMULAS_IN_SECTIONS_QUERY, rows=rows)
+
+async def create_citations_in_sections(tx, rows: list):
+    """Create citation nodes and link them to sections with CITED_IN relationships in one batch."""
+    return await _consume(tx, CREATE_CITATIONS_IN_SECTIONS_QUERY, rows=rows)
+
+async def _write_tree_rows(tx, arxiv_id: str, sections: list, children: list, siblings: list,
+                           formulas: list = None, citations: list = None):
+    await _run_batched(tx, SECTION_ROWS_QUERY, sections, arxiv_id=arxiv_id)
+    await _run_batched(tx, CHILD_ROWS_QUERY, children)
+    await _run_batched(tx, SIBLING_ROWS_QUERY, siblings)
+    await _run_batched(tx, CREATE_FORMULAS_IN_SECTIONS_QUERY, formulas or [])
+    await _run_batched(tx, CREATE_CITATIONS_IN_SECTIONS_QUERY, citations or [])
+
+async def create_paper_tree(tx, paper: dict, sections: list, children: list, siblings: list,
+                            formulas: list = None, citations: list = None):
+    """Create a paper with its whole section tree in a single transaction."""
+    await create_paper(tx, paper["arxiv_id"], paper["title"], paper["authors"], paper.get("abstract"),
+                       paper.get("outline"))
+    await _write_tree_rows(tx, paper["arxiv_id"], sections, children, siblings, formulas, citations)
+
+async def create_paper_trees(tx, trees: list):
+    """Create several papers with their section trees in a single transaction."""
+    for tree in trees:
+        await create_paper_tree(tx, **tree)
+
+async def find_section_hashes(tx, arxiv_id: str) -> dict:
+    """Map every stored section_id of a paper to its content_hash."""
+    result = await tx.run(FIND_SECTION_HASHES_QUERY, prefix=f"{arxiv_id}_section_")
+    return {record["section_id"]: record["content_hash"] async for record in result}
+
+async def _unlink(tx, query: str, key: str, section_ids: list) -> list:
+    if not section_ids:
+        return []
+    result = await tx.run(query, rows=section_ids)
+    return [record[key] async for record in result]
+
+async def sync_paper_tree(tx, paper: dict, sections: list, children: list, siblings: list,
+                          formulas: list = None, citations: list = None) -> dict:
+    """Bring a stored paper tree in line with a freshly parsed one, writing only the diff."""
+    arxiv_id = paper["arxiv_id"]
+    diff = diff_paper_tree(
+        await find_section_hashes(tx, arxiv_id), sections, children, siblings, formulas, citations
+    )
+
+    formula_ids = await _unlink(tx, UNLINK_SECTION_FORMULAS_QUERY, "formula_id", diff["stale"])
+    citation_ids = await _unlink(tx, UNLINK_SECTION_CITATIONS_QUERY, "citation_id", diff["stale"])
+    await _run_batched(tx, DELETE_SECTIONS_QUERY, diff["removed"])
+
+    await create_paper(tx, arxiv_id, paper["title"], paper["authors"], paper.get("abstract"),
+                       paper.get("outline"), changed=bool(diff["sections"] or diff["removed"]))
+    await _write_tree_rows(
+        tx, arxiv_id, diff["sections"], diff["children"], diff["siblings"],
+        diff["formulas"], diff["citations"],
+    )
+
+    await _run_batched(tx, DELETE_ORPHAN_FORMULAS_QUERY, formula_ids)
+    await _run_batched(tx, DELETE_ORPHAN_CITATIONS_QUERY, citation_ids)
+    return {
+        "unchanged": len(sections) - len(diff["sections"]),
+        "written": len(diff["sections"]),
+        "deleted": len(diff["removed"]),
+    }
+
+async def sync_paper_trees(tx, trees: list) -> list:
+    """Incrementally update several paper trees in a single transaction."""
+    return [await sync_paper_tree(tx, **tree) for tree in trees]
@@ -0,0 +1,96 @@
+"""
+Async counterparts of `graph.insert.operations` on the shared async driver.
+
+Use these from async code (e.g. FastAPI handlers) so graph writes do not
+block the event loop; scripts can keep using the sync module.
+"""
+from graph.insert.async_cyphers import *
+from graph.config import get_async_driver
+
+async def insert_paper(arxiv_id: str, title: str, authors: list, abstract: str = None):
+    """Insert a paper node into Neo4j."""
+    async with get_async_driver().session() as session:
+        return await session.execute_write(create_paper, arxiv_id, title, authors, abstract)
+
+async def insert_paper_tree(paper: dict, sections: list, children: list, siblings: list,
+                            formulas: list = None, citations: list = None):
+    """Insert a paper, its sections, formulas, citations and all edges in one transaction.
+
+    Either the whole tree is written or, on failure, nothing is.
+    """
+    async with get_async_driver().session() as session:
+        return await session.execute_write(
+            create_paper_tree, paper, sections, children, siblings, formulas, citations
+        )
+
+async def insert_paper_trees(trees: list):
+    """Insert several paper trees (as built for insert_paper_tree) in one transaction."""
+    async with get_async_driver().session() as session:
+        return await session.execute_write(create_paper_trees, trees)
+
+async def update_paper_tree(paper: dict, sections: list, children: list, siblings: list,
+                            formulas: list = None, citations: list = None) -> dict:
+    """Incrementally re-ingest a paper tree, writing only sections whose content hash changed.
+
+    Returns:
+        {unchanged, written, deleted} section counts
+    """
+    async with get_async_driver().session() as session:
+        return await session.execute_write(
+            sync_paper_tree, paper, sections, children, siblings, formulas, citations
+        )
+
+async def update_paper_trees(trees: list) -> list:
+    """Incrementally re-ingest several paper trees in one transaction."""
+    async with get_async_driver().session() as session:
+        return await session.execute_write(sync_paper_trees, trees)
+
+async def insert_section(section_id: str, title: str, content: str):
+    """Insert a section node into Neo4j."""
+    async with get_async_driver().session() as session:
+        return await session.execute_write(create_section, section_id, title, content)
+
+async def insert_formula(formula_id: str, latex: str):
+    """Insert a formula node into Neo4j."""
+    async with get_async_driver().session() as session:
+        return await session.execute_write(create_formula, formula_id, latex)
+
+async def insert_citation(citation_id: str, citation_key: str):
+    """Insert a citation node into Neo4j."""
+    async with get_async_driver().session() as session:
+        return await session.execute_write(create_citation, citation_id, citation_key)
+
+async def insert_formulas_in_sections(rows: list):
+    """Insert formula nodes and their USED_IN relationships in one transaction."""
+    async with get_async_driver().session() as session:
+        return await session.execute_write(create_formulas_in_sections, rows)
+
+async def insert_citations_in_sections(rows: list):
+    """Insert citation nodes and their CITED_IN relationships in one transaction."""
+    async with get_async_driver().session() as session:
+        return await session.execute_write(create_citations_in_sections, rows)
+
+async def link_section_within_paper(arxiv_id: str, section_id: str):
+    """Link a section to a paper with WITHIN relationship."""
+    async with get_async_driver().session() as session:
+        return await session.execute_write(link_section_to_paper, arxiv_id, section_id)
+
+async def link_citation_in_section(citation_id: str, section_id: str):
+    """Link a citation to a section with CITED_IN relationship."""
+    async with get_async_driver().session() as session:
+        return await session.execute_write(link_citation_to_section, citation_id, section_id)
+
+async def link_formula_in_section(formula_id: str, section_id: str):
+    """Link a formula to a section with USED_IN relationship."""
+    async with get_async_driver().session() as session:
+        return await session.execute_write(link_formula_to_section, formula_id, section_id)
+
+async def link_child_to_parent(parent_section_id: str, child_section_id: str):
+    """Link a child section to its parent section with LEFT_CHILD relationship."""
+    async with get_async_driver().session() as session:
+        return await session.execute_write(link_section_child, parent_section_id, child_section_id)
+
+async def link_siblings(left_section_id: str, right_section_id: str):
+    """Link sibling sections with RIGHT_SIBLING relationship."""
+    async with get_async_driver().session() as session:
+        return await session.execute_write(link_section_sibling, left_section_id, right_section_id)
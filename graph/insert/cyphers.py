@@ -1,102 +1,362 @@
-def create_paper(tx, arxiv_id: str, title: str, authors: list, abstract: str = None):
-    """Create a paper node in Neo4j."""
-    query = """
-    MERGE (p:PAPER {arxiv_id: $arxiv_id})
-    SET p.title = $title, 
-        p.authors = $authors, 
-        p.abstract = $abstract,
-        p.url = $url
-    RETURN p
+CREATE_PAPER_QUERY = """
+MERGE (p:PAPER {arxiv_id: $arxiv_id})
+SET p.title = $title, 
+    p.authors = $authors, 
+    p.abstract = $abstract,
+    p.url = $url,
+    p.outline = coalesce($outline, p.outline),
+    p.ingested_at = CASE WHEN $changed OR p.ingested_at IS NULL THEN datetime() ELSE p.ingested_at END
+RETURN p
+"""
+
+def create_paper(tx, arxiv_id: str, title: str, authors: list, abstract: str = None, outline: str = None,
+                 changed: bool = True):
+    """Create a paper node in Neo4j.
+
+    `outline` is the JSON section outline built by `paper_tree`; when omitted
+    the stored outline is kept. `ingested_at` is only bumped when `changed`
+    (or on first write), so citation analytics skip papers that did not change.
     """
-    result = tx.run(query, 
+    result = tx.run(CREATE_PAPER_QUERY, 
                     arxiv_id=arxiv_id, 
                     title=title, 
                     authors=authors,
                     abstract=abstract,
-                    url=f"https://arxiv.org/abs/{arxiv_id}")
+                    url=f"https://arxiv.org/abs/{arxiv_id}",
+                    outline=outline,
+                    changed=changed)
     return result.single()
 
+CREATE_SECTION_QUERY = """
+MERGE (s:SECTION {section_id: $section_id})
+SET s.title = $title, s.content = $content
+RETURN s
+"""
+
 def create_section(tx, section_id: str, title: str, content: str):
     """Create a section node in Neo4j."""
-    query = """
-    MERGE (s:SECTION {section_id: $section_id})
-    SET s.title = $title, s.content = $content
-    RETURN s
-    """
-    result = tx.run(query, section_id=section_id, title=title, content=content)
+    result = tx.run(CREATE_SECTION_QUERY, section_id=section_id, title=title, content=content)
     return result.single()
 
+CREATE_FORMULA_QUERY = """
+MERGE (f:FORMULA {formula_id: $formula_id})
+SET f.latex = $latex
+RETURN f
+"""
+
 def create_formula(tx, formula_id: str, latex: str):
     """Create a formula node in Neo4j."""
-    query = """
-    MERGE (f:FORMULA {formula_id: $formula_id})
-    SET f.latex = $latex
-    RETURN f
-    """
-    result = tx.run(query, formula_id=formula_id, latex=latex)
+    result = tx.run(CREATE_FORMULA_QUERY, formula_id=formula_id, latex=latex)
     return result.single()
 
+CREATE_CITATION_QUERY = """
+MERGE (c:CITATION {citation_id: $citation_id})
+SET c.citation_key = $citation_key
+RETURN c
+"""
+
 def create_citation(tx, citation_id: str, citation_key: str):
     """Create a citation node in Neo4j."""
-    query = """
-    MERGE (c:CITATION {citation_id: $citation_id})
-    SET c.citation_key = $citation_key
-    RETURN c
-    """
-    result = tx.run(query, citation_id=citation_id, citation_key=citation_key)
+    result = tx.run(CREATE_CITATION_QUERY, citation_id=citation_id, citation_key=citation_key)
     return result.single()
 
+LINK_SECTION_TO_PAPER_QUERY = """
+MATCH (p:PAPER {arxiv_id: $arxiv_id})
+MATCH (s:SECTION {section_id: $section_id})
+MERGE (s) - [:WITHIN] -> (p)
+RETURN s
+"""
+
 def link_section_to_paper(tx, arxiv_id: str, section_id: str):
     """Link a section to a paper with WITHIN relationship."""
-    query = """
-    MATCH (p:PAPER {arxiv_id: $arxiv_id})
-    MATCH (s:SECTION {section_id: $section_id})
-    MERGE (s) - [:WITHIN] -> (p)
-    RETURN s
-    """
-    result = tx.run(query, arxiv_id=arxiv_id, section_id=section_id)
+    result = tx.run(LINK_SECTION_TO_PAPER_QUERY, arxiv_id=arxiv_id, section_id=section_id)
     return result.single()
 
+LINK_CITATION_TO_SECTION_QUERY = """
+MATCH (c:CITATION {citation_id: $citation_id})
+MATCH (s:SECTION {section_id: $section_id})
+MERGE (c) - [:CITED_IN] -> (s)
+RETURN c
+"""
+
 def link_citation_to_section(tx, citation_id: str, section_id: str):
     """Link a citation to a section with CITED_IN relationship."""
-    query = """
-    MATCH (c:CITATION {citation_id: $citation_id})
-    MATCH (s:SECTION {section_id: $section_id})
-    MERGE (c) - [:CITED_IN] -> (s)
-    RETURN c
-    """
-    result = tx.run(query, citation_id=citation_id, section_id=section_id)
+    result = tx.run(LINK_CITATION_TO_SECTION_QUERY, citation_id=citation_id, section_id=section_id)
     return result.single()
 
+LINK_FORMULA_TO_SECTION_QUERY = """
+MATCH (f:FORMULA {formula_id: $formula_id})
+MATCH (s:SECTION {section_id: $section_id})
+MERGE (f) - [:USED_IN] -> (s)
+RETURN f
+"""
+
 def link_formula_to_section(tx, formula_id: str, section_id: str):
     """Link a formula to a section with USED_IN relationship."""
-    query = """
-    MATCH (f:FORMULA {formula_id: $formula_id})
-    MATCH (s:SECTION {section_id: $section_id})
-    MERGE (f) - [:USED_IN] -> (s)
-    RETURN f
-    """
-    result = tx.run(query, formula_id=formula_id, section_id=section_id)
+    result = tx.run(LINK_FORMULA_TO_SECTION_QUERY, formula_id=formula_id, section_id=section_id)
     return result.single()
 
+CREATE_FORMULAS_IN_SECTIONS_QUERY = """
+UNWIND $rows AS row
+MERGE (f:FORMULA {formula_id: row.formula_id})
+ON CREATE SET f.latex = row.latex
+WITH f, row
+MATCH (s:SECTION {section_id: row.section_id})
+MERGE (f) - [:USED_IN] -> (s)
+"""
+
+def create_formulas_in_sections(tx, rows: list):
+    """Create formula nodes and link them to sections with USED_IN relationships in one batch.
+
+    Each row is {formula_id, latex, section_id}. Formulas are merged on their
+    content hash, so a formula used in many sections becomes a single node.
+    """
+    result = tx.run(CREATE_FORMULAS_IN_SECTIONS_QUERY, rows=rows)
+    return result.consume()
+
+CREATE_CITATIONS_IN_SECTIONS_QUERY = """
+UNWIND $rows AS row
+MERGE (c:CITATION {citation_id: row.citation_id})
+ON CREATE SET c.citation_key = row.citation_key,
+              c.title = row.title,
+              c.doi = row.doi,
+              c.arxiv_id = row.arxiv_id
+WITH c, row
+MATCH (s:SECTION {section_id: row.section_id})
+MERGE (c) - [:CITED_IN] -> (s)
+"""
+
+def create_citations_in_sections(tx, rows: list):
+    """Create citation nodes and link them to sections with CITED_IN relationships in one batch.
+
+    Each row is {citation_id, citation_key, title, doi, arxiv_id, section_id}.
+    Citations are merged on their canonical id, so every paper citing the same
+    work links to a single node.
+    """
+    result = tx.run(CREATE_CITATIONS_IN_SECTIONS_QUERY, rows=rows)
+    return result.consume()
+
+LINK_SECTION_CHILD_QUERY = """
+MATCH (parent:SECTION {section_id: $parent_section_id})
+MATCH (child:SECTION {section_id: $child_section_id})
+MERGE (parent) - [:LEFT_CHILD] -> (child)
+RETURN parent, child
+"""
+
 def link_section_child(tx, parent_section_id: str, child_section_id: str):
     """Link a child section to its parent section with LEFT_CHILD relationship."""
-    query = """
-    MATCH (parent:SECTION {section_id: $parent_section_id})
-    MATCH (child:SECTION {section_id: $child_section_id})
-    MERGE (parent) - [:LEFT_CHILD] -> (child)
-    RETURN parent, child
-    """
-    result = tx.run(query, parent_section_id=parent_section_id, child_section_id=child_section_id)
+    result = tx.run(LINK_SECTION_CHILD_QUERY, parent_section_id=parent_section_id, child_section_id=child_section_id)
     return result.single()
 
+LINK_SECTION_SIBLING_QUERY = """
+MATCH (left:SECTION {section_id: $left_section_id})
+MATCH (right:SECTION {section_id: $right_section_id})
+MERGE (left) - [:RIGHT_SIBLING] -> (right)
+RETURN left, right
+"""
+
 def link_section_sibling(tx, left_section_id: str, right_section_id: str):
     """Link sibling sections with RIGHT_SIBLING relationship."""
-    query = """
-    MATCH (left:SECTION {section_id: $left_section_id})
-    MATCH (right:SECTION {section_id: $right_section_id})
-    MERGE (left) - [:RIGHT_SIBLING] -> (right)
-    RETURN left, right
+    result = tx.run(LINK_SECTION_SIBLING_QUERY, left_section_id=left_section_id, right_section_id=right_section_id)
+    return result.single()
+
+UNWIND_BATCH_SIZE = 1000
+
+def _run_batched(tx, query: str, rows: list, batch_size: int = UNWIND_BATCH_SIZE, **params):
+    """Run an UNWIND $rows query over `rows` in fixed-size batches inside `tx`."""
+    for start in range(0, len(rows), batch_size):
+        tx.run(query, rows=rows[start:start + batch_size], **params).consume()
+
+SECTION_ROWS_QUERY = """
+MATCH (p:PAPER {arxiv_id: $arxiv_id})
+UNWIND $rows AS row
+MERGE (s:SECTION {section_id: row.section_id})
+SET s.paper_id = row.paper_id, s.path = row.path,
+    s.title = row.title, s.content = row.content, s.content_hash = row.content_hash
+FOREACH (_ IN CASE WHEN row.top_level THEN [1] ELSE [] END |
+    MERGE (s) - [:WITHIN] -> (p))
+"""
+
+CHILD_ROWS_QUERY = """
+UNWIND $rows AS row
+MATCH (parent:SECTION {section_id: row.parent})
+MATCH (child:SECTION {section_id: row.child})
+MERGE (parent) - [:LEFT_CHILD] -> (child)
+"""
+
+SIBLING_ROWS_QUERY = """
+UNWIND $rows AS row
+MATCH (left:SECTION {section_id: row.left})
+MATCH (right:SECTION {section_id: row.right})
+MERGE (left) - [:RIGHT_SIBLING] -> (right)
+"""
+
+def _write_tree_rows(tx, arxiv_id: str, sections: list, children: list, siblings: list,
+                     formulas: list = None, citations: list = None):
+    """Write section, edge, formula and citation rows for one paper inside `tx`."""
+    _run_batched(tx, SECTION_ROWS_QUERY, sections, arxiv_id=arxiv_id)
+    _run_batched(tx, CHILD_ROWS_QUERY, children)
+    _run_batched(tx, SIBLING_ROWS_QUERY, siblings)
+    _run_batched(tx, CREATE_FORMULAS_IN_SECTIONS_QUERY, formulas or [])
+    _run_batched(tx, CREATE_CITATIONS_IN_SECTIONS_QUERY, citations or [])
+
+def create_paper_tree(tx, paper: dict, sections: list, children: list, siblings: list,
+                      formulas: list = None, citations: list = None):
+    """Create a paper with its whole section tree in a single transaction.
+
+    Args:
+        paper: {arxiv_id, title, authors, abstract, outline}
+        sections: [{section_id, paper_id, path, title, content, content_hash, top_level}];
+            top-level sections are linked to the paper with WITHIN
+        children: [{parent, child}] LEFT_CHILD edges
+        siblings: [{left, right}] RIGHT_SIBLING edges
+        formulas: rows for create_formulas_in_sections
+        citations: rows for create_citations_in_sections
+    """
+    create_paper(tx, paper["arxiv_id"], paper["title"], paper["authors"], paper.get("abstract"),
+                 paper.get("outline"))
+    _write_tree_rows(tx, paper["arxiv_id"], sections, children, siblings, formulas, citations)
+
+def create_paper_trees(tx, trees: list):
+    """Create several papers with their section trees in a single transaction."""
+    for tree in trees:
+        create_paper_tree(tx, **tree)
+
+FIND_SECTION_HASHES_QUERY = """
+MATCH (s:SECTION)
+WHERE s.section_id STARTS WITH $prefix
+RETURN s.section_id AS section_id, s.content_hash AS content_hash
+"""
+
+def find_section_hashes(tx, arxiv_id: str) -> dict:
+    """Map every stored section_id of a paper to its content_hash."""
+    result = tx.run(FIND_SECTION_HASHES_QUERY, prefix=f"{arxiv_id}_section_")
+    return {record["section_id"]: record["content_hash"] for record in result}
+
+UNLINK_SECTION_FORMULAS_QUERY = """
+UNWIND $rows AS section_id
+MATCH (f:FORMULA) - [u:USED_IN] -> (:SECTION {section_id: section_id})
+DELETE u
+RETURN DISTINCT f.formula_id AS formula_id
+"""
+
+def unlink_section_formulas(tx, section_ids: list) -> list:
+    """Drop USED_IN edges into the given sections, returning the formula_ids they pointed from."""
+    return [record["formula_id"] for record in tx.run(UNLINK_SECTION_FORMULAS_QUERY, rows=section_ids)]
+
+UNLINK_SECTION_CITATIONS_QUERY = """
+UNWIND $rows AS section_id
+MATCH (c:CITATION) - [r:CITED_IN] -> (:SECTION {section_id: section_id})
+DELETE r
+RETURN DISTINCT c.citation_id AS citation_id
+"""
+
+def unlink_section_citations(tx, section_ids: list) -> list:
+    """Drop CITED_IN edges into the given sections, returning the citation_ids they pointed from."""
+    return [record["citation_id"] for record in tx.run(UNLINK_SECTION_CITATIONS_QUERY, rows=section_ids)]
+
+DELETE_SECTIONS_QUERY = """
+UNWIND $rows AS section_id
+MATCH (s:SECTION {section_id: section_id})
+DETACH DELETE s
+"""
+
+def delete_sections(tx, section_ids: list):
+    """Delete section nodes and every relationship attached to them."""
+    _run_batched(tx, DELETE_SECTIONS_QUERY, section_ids)
+
+DELETE_ORPHAN_FORMULAS_QUERY = """
+UNWIND $rows AS formula_id
+MATCH (f:FORMULA {formula_id: formula_id})
+WHERE NOT (f) - [:USED_IN] -> ()
+DELETE f
+"""
+
+def delete_orphan_formulas(tx, formula_ids: list):
+    """Delete the given formulas if no section uses them any more."""
+    _run_batched(tx, DELETE_ORPHAN_FORMULAS_QUERY, formula_ids)
+
+DELETE_ORPHAN_CITATIONS_QUERY = """
+UNWIND $rows AS citation_id
+MATCH (c:CITATION {citation_id: citation_id})
+WHERE NOT (c) - [:CITED_IN] -> ()
+DETACH DELETE c
+"""
+
+def delete_orphan_citations(tx, citation_ids: list):
+    """Delete the given citations if no section cites them any more.
+
+    Orphans may still have CO_CITED edges from `graph.analytics`, which go with them.
+    """
+    _run_batched(tx, DELETE_ORPHAN_CITATIONS_QUERY, citation_ids)
+
+def diff_paper_tree(stored: dict, sections: list, children: list, siblings: list,
+                    formulas: list = None, citations: list = None) -> dict:
+    """Work out what `sync_paper_tree` has to write, given the stored section hashes.
+
+    Sections are compared on their content_hash, which covers the title,
+    content and the formulas and citations attached to the section. Section
+    ids are positional, so edges only need writing when one of their
+    endpoints is new; stale edges disappear with the sections they touch.
+
+    Returns:
+        {stale, removed, sections, children, siblings, formulas, citations}:
+        section ids whose formula/citation edges must be dropped, section ids
+        to delete, and the rows to write
     """
-    result = tx.run(query, left_section_id=left_section_id, right_section_id=right_section_id)
-    return result.single()
\ No newline at end of file
+    current = {row["section_id"] for row in sections}
+    changed = [row for row in sections if stored.get(row["section_id"]) != row["content_hash"]]
+    changed_ids = {row["section_id"] for row in changed}
+    new_ids = current - stored.keys()
+    removed = [section_id for section_id in stored if section_id not in current]
+    return {
+        "stale": [section_id for section_id in changed_ids if section_id in stored] + removed,
+        "removed": removed,
+        "sections": changed,
+        "children": [row for row in children if row["parent"] in new_ids or row["child"] in new_ids],
+        "siblings": [row for row in siblings if row["left"] in new_ids or row["right"] in new_ids],
+        "formulas": [row for row in formulas or [] if row["section_id"] in changed_ids],
+        "citations": [row for row in citations or [] if row["section_id"] in changed_ids],
+    }
+
+def sync_paper_tree(tx, paper: dict, sections: list, children: list, siblings: list,
+                    formulas: list = None, citations: list = None) -> dict:
+    """Bring a stored paper tree in line with a freshly parsed one, writing only the diff.
+
+    See `diff_paper_tree` for what counts as changed. Sections no longer
+    present are deleted, along with formulas and citations left without any
+    section. The paper node, including its outline, is always rewritten so
+    the outline follows every change to the section tree, but its
+    `ingested_at` only moves when sections were written or deleted.
+
+    Returns:
+        {unchanged, written, deleted} section counts
+    """
+    arxiv_id = paper["arxiv_id"]
+    diff = diff_paper_tree(
+        find_section_hashes(tx, arxiv_id), sections, children, siblings, formulas, citations
+    )
+
+    stale = diff["stale"]
+    formula_ids = unlink_section_formulas(tx, stale) if stale else []
+    citation_ids = unlink_section_citations(tx, stale) if stale else []
+    delete_sections(tx, diff["removed"])
+
+    create_paper(tx, arxiv_id, paper["title"], paper["authors"], paper.get("abstract"), paper.get("outline"),
+                 changed=bool(diff["sections"] or diff["removed"]))
+    _write_tree_rows(
+        tx, arxiv_id, diff["sections"], diff["children"], diff["siblings"],
+        diff["formulas"], diff["citations"],
+    )
+
+    delete_orphan_formulas(tx, formula_ids)
+    delete_orphan_citations(tx, citation_ids)
+    return {
+        "unchanged": len(sections) - len(diff["sections"]),
+        "written": len(diff["sections"]),
+        "deleted": len(diff["removed"]),
+    }
+
+def sync_paper_trees(tx, trees: list) -> list:
+    """Incrementally update several paper trees in a single transaction."""
+    return [sync_paper_tree(tx, **tree) for tree in trees]
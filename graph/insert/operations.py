@@ -3,7 +3,7 @@ Neo4j operations for ingesting papers into the graph database.
 
 Database schema:
     labels:
-        :PAPER
+        :PAPER # outline: JSON section tree, rewritten on every paper tree write
         :SECTION
         :FORMULA
         :CITATION
@@ -13,6 +13,7 @@ Database schema:
         (:FORMULA) - [:USED_IN] -> (:SECTION)
         (:SECTION) - [:LEFT_CHILD] -> (:SECTION) # parent to child relationship
         (:SECTION) - [:RIGHT_SIBLING] -> (:SECTION) # sibling relationship
+        (:CITATION) - [:CO_CITED] -> (:CITATION) # written by graph.analytics
 """
 from graph.insert.cyphers import *
 from graph.config import driver
@@ -22,6 +23,39 @@ def insert_paper(arxiv_id: str, title: str, authors: list, abstract: str = None)
     with driver.session() as session:
         return session.execute_write(create_paper, arxiv_id, title, authors, abstract)
 
+def insert_paper_tree(paper: dict, sections: list, children: list, siblings: list,
+                      formulas: list = None, citations: list = None):
+    """Insert a paper, its sections, formulas, citations and all edges in one transaction.
+
+    Either the whole tree is written or, on failure, nothing is.
+    """
+    with driver.session() as session:
+        return session.execute_write(
+            create_paper_tree, paper, sections, children, siblings, formulas, citations
+        )
+
+def insert_paper_trees(trees: list):
+    """Insert several paper trees (as built for insert_paper_tree) in one transaction."""
+    with driver.session() as session:
+        return session.execute_write(create_paper_trees, trees)
+
+def update_paper_tree(paper: dict, sections: list, children: list, siblings: list,
+                      formulas: list = None, citations: list = None) -> dict:
+    """Incrementally re-ingest a paper tree, writing only sections whose content hash changed.
+
+    Returns:
+        {unchanged, written, deleted} section counts
+    """
+    with driver.session() as session:
+        return session.execute_write(
+            sync_paper_tree, paper, sections, children, siblings, formulas, citations
+        )
+
+def update_paper_trees(trees: list) -> list:
+    """Incrementally re-ingest several paper trees in one transaction."""
+    with driver.session() as session:
+        return session.execute_write(sync_paper_trees, trees)
+
 def insert_section(section_id: str, title: str, content: str):
     """Insert a section node into Neo4j."""
     with driver.session() as session:
@@ -37,6 +71,16 @@ def insert_citation(citation_id: str, citation_key: str):
     with driver.session() as session:
         return session.execute_write(create_citation, citation_id, citation_key)
 
+def insert_formulas_in_sections(rows: list):
+    """Insert formula nodes and their USED_IN relationships in one transaction."""
+    with driver.session() as session:
+        return session.execute_write(create_formulas_in_sections, rows)
+
+def insert_citations_in_sections(rows: list):
+    """Insert citation nodes and their CITED_IN relationships in one transaction."""
+    with driver.session() as session:
+        return session.execute_write(create_citations_in_sections, rows)
+
 def link_section_within_paper(arxiv_id: str, section_id: str):
     """Link a section to a paper with WITHIN relationship."""
     with driver.session() as session:
@@ -0,0 +1,250 @@
+"""
+Versioned schema bootstrap for the Neo4j graph.
+
+Every MERGE/MATCH in `graph.insert.cyphers` and `graph.traverse.cyphers`
+looks nodes up by a property. Without a constraint or index on that property
+each lookup is a label scan, so ingestion slows down as the graph grows.
+
+`apply_schema` runs the migrations in `MIGRATIONS` that are newer than the
+version recorded on the `(:SCHEMA_VERSION {name: "graph"})` node, then
+records the new version. Statements use IF NOT EXISTS, so re-running is
+harmless. `check_query_plans` EXPLAINs every cypher function registered in
+`QUERY_MODULES` and reports plans that still contain a label or all-nodes
+scan.
+
+Usage:
+    python -m graph.schema apply
+    python -m graph.schema check
+    python -m graph.schema version
+"""
+import argparse
+import inspect
+import sys
+
+from collections.abc import Iterator
+from types import ModuleType
+
+from graph.config import driver as default_driver
+from graph.insert import cyphers as insert_cyphers
+from graph.traverse import cyphers as traverse_cyphers
+
+# Append new migrations; never edit one that has shipped.
+MIGRATIONS = [
+    (1, [
+        "CREATE CONSTRAINT paper_arxiv_id IF NOT EXISTS FOR (p:PAPER) REQUIRE p.arxiv_id IS UNIQUE",
+        "CREATE CONSTRAINT section_section_id IF NOT EXISTS FOR (s:SECTION) REQUIRE s.section_id IS UNIQUE",
+        "CREATE CONSTRAINT formula_formula_id IF NOT EXISTS FOR (f:FORMULA) REQUIRE f.formula_id IS UNIQUE",
+        "CREATE CONSTRAINT citation_citation_id IF NOT EXISTS FOR (c:CITATION) REQUIRE c.citation_id IS UNIQUE",
+        "CREATE INDEX section_title IF NOT EXISTS FOR (s:SECTION) ON (s.title)",
+    ]),
+    (2, [
+        "CREATE INDEX section_paper_id IF NOT EXISTS FOR (s:SECTION) ON (s.paper_id)",
+        "CREATE INDEX section_paper_path IF NOT EXISTS FOR (s:SECTION) ON (s.paper_id, s.path)",
+        # Backfill paper_id/path on sections written before they were stored,
+        # deriving both from the positional section_id.
+        """
+        MATCH (s:SECTION)
+        WHERE s.paper_id IS NULL AND s.section_id CONTAINS '_section_'
+        CALL {
+            WITH s
+            WITH s, split(s.section_id, '_section_') AS parts
+            WITH s, parts[0] AS paper_id, split(parts[1], '_subsection_') AS positions
+            SET s.paper_id = paper_id,
+                s.path = reduce(path = '', i IN positions |
+                    path + CASE path WHEN '' THEN '' ELSE '.' END + toString(toInteger(i) + 1))
+        } IN TRANSACTIONS OF 10000 ROWS
+        """,
+    ]),
+    (3, [
+        "CREATE FULLTEXT INDEX section_fulltext IF NOT EXISTS FOR (s:SECTION) ON EACH [s.title, s.content]",
+    ]),
+    (4, [
+        # Incremental runs of graph.analytics select papers by ingestion time.
+        "CREATE INDEX paper_ingested_at IF NOT EXISTS FOR (p:PAPER) ON (p.ingested_at)",
+    ]),
+    (5, [
+        # Index paper_id too, so paper-scoped full-text searches filter
+        # inside the index rather than after ranking the whole corpus.
+        "DROP INDEX section_fulltext IF EXISTS",
+        "CREATE FULLTEXT INDEX section_fulltext IF NOT EXISTS FOR (s:SECTION) ON EACH [s.title, s.content, s.paper_id]",
+    ]),
+]
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+QUERY_MODULES = (insert_cyphers, traverse_cyphers)
+SCAN_OPERATORS = ("AllNodesScan", "NodeByLabelScan")
+
+# Sample arguments for cypher functions whose parameters are read in Python.
+_SAMPLE_TREE = {
+    "paper": {"arxiv_id": "0000.00000", "title": "", "authors": [], "abstract": "", "outline": "[]"},
+    "sections": [{"section_id": "0000.00000_section_0", "paper_id": "0000.00000", "path": "1",
+                  "title": "", "content": "", "content_hash": "", "top_level": True}],
+    "children": [{"parent": "0000.00000_section_0", "child": "0000.00000_section_0_subsection_0"}],
+    "siblings": [{"left": "0000.00000_section_0", "right": "0000.00000_section_1"}],
+    "formulas": [{"formula_id": "", "latex": "", "section_id": "0000.00000_section_0"}],
+    "citations": [{"citation_id": "", "citation_key": "", "title": None, "doi": None,
+                   "arxiv_id": None, "section_id": "0000.00000_section_0"}],
+}
+SAMPLE_ARGS = {
+    "create_paper_tree": _SAMPLE_TREE,
+    "create_paper_trees": {"trees": [_SAMPLE_TREE]},
+    "sync_paper_tree": _SAMPLE_TREE,
+    "sync_paper_trees": {"trees": [_SAMPLE_TREE]},
+    "find_sections_fulltext": {"query": "graph"},
+}
+
+
+def current_version(driver=None) -> int:
+    """Schema version recorded in the graph, 0 if never bootstrapped."""
+    with (driver or default_driver).session() as session:
+        record = session.run(
+            "MATCH (v:SCHEMA_VERSION {name: 'graph'}) RETURN v.version AS version"
+        ).single()
+    return record["version"] if record else 0
+
+
+def apply_schema(driver=None) -> int:
+    """
+    Apply every migration newer than the recorded schema version.
+
+    Schema statements cannot share a transaction with data writes, so each
+    runs in its own auto-commit transaction; the version is recorded after
+    each migration completes.
+
+    Returns:
+        The schema version now in place
+    """
+    driver = driver or default_driver
+    version = current_version(driver)
+    with driver.session() as session:
+        for target, statements in MIGRATIONS:
+            if target <= version:
+                continue
+            for statement in statements:
+                session.run(statement).consume()
+            session.run(
+                "MERGE (v:SCHEMA_VERSION {name: 'graph'}) "
+                "SET v.version = $version, v.applied_at = datetime()",
+                version=target,
+            ).consume()
+            version = target
+    return version
+
+
+class _CapturingTx:
+    """Collects the queries a cypher function would run, without a database."""
+
+    def __init__(self):
+        self.queries: list[tuple[str, dict]] = []
+
+    def run(self, query: str, parameters: dict | None = None, **kwargs):
+        self.queries.append((query, {**(parameters or {}), **kwargs}))
+        return self
+
+    def __iter__(self):
+        return iter(())
+
+    def single(self):
+        return None
+
+    def consume(self):
+        return None
+
+    def data(self) -> list:
+        return []
+
+
+def _sample_args(fn) -> dict:
+    if fn.__name__ in SAMPLE_ARGS:
+        return SAMPLE_ARGS[fn.__name__]
+    args = {}
+    for name, param in list(inspect.signature(fn).parameters.items())[1:]:
+        if param.default is not inspect.Parameter.empty:
+            continue
+        if param.annotation is list:
+            args[name] = [{}] if name == "rows" else [""]
+        elif param.annotation is dict:
+            args[name] = {}
+        else:
+            args[name] = ""
+    return args
+
+
+def _cypher_functions(module: ModuleType) -> Iterator:
+    for name, fn in inspect.getmembers(module, inspect.isfunction):
+        if fn.__module__ != module.__name__ or name.startswith("_"):
+            continue
+        params = list(inspect.signature(fn).parameters)
+        if params and params[0] == "tx":
+            yield fn
+
+
+def registered_queries(modules: tuple[ModuleType, ...] = QUERY_MODULES) -> Iterator[tuple[str, str, dict]]:
+    """
+    Yield (function name, query, parameters) for every distinct query the
+    cypher functions in `modules` run when called with sample arguments.
+    """
+    seen = set()
+    for module in modules:
+        for fn in _cypher_functions(module):
+            tx = _CapturingTx()
+            fn(tx, **_sample_args(fn))
+            for query, params in tx.queries:
+                if query not in seen:
+                    seen.add(query)
+                    yield f"{module.__name__}.{fn.__name__}", query, params
+
+
+def _scans(plan: dict) -> list[str]:
+    found = []
+    stack = [plan]
+    while stack:
+        node = stack.pop()
+        operator = node.get("operatorType", "")
+        if operator.startswith(SCAN_OPERATORS):
+            found.append(f"{operator} {node.get('args', {}).get('Details', '')}".strip())
+        stack.extend(node.get("children", []))
+    return found
+
+
+def check_query_plans(driver=None) -> list[tuple[str, list[str]]]:
+    """
+    EXPLAIN every registered query and report the ones that still scan.
+
+    EXPLAIN only plans the query, so write queries are safe to check against
+    a live database.
+
+    Returns:
+        [(function name, [scan operators])] for every query with a scan
+    """
+    problems = []
+    with (driver or default_driver).session() as session:
+        for name, query, params in registered_queries():
+            summary = session.run(f"EXPLAIN {query}", params).consume()
+            scans = _scans(summary.plan or {})
+            if scans:
+                problems.append((name, scans))
+    return problems
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Manage the Neo4j graph schema.")
+    parser.add_argument("command", choices=["apply", "check", "version"])
+    args = parser.parse_args()
+
+    if args.command == "apply":
+        print(f"schema at version {apply_schema()} (latest {SCHEMA_VERSION})")
+    elif args.command == "version":
+        print(f"schema at version {current_version()} (latest {SCHEMA_VERSION})")
+    else:
+        problems = check_query_plans()
+        for name, scans in problems:
+            print(f"{name}:")
+            for scan in scans:
+                print(f"  {scan}")
+        print(f"{len(problems)} queries with label scans")
+        sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
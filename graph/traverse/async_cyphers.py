@@ -0,0 +1,142 @@
+"""
+Async counterparts of `graph.traverse.cyphers` for the async Neo4j driver.
+"""
+import json
+
+from graph.traverse.cyphers import (
+    FIND_CITATION_IN_SECTION_QUERY,
+    FIND_CITATION_QUERY,
+    FIND_FORMULA_IN_SECTION_QUERY,
+    FIND_FORMULA_QUERY,
+    FIND_PAPER_QUERY,
+    FIND_SECTIONS_IN_PAPER_QUERY,
+    FIND_SECTION_QUERY,
+    FIND_SUBSECTIONS_QUERY,
+    FIND_PAPER_SECTIONS_QUERY,
+    FIND_SECTION_AT_QUERY,
+    FIND_SECTIONS_TITLED_QUERY,
+    FIND_PAPER_OUTLINE_QUERY,
+    FIND_SECTIONS_FULLTEXT_QUERY,
+    FIND_SECTION_NEIGHBORHOODS_QUERY,
+    FIND_CITATION_METRICS_QUERY,
+    FIND_KEY_REFERENCES_QUERY,
+    FIND_CO_CITED_QUERY,
+    FIND_PAPER_CONTEXT_QUERY,
+    _paper_context,
+    SECTION_FULLTEXT_INDEX,
+    SNIPPET_CHARS,
+    _fulltext_hit,
+    fulltext_search,
+    fulltext_terms,
+    path_key,
+    section_projection,
+)
+
+async def find_paper(tx, arxiv_id: str):
+    """Find a paper node in Neo4j."""
+    result = await tx.run(FIND_PAPER_QUERY, arxiv_id=arxiv_id)
+    return await result.single()
+
+async def find_section(tx, title: str):
+    """Find a section node in Neo4j."""
+    result = await tx.run(FIND_SECTION_QUERY, title=title)
+    return await result.single()
+
+async def find_formula(tx, formula_id: str):
+    """Find a formula node in Neo4j."""
+    result = await tx.run(FIND_FORMULA_QUERY, formula_id=formula_id)
+    return await result.single()
+
+async def find_citation(tx, citation_id: str):
+    """Find a citation node in Neo4j."""
+    result = await tx.run(FIND_CITATION_QUERY, citation_id=citation_id)
+    return await result.single()
+
+async def find_formula_in_section(tx, formula_id: str, title: str):
+    """Find a formula node in a section node in Neo4j."""
+    result = await tx.run(FIND_FORMULA_IN_SECTION_QUERY, formula_id=formula_id, title=title)
+    return [record async for record in result]
+
+async def find_citation_in_section(tx, citation_id: str, title: str):
+    """Find a citation node in a section node in Neo4j."""
+    result = await tx.run(FIND_CITATION_IN_SECTION_QUERY, citation_id=citation_id, title=title)
+    return [record async for record in result]
+
+async def find_sections_in_paper(tx, paper_id: str):
+    """Find all section nodes in a paper node in Neo4j."""
+    result = await tx.run(FIND_SECTIONS_IN_PAPER_QUERY, paper_id=paper_id)
+    return [record async for record in result]
+
+async def find_subsections(tx, title: str):
+    """Find all subsection nodes in a section node in Neo4j."""
+    result = await tx.run(FIND_SUBSECTIONS_QUERY, title=title)
+    return [record async for record in result]
+
+async def find_paper_sections(tx, arxiv_id: str, properties: tuple = ("path", "title"), max_chars: int = None,
+                              under: str = None, depth: int = None):
+    """Find the sections of one paper, in document order, projected to `properties`."""
+    query = FIND_PAPER_SECTIONS_QUERY.replace("{projection}", section_projection(properties, max_chars))
+    result = await tx.run(query, arxiv_id=arxiv_id, under=under, depth=depth, max_chars=max_chars)
+    sections = [record["section"] async for record in result]
+    return sorted(sections, key=lambda section: path_key(section["path"]))
+
+async def find_section_at(tx, arxiv_id: str, path: str, properties: tuple = ("path", "title", "content"),
+                          max_chars: int = None):
+    """Find the section at `path` (e.g. "3.2") in one paper, projected to `properties`."""
+    query = FIND_SECTION_AT_QUERY.replace("{projection}", section_projection(properties, max_chars))
+    result = await tx.run(query, arxiv_id=arxiv_id, path=path, max_chars=max_chars)
+    record = await result.single()
+    return record["section"] if record else None
+
+async def find_sections_titled(tx, arxiv_id: str, title: str, properties: tuple = ("path", "title", "content"),
+                               max_chars: int = None):
+    """Find the sections of one paper whose title matches `title`, ignoring case."""
+    query = FIND_SECTIONS_TITLED_QUERY.replace("{projection}", section_projection(properties, max_chars))
+    result = await tx.run(query, arxiv_id=arxiv_id, title=title, max_chars=max_chars)
+    sections = [record["section"] async for record in result]
+    return sorted(sections, key=lambda section: path_key(section["path"]))
+
+async def find_paper_outline(tx, arxiv_id: str):
+    """Find the outline stored on a paper, None if there is none."""
+    result = await tx.run(FIND_PAPER_OUTLINE_QUERY, arxiv_id=arxiv_id)
+    record = await result.single()
+    return json.loads(record["outline"]) if record and record["outline"] else None
+
+async def find_sections_fulltext(tx, query: str, paper_id: str = None, limit: int = 10,
+                                 snippet_chars: int = SNIPPET_CHARS):
+    """Rank sections against `query` with the full-text index, best first."""
+    terms = fulltext_terms(query)
+    if not terms:
+        return []
+    result = await tx.run(FIND_SECTIONS_FULLTEXT_QUERY, index=SECTION_FULLTEXT_INDEX,
+                          search=fulltext_search(terms, paper_id), terms=terms, limit=limit,
+                          snippet_chars=snippet_chars)
+    return [_fulltext_hit(record.data(), terms) async for record in result]
+
+async def find_section_neighborhoods(tx, section_ids: list, max_chars: int = 2000, max_formulas: int = 20):
+    """Find sections by id with their parent, siblings and formulas, in the order given."""
+    result = await tx.run(FIND_SECTION_NEIGHBORHOODS_QUERY, section_ids=section_ids,
+                          max_chars=max_chars, max_formulas=max_formulas)
+    return [{key: value for key, value in record.data().items() if key != "rank"} async for record in result]
+
+async def find_citation_metrics(tx, arxiv_id: str):
+    """Find the citation counts and influence of a paper, None for unknown papers."""
+    result = await tx.run(FIND_CITATION_METRICS_QUERY, arxiv_id=arxiv_id)
+    record = await result.single()
+    return record["paper"] if record else None
+
+async def find_key_references(tx, arxiv_id: str, limit: int = 10):
+    """Find the works a paper cites, most influential first."""
+    result = await tx.run(FIND_KEY_REFERENCES_QUERY, arxiv_id=arxiv_id, limit=limit)
+    return [record["citation"] async for record in result]
+
+async def find_co_cited(tx, citation_id: str, limit: int = 10):
+    """Find the works most often cited together with a work, by co-citation score."""
+    result = await tx.run(FIND_CO_CITED_QUERY, citation_id=citation_id, limit=limit)
+    return [record.data() async for record in result]
+
+async def find_paper_context(tx, arxiv_id: str, max_chars: int = 8000):
+    """Find a paper's abstract, outline, introduction and conclusion in one query."""
+    result = await tx.run(FIND_PAPER_CONTEXT_QUERY, arxiv_id=arxiv_id, max_chars=max_chars)
+    record = await result.single()
+    return _paper_context(record.data()) if record else None
@@ -0,0 +1,109 @@
+"""
+Async counterparts of `graph.traverse.operations` on the shared async driver.
+
+Use these from async code (e.g. FastAPI handlers and agent tools) so graph
+reads overlap instead of blocking the event loop.
+"""
+from graph.traverse.async_cyphers import *
+from graph.config import get_async_driver
+
+async def search_paper(arxiv_id: str):
+    """Search for a paper node in Neo4j."""
+    async with get_async_driver().session() as session:
+        record = await session.execute_read(find_paper, arxiv_id)
+        return record.data() if record else None
+
+async def search_section(title: str):
+    """Search for a section node in Neo4j."""
+    async with get_async_driver().session() as session:
+        record = await session.execute_read(find_section, title)
+        return record.data() if record else None
+
+async def search_formula(formula_id: str):
+    """Search for a formula node in Neo4j."""
+    async with get_async_driver().session() as session:
+        record = await session.execute_read(find_formula, formula_id)
+        return record.data() if record else None
+
+async def search_citation(citation_id: str):
+    """Search for a citation node in Neo4j."""
+    async with get_async_driver().session() as session:
+        record = await session.execute_read(find_citation, citation_id)
+        return record.data() if record else None
+
+async def search_formula_in_section(formula_id: str, title: str):
+    """Search for a formula node in a section node in Neo4j."""
+    async with get_async_driver().session() as session:
+        records = await session.execute_read(find_formula_in_section, formula_id, title)
+        return [x.data() for x in records]
+
+async def search_citation_in_section(citation_id: str, title: str):
+    """Search for a citation node in a section node in Neo4j."""
+    async with get_async_driver().session() as session:
+        records = await session.execute_read(find_citation_in_section, citation_id, title)
+        return [x.data() for x in records]
+
+async def search_sections_in_paper(paper_id: str):
+    """Search for all section nodes in a paper node in Neo4j."""
+    async with get_async_driver().session() as session:
+        records = await session.execute_read(find_sections_in_paper, paper_id)
+        return [x.data() for x in records]
+
+async def search_subsections(title: str):
+    """Search for all subsection nodes in a section node in Neo4j."""
+    async with get_async_driver().session() as session:
+        records = await session.execute_read(find_subsections, title)
+        return [x.data() for x in records]
+
+async def search_paper_sections(arxiv_id: str, properties: tuple = ("path", "title"), max_chars: int = None,
+                                under: str = None, depth: int = None):
+    """Search for the sections of one paper, returning only `properties`."""
+    async with get_async_driver().session() as session:
+        return await session.execute_read(find_paper_sections, arxiv_id, properties, max_chars, under, depth)
+
+async def search_section_at(arxiv_id: str, path: str, properties: tuple = ("path", "title", "content"),
+                            max_chars: int = None):
+    """Search for the section at `path` in one paper."""
+    async with get_async_driver().session() as session:
+        return await session.execute_read(find_section_at, arxiv_id, path, properties, max_chars)
+
+async def search_sections_titled(arxiv_id: str, title: str, properties: tuple = ("path", "title", "content"),
+                                 max_chars: int = None):
+    """Search for the sections titled `title` in one paper."""
+    async with get_async_driver().session() as session:
+        return await session.execute_read(find_sections_titled, arxiv_id, title, properties, max_chars)
+
+async def search_paper_outline(arxiv_id: str):
+    """Search for the section outline of one paper in a single lookup."""
+    async with get_async_driver().session() as session:
+        return await session.execute_read(find_paper_outline, arxiv_id)
+
+async def search_sections_fulltext(query: str, paper_id: str = None, limit: int = 10):
+    """Search for the sections best matching `query`, returning ids, scores and snippets."""
+    async with get_async_driver().session() as session:
+        return await session.execute_read(find_sections_fulltext, query, paper_id, limit)
+
+async def search_section_neighborhoods(section_ids: list, max_chars: int = 2000):
+    """Search for sections by id together with their parent, siblings and formulas."""
+    async with get_async_driver().session() as session:
+        return await session.execute_read(find_section_neighborhoods, section_ids, max_chars)
+
+async def search_citation_metrics(arxiv_id: str):
+    """Search for the citation counts and influence of a paper."""
+    async with get_async_driver().session() as session:
+        return await session.execute_read(find_citation_metrics, arxiv_id)
+
+async def search_key_references(arxiv_id: str, limit: int = 10):
+    """Search for the most influential works a paper cites."""
+    async with get_async_driver().session() as session:
+        return await session.execute_read(find_key_references, arxiv_id, limit)
+
+async def search_co_cited(citation_id: str, limit: int = 10):
+    """Search for the works most often cited together with a work."""
+    async with get_async_driver().session() as session:
+        return await session.execute_read(find_co_cited, citation_id, limit)
+
+async def search_paper_context(arxiv_id: str, max_chars: int = 8000):
+    """Search for a paper's abstract, outline, introduction and conclusion."""
+    async with get_async_driver().session() as session:
+        return await session.execute_read(find_paper_context, arxiv_id, max_chars)
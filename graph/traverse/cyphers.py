@@ -1,77 +1,355 @@
+import json
+import re
+
+FIND_PAPER_QUERY = """
+MATCH (p:PAPER {arxiv_id: $arxiv_id})
+RETURN p
+"""
+
 def find_paper(tx, arxiv_id: str):
     """Find a paper node in Neo4j."""
-    query = """
-    MATCH (p:PAPER {arxiv_id: $arxiv_id})
-    RETURN p
-    """
-    result = tx.run(query, arxiv_id=arxiv_id)
+    result = tx.run(FIND_PAPER_QUERY, arxiv_id=arxiv_id)
     return result.single()
 
+FIND_SECTION_QUERY = """
+MATCH (s:SECTION {title: $title})
+RETURN s
+"""
+
 def find_section(tx, title: str):
     """Find a section node in Neo4j."""
-    query = """
-    MATCH (s:SECTION {title: $title})
-    RETURN s
-    """
-    result = tx.run(query, title=title)
+    result = tx.run(FIND_SECTION_QUERY, title=title)
     return result.single()
 
+FIND_FORMULA_QUERY = """
+MATCH (f:FORMULA {formula_id: $formula_id})
+RETURN f
+"""
+
 def find_formula(tx, formula_id: str):
     """Find a formula node in Neo4j."""
-    query = """
-    MATCH (f:FORMULA {formula_id: $formula_id})
-    RETURN f
-    """
-    result = tx.run(query, formula_id=formula_id)
+    result = tx.run(FIND_FORMULA_QUERY, formula_id=formula_id)
     return result.single()
 
+FIND_CITATION_QUERY = """
+MATCH (c:CITATION {citation_id: $citation_id})
+RETURN c
+"""
+
 def find_citation(tx, citation_id: str):
     """Find a citation node in Neo4j."""
-    query = """
-    MATCH (c:CITATION {citation_id: $citation_id})
-    RETURN c
-    """
-    result = tx.run(query, citation_id=citation_id)
+    result = tx.run(FIND_CITATION_QUERY, citation_id=citation_id)
     return result.single()
 
+FIND_FORMULA_IN_SECTION_QUERY = """
+MATCH (f:FORMULA {formula_id: $formula_id})
+MATCH (s:SECTION {title: $title})
+MATCH (f) - [:USED_IN] -> (s)
+RETURN f
+"""
+
 def find_formula_in_section(tx, formula_id: str, title: str):
     """Find a formula node in a section node in Neo4j."""
-    query = """
-    MATCH (f:FORMULA {formula_id: $formula_id})
-    MATCH (s:SECTION {title: $title})
-    MATCH (f) - [:USED_IN] -> (s)
-    RETURN f
-    """
-    result = tx.run(query, formula_id=formula_id, title=title)
+    result = tx.run(FIND_FORMULA_IN_SECTION_QUERY, formula_id=formula_id, title=title)
     return list(result)
 
+FIND_CITATION_IN_SECTION_QUERY = """
+MATCH (c:CITATION {citation_id: $citation_id})
+MATCH (s:SECTION {title: $title})
+MATCH (c) - [:CITED_IN] -> (s)
+RETURN c
+"""
+
 def find_citation_in_section(tx, citation_id: str, title: str):
     """Find a citation node in a section node in Neo4j."""
-    query = """
-    MATCH (c:CITATION {citation_id: $citation_id})
-    MATCH (s:SECTION {title: $title})
-    MATCH (c) - [:CITED_IN] -> (s)
-    RETURN c
-    """
-    result = tx.run(query, citation_id=citation_id, title=title)
+    result = tx.run(FIND_CITATION_IN_SECTION_QUERY, citation_id=citation_id, title=title)
     return list(result)
 
+FIND_SECTIONS_IN_PAPER_QUERY = """
+MATCH (p:PAPER {arxiv_id: $paper_id})
+MATCH (s:SECTION) - [:WITHIN] -> (p)
+RETURN s
+"""
+
 def find_sections_in_paper(tx, paper_id: str):
     """Find all section nodes in a paper node in Neo4j."""
-    query = """
-    MATCH (p:PAPER {arxiv_id: $paper_id})
-    MATCH (s:SECTION) - [:WITHIN] -> (p)
-    RETURN s
-    """
-    result = tx.run(query, paper_id=paper_id)
+    result = tx.run(FIND_SECTIONS_IN_PAPER_QUERY, paper_id=paper_id)
     return list(result)
 
+FIND_SUBSECTIONS_QUERY = """
+MATCH (s:SECTION {title: $title})-[:LEFT_CHILD]->(first_child)
+MATCH (first_child)-[:RIGHT_SIBLING*0..]->(subsection)
+RETURN subsection
+"""
+
 def find_subsections(tx, title: str):
     """Find all subsection nodes in a section node in Neo4j."""
-    query = """
-    MATCH (s:SECTION {title: $title})-[:LEFT_CHILD]->(first_child)
-    MATCH (first_child)-[:RIGHT_SIBLING*0..]->(subsection)
-    RETURN subsection
+    result = tx.run(FIND_SUBSECTIONS_QUERY, title=title)
+    return list(result)
+SECTION_PROPERTIES = ("section_id", "paper_id", "path", "title", "content")
+
+def section_projection(properties: tuple = ("path", "title"), max_chars: int = None) -> str:
+    """Build a map projection of `s` returning only `properties`.
+
+    Property names are checked against SECTION_PROPERTIES, so the result is
+    safe to splice into a query. With `max_chars`, content is truncated in the
+    database instead of being shipped whole.
+    """
+    unknown = set(properties) - set(SECTION_PROPERTIES)
+    if unknown:
+        raise ValueError(f"Unknown section properties: {sorted(unknown)}")
+    fields = []
+    for name in properties:
+        if name == "content" and max_chars is not None:
+            fields.append("content: left(s.content, $max_chars)")
+        else:
+            fields.append(f".{name}")
+    # The path is always returned so callers can order and address sections.
+    if "path" not in properties:
+        fields.append(".path")
+    return "s {" + ", ".join(fields) + "}"
+
+def path_key(path: str) -> tuple:
+    """Sort key putting section paths in document order ("2" < "10", "1" < "1.1")."""
+    return tuple(int(part) for part in path.split("."))
+
+FIND_PAPER_SECTIONS_QUERY = """
+MATCH (s:SECTION {paper_id: $arxiv_id})
+WHERE $under IS NULL OR s.path STARTS WITH $under + '.'
+WITH s, size(split(s.path, '.')) AS depth
+WHERE $depth IS NULL OR depth = $depth
+RETURN {projection} AS section
+"""
+
+def find_paper_sections(tx, arxiv_id: str, properties: tuple = ("path", "title"), max_chars: int = None,
+                        under: str = None, depth: int = None):
+    """Find the sections of one paper, in document order, projected to `properties`.
+
+    Args:
+        arxiv_id: Paper to look in
+        properties: Section properties to return (see SECTION_PROPERTIES)
+        max_chars: Truncate content to this many characters
+        under: Only sections below this path, e.g. "2" for 2.1, 2.2, ...
+        depth: Only sections at this depth (1 for top-level sections)
+    """
+    query = FIND_PAPER_SECTIONS_QUERY.replace("{projection}", section_projection(properties, max_chars))
+    result = tx.run(query, arxiv_id=arxiv_id, under=under, depth=depth, max_chars=max_chars)
+    sections = [record["section"] for record in result]
+    return sorted(sections, key=lambda section: path_key(section["path"]))
+
+FIND_SECTION_AT_QUERY = """
+MATCH (s:SECTION {paper_id: $arxiv_id, path: $path})
+RETURN {projection} AS section
+"""
+
+def find_section_at(tx, arxiv_id: str, path: str, properties: tuple = ("path", "title", "content"),
+                    max_chars: int = None):
+    """Find the section at `path` (e.g. "3.2") in one paper, projected to `properties`."""
+    query = FIND_SECTION_AT_QUERY.replace("{projection}", section_projection(properties, max_chars))
+    record = tx.run(query, arxiv_id=arxiv_id, path=path, max_chars=max_chars).single()
+    return record["section"] if record else None
+
+FIND_SECTIONS_TITLED_QUERY = """
+MATCH (s:SECTION {paper_id: $arxiv_id})
+WHERE toLower(s.title) = toLower($title)
+RETURN {projection} AS section
+"""
+
+def find_sections_titled(tx, arxiv_id: str, title: str, properties: tuple = ("path", "title", "content"),
+                         max_chars: int = None):
+    """Find the sections of one paper whose title matches `title`, ignoring case."""
+    query = FIND_SECTIONS_TITLED_QUERY.replace("{projection}", section_projection(properties, max_chars))
+    result = tx.run(query, arxiv_id=arxiv_id, title=title, max_chars=max_chars)
+    sections = [record["section"] for record in result]
+    return sorted(sections, key=lambda section: path_key(section["path"]))
+
+FIND_PAPER_OUTLINE_QUERY = """
+MATCH (p:PAPER {arxiv_id: $arxiv_id})
+RETURN p.outline AS outline
+"""
+
+def find_paper_outline(tx, arxiv_id: str):
+    """Find the outline stored on a paper: nested [{section_id, path, title, depth, chars, children}].
+
+    Returns None for unknown papers and papers ingested before outlines were stored.
+    """
+    record = tx.run(FIND_PAPER_OUTLINE_QUERY, arxiv_id=arxiv_id).single()
+    return json.loads(record["outline"]) if record and record["outline"] else None
+
+# Full-text index over SECTION title and content, created by graph.schema.
+SECTION_FULLTEXT_INDEX = "section_fulltext"
+SNIPPET_CHARS = 300
+
+def fulltext_terms(text: str) -> list:
+    """Lowercased word terms of `text`, free of Lucene query syntax."""
+    return re.findall(r"\w+", text.lower())
+
+def fulltext_search(terms: list, paper_id: str = None) -> str:
+    """Lucene query matching `terms` in title or content, within one paper if `paper_id` is set.
+
+    The paper filter is part of the index query, so a paper-scoped search
+    never ranks sections from the rest of the corpus.
+    """
+    words = " ".join(terms)
+    search = f"title:({words}) content:({words})"
+    if paper_id is None:
+        return search
+    quoted = paper_id.replace("\\", "\\\\").replace('"', '\\"')
+    return f'+paper_id:"{quoted}" +({search})'
+
+def highlight(text: str, terms: list) -> str:
+    """Wrap every whole-word occurrence of `terms` in `text` in **...**."""
+    if not terms:
+        return text
+    pattern = "|".join(re.escape(term) for term in sorted(terms, key=len, reverse=True))
+    return re.sub(rf"\b(?:{pattern})\b", lambda match: f"**{match.group(0)}**", text, flags=re.IGNORECASE)
+
+# The snippet starts a little before the first query term found in the
+# content; size(split(text, term)[0]) is that term's offset.
+FIND_SECTIONS_FULLTEXT_QUERY = """
+CALL db.index.fulltext.queryNodes($index, $search) YIELD node AS s, score
+WITH s, score
+LIMIT $limit
+WITH s, score, toLower(coalesce(s.content, '')) AS text
+WITH s, score, [term IN $terms WHERE text CONTAINS term | size(split(text, term)[0])] AS hits
+WITH s, score, reduce(first = -1, hit IN hits | CASE WHEN first < 0 OR hit < first THEN hit ELSE first END) AS first
+WITH s, score, CASE WHEN first > $snippet_chars / 4 THEN first - $snippet_chars / 4 ELSE 0 END AS start
+RETURN s.section_id AS section_id, s.paper_id AS paper_id, s.path AS path, s.title AS title, score,
+       substring(coalesce(s.content, ''), start, $snippet_chars) AS snippet,
+       start > 0 AS clipped_left,
+       start + $snippet_chars < size(coalesce(s.content, '')) AS clipped_right
+"""
+
+def find_sections_fulltext(tx, query: str, paper_id: str = None, limit: int = 10,
+                           snippet_chars: int = SNIPPET_CHARS):
+    """Rank sections against `query` with the full-text index, best first.
+
+    Args:
+        query: Free text; Lucene operators are ignored
+        paper_id: Only rank sections of this paper
+        limit: Maximum number of sections returned
+        snippet_chars: Length of the snippet around the first matching term
+
+    Returns:
+        [{section_id, paper_id, path, title, score, snippet}] with the
+        query terms in each snippet wrapped in **...**
+    """
+    terms = fulltext_terms(query)
+    if not terms:
+        return []
+    result = tx.run(FIND_SECTIONS_FULLTEXT_QUERY, index=SECTION_FULLTEXT_INDEX,
+                    search=fulltext_search(terms, paper_id), terms=terms, limit=limit,
+                    snippet_chars=snippet_chars)
+    return [_fulltext_hit(record.data(), terms) for record in result]
+
+def _fulltext_hit(hit: dict, terms: list) -> dict:
+    snippet = highlight(hit.pop("snippet"), terms)
+    if hit.pop("clipped_left"):
+        snippet = "..." + snippet
+    if hit.pop("clipped_right"):
+        snippet += "..."
+    hit["snippet"] = snippet
+    return hit
+
+# Hits keep their input order through `rank`; parent lookups go through the
+# (paper_id, path) index.
+FIND_SECTION_NEIGHBORHOODS_QUERY = """
+UNWIND range(0, size($section_ids) - 1) AS rank
+MATCH (s:SECTION {section_id: $section_ids[rank]})
+OPTIONAL MATCH (parent:SECTION {
+    paper_id: s.paper_id,
+    path: CASE WHEN s.path CONTAINS '.'
+               THEN substring(s.path, 0, size(s.path) - size(last(split(s.path, '.'))) - 1) END
+})
+RETURN rank,
+       s {.section_id, .paper_id, .path, .title, content: left(s.content, $max_chars)} AS section,
+       parent {.section_id, .path, .title} AS parent,
+       [(previous:SECTION)-[:RIGHT_SIBLING]->(s) | previous {.section_id, .path, .title}] +
+       [(s)-[:RIGHT_SIBLING]->(next:SECTION) | next {.section_id, .path, .title}] AS siblings,
+       [(f:FORMULA)-[:USED_IN]->(s) | f.latex][..$max_formulas] AS formulas
+ORDER BY rank
+"""
+
+def find_section_neighborhoods(tx, section_ids: list, max_chars: int = 2000, max_formulas: int = 20):
+    """Find sections by id with their graph neighbourhood, in the order given.
+
+    Returns:
+        [{section, parent, siblings, formulas}]: the section with content cut
+        to `max_chars`, its parent and adjacent siblings (id, path, title) and
+        the LaTeX of up to `max_formulas` formulas used in it. Unknown ids are
+        skipped.
     """
-    result = tx.run(query, title=title)
-    return list(result)
\ No newline at end of file
+    result = tx.run(FIND_SECTION_NEIGHBORHOODS_QUERY, section_ids=section_ids,
+                    max_chars=max_chars, max_formulas=max_formulas)
+    return [{key: value for key, value in record.data().items() if key != "rank"} for record in result]
+
+# Properties below are written by graph.analytics.
+CITATION_PROJECTION = "c {.citation_id, .citation_key, .title, .doi, .arxiv_id, .cited_by_count, .influence}"
+
+FIND_CITATION_METRICS_QUERY = """
+MATCH (p:PAPER {arxiv_id: $arxiv_id})
+RETURN p {.arxiv_id, .title, .reference_count, .cited_by_count, .influence} AS paper
+"""
+
+def find_citation_metrics(tx, arxiv_id: str):
+    """Find the citation counts and influence of a paper, None for unknown papers."""
+    record = tx.run(FIND_CITATION_METRICS_QUERY, arxiv_id=arxiv_id).single()
+    return record["paper"] if record else None
+
+FIND_KEY_REFERENCES_QUERY = """
+MATCH (p:PAPER {arxiv_id: $arxiv_id})
+UNWIND coalesce(p.references, []) AS citation_id
+MATCH (c:CITATION {citation_id: citation_id})
+RETURN {projection} AS citation
+ORDER BY coalesce(c.influence, 0) DESC, coalesce(c.cited_by_count, 0) DESC
+LIMIT $limit
+""".replace("{projection}", CITATION_PROJECTION)
+
+def find_key_references(tx, arxiv_id: str, limit: int = 10):
+    """Find the works a paper cites, most influential first."""
+    result = tx.run(FIND_KEY_REFERENCES_QUERY, arxiv_id=arxiv_id, limit=limit)
+    return [record["citation"] for record in result]
+
+FIND_CO_CITED_QUERY = """
+MATCH (:CITATION {citation_id: $citation_id})-[r:CO_CITED]-(c:CITATION)
+RETURN {projection} AS citation, r.count AS count, r.score AS score
+ORDER BY r.score DESC
+LIMIT $limit
+""".replace("{projection}", CITATION_PROJECTION)
+
+def find_co_cited(tx, citation_id: str, limit: int = 10):
+    """Find the works most often cited together with a work, by co-citation score."""
+    result = tx.run(FIND_CO_CITED_QUERY, citation_id=citation_id, limit=limit)
+    return [record.data() for record in result]
+
+# Introduction and conclusion are picked by title among the top-level
+# sections, falling back to the first and last one.
+FIND_PAPER_CONTEXT_QUERY = """
+MATCH (p:PAPER {arxiv_id: $arxiv_id})
+OPTIONAL MATCH (s:SECTION {paper_id: $arxiv_id})
+WHERE NOT s.path CONTAINS '.'
+WITH p, s ORDER BY toInteger(s.path)
+WITH p, collect(s) AS sections
+WITH p,
+     coalesce([s IN sections WHERE toLower(s.title) CONTAINS 'intro'][0], sections[0]) AS introduction,
+     coalesce([s IN sections WHERE toLower(s.title) CONTAINS 'conclu'][0], sections[-1]) AS conclusion
+RETURN p {.arxiv_id, .title, .authors, .abstract, .outline} AS paper,
+       introduction {.path, .title, content: left(introduction.content, $max_chars)} AS introduction,
+       conclusion {.path, .title, content: left(conclusion.content, $max_chars)} AS conclusion
+"""
+
+def find_paper_context(tx, arxiv_id: str, max_chars: int = 8000):
+    """Find a paper's abstract, outline, introduction and conclusion in one query.
+
+    Returns:
+        {arxiv_id, title, authors, abstract, outline, introduction, conclusion},
+        sections as {path, title, content} with content cut to `max_chars`,
+        or None for unknown papers
+    """
+    record = tx.run(FIND_PAPER_CONTEXT_QUERY, arxiv_id=arxiv_id, max_chars=max_chars).single()
+    return _paper_context(record.data()) if record else None
+
+def _paper_context(data: dict) -> dict:
+    paper = data["paper"]
+    paper["outline"] = json.loads(paper["outline"]) if paper["outline"] else None
+    return {**paper, "introduction": data["introduction"], "conclusion": data["conclusion"]}
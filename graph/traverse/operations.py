@@ -29,13 +29,13 @@ def search_formula_in_section(formula_id: str, title: str):
     """Search for a formula node in a section node in Neo4j."""
     with driver.session() as session:
         records = session.execute_read(find_formula_in_section, formula_id, title)
-        return records.data()
+        return [x.data() for x in records]
 
 def search_citation_in_section(citation_id: str, title: str):
     """Search for a citation node in a section node in Neo4j."""
     with driver.session() as session:
         records = session.execute_read(find_citation_in_section, citation_id, title)
-        return records.data()
+        return [x.data() for x in records]
 
 def search_sections_in_paper(paper_id: str):
     """Search for all section nodes in a paper node in Neo4j."""
@@ -47,4 +47,57 @@ def search_subsections(title: str):
     """Search for all subsection nodes in a section node in Neo4j."""
     with driver.session() as session:
         records = session.execute_read(find_subsections, title)
-        return [x.data() for x in records]
\ No newline at end of file
+        return [x.data() for x in records]
+
+def search_paper_sections(arxiv_id: str, properties: tuple = ("path", "title"), max_chars: int = None,
+                          under: str = None, depth: int = None):
+    """Search for the sections of one paper, returning only `properties`."""
+    with driver.session() as session:
+        return session.execute_read(find_paper_sections, arxiv_id, properties, max_chars, under, depth)
+
+def search_section_at(arxiv_id: str, path: str, properties: tuple = ("path", "title", "content"),
+                      max_chars: int = None):
+    """Search for the section at `path` in one paper."""
+    with driver.session() as session:
+        return session.execute_read(find_section_at, arxiv_id, path, properties, max_chars)
+
+def search_sections_titled(arxiv_id: str, title: str, properties: tuple = ("path", "title", "content"),
+                           max_chars: int = None):
+    """Search for the sections titled `title` in one paper."""
+    with driver.session() as session:
+        return session.execute_read(find_sections_titled, arxiv_id, title, properties, max_chars)
+
+def search_paper_outline(arxiv_id: str):
+    """Search for the section outline of one paper in a single lookup."""
+    with driver.session() as session:
+        return session.execute_read(find_paper_outline, arxiv_id)
+
+def search_sections_fulltext(query: str, paper_id: str = None, limit: int = 10):
+    """Search for the sections best matching `query`, returning ids, scores and snippets."""
+    with driver.session() as session:
+        return session.execute_read(find_sections_fulltext, query, paper_id, limit)
+
+def search_section_neighborhoods(section_ids: list, max_chars: int = 2000):
+    """Search for sections by id together with their parent, siblings and formulas."""
+    with driver.session() as session:
+        return session.execute_read(find_section_neighborhoods, section_ids, max_chars)
+
+def search_citation_metrics(arxiv_id: str):
+    """Search for the citation counts and influence of a paper."""
+    with driver.session() as session:
+        return session.execute_read(find_citation_metrics, arxiv_id)
+
+def search_key_references(arxiv_id: str, limit: int = 10):
+    """Search for the most influential works a paper cites."""
+    with driver.session() as session:
+        return session.execute_read(find_key_references, arxiv_id, limit)
+
+def search_co_cited(citation_id: str, limit: int = 10):
+    """Search for the works most often cited together with a work."""
+    with driver.session() as session:
+        return session.execute_read(find_co_cited, citation_id, limit)
+
+def search_paper_context(arxiv_id: str, max_chars: int = 8000):
+    """Search for a paper's abstract, outline, introduction and conclusion."""
+    with driver.session() as session:
+        return session.execute_read(find_paper_context, arxiv_id, max_chars)
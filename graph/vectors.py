@@ -0,0 +1,180 @@
+"""
+Section embeddings in Qdrant, keyed by the graph's section ids.
+
+Every SECTION written by ingestion can be embedded into the
+`QDRANT_SECTION_COLLECTION` collection, one point per section, with
+`section_id`, `arxiv_id`, `path`, `title` and `content_hash` in the payload.
+Point ids are derived from the section id, so re-embedding a paper
+overwrites its points. Sections whose content hash is unchanged are not
+re-embedded, and points of sections the paper no longer has are deleted.
+
+`retrieve_sections` is the read side: a vector search in Qdrant, then one
+Cypher call expanding every hit with its parent, siblings and formulas.
+"""
+import os
+import uuid
+
+from fastembed import TextEmbedding
+from qdrant_client import QdrantClient, models
+
+from graph.traverse.operations import search_section_neighborhoods
+
+qdrant_url = os.getenv("QDRANT_URL", "http://localhost:6333")
+model_name = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+section_collection = os.getenv("QDRANT_SECTION_COLLECTION", "sections")
+
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "64"))
+# Sections are embedded from their title and the start of their content;
+# the default model only reads the first 256 tokens anyway.
+EMBED_MAX_CHARS = 2000
+
+_client = None
+_model = None
+
+
+def get_client() -> QdrantClient:
+    """Process-wide Qdrant client, created on first use."""
+    global _client
+    if _client is None:
+        _client = QdrantClient(url=qdrant_url)
+    return _client
+
+
+def get_model() -> TextEmbedding:
+    """Process-wide fastembed model, loaded on first use."""
+    global _model
+    if _model is None:
+        _model = TextEmbedding(model_name=model_name)
+    return _model
+
+
+def point_id(section_id: str) -> str:
+    """Stable Qdrant point id for a section."""
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, section_id))
+
+
+def section_text(section: dict) -> str:
+    """Text embedded for a section row."""
+    return f"{section['title']}\n\n{section['content'] or ''}"[:EMBED_MAX_CHARS]
+
+
+def _paper_filter(arxiv_id: str) -> models.Filter:
+    return models.Filter(must=[models.FieldCondition(key="arxiv_id", match=models.MatchValue(value=arxiv_id))])
+
+
+def ensure_collection(size: int) -> None:
+    """Create the section collection and its arxiv_id payload index if missing."""
+    client = get_client()
+    if client.collection_exists(section_collection):
+        return
+    client.create_collection(
+        section_collection,
+        vectors_config=models.VectorParams(size=size, distance=models.Distance.COSINE),
+    )
+    client.create_payload_index(section_collection, "arxiv_id", models.PayloadSchemaType.KEYWORD)
+
+
+def stored_hashes(arxiv_id: str) -> dict:
+    """Map every embedded section_id of a paper to the content_hash it was embedded with."""
+    client = get_client()
+    if not client.collection_exists(section_collection):
+        return {}
+    hashes, offset = {}, None
+    while True:
+        points, offset = client.scroll(
+            section_collection,
+            scroll_filter=_paper_filter(arxiv_id),
+            with_payload=["section_id", "content_hash"],
+            with_vectors=False,
+            limit=256,
+            offset=offset,
+        )
+        hashes.update({p.payload["section_id"]: p.payload.get("content_hash") for p in points})
+        if offset is None:
+            return hashes
+
+
+def embed_paper_sections(arxiv_id: str, sections: list, batch_size: int = EMBED_BATCH_SIZE) -> dict:
+    """
+    Embed the section rows of one paper (as built by `paper_tree`).
+
+    Only sections whose content hash differs from the stored point are
+    embedded, in batches of `batch_size`; points for sections no longer in
+    `sections` are deleted.
+
+    Returns:
+        {"embedded": n, "unchanged": n, "deleted": n}
+    """
+    client = get_client()
+    stored = stored_hashes(arxiv_id)
+    changed = [s for s in sections if stored.get(s["section_id"]) != s["content_hash"]]
+    removed = list(stored.keys() - {s["section_id"] for s in sections})
+
+    for start in range(0, len(changed), batch_size):
+        batch = changed[start:start + batch_size]
+        vectors = list(get_model().embed([section_text(s) for s in batch], batch_size=batch_size))
+        ensure_collection(len(vectors[0]))
+        client.upsert(section_collection, points=[
+            models.PointStruct(
+                id=point_id(s["section_id"]),
+                vector=vector.tolist(),
+                payload={
+                    "section_id": s["section_id"],
+                    "arxiv_id": arxiv_id,
+                    "path": s["path"],
+                    "title": s["title"],
+                    "content_hash": s["content_hash"],
+                },
+            )
+            for s, vector in zip(batch, vectors, strict=True)
+        ])
+    if removed:
+        client.delete(section_collection, points_selector=models.PointIdsList(
+            points=[point_id(section_id) for section_id in removed]
+        ))
+    return {"embedded": len(changed), "unchanged": len(sections) - len(changed), "deleted": len(removed)}
+
+
+def embed_paper_trees(trees: list) -> list:
+    """Embed the sections of several `paper_tree` results."""
+    return [embed_paper_sections(tree["paper"]["arxiv_id"], tree["sections"]) for tree in trees]
+
+
+def search_section_vectors(query: str, arxiv_id: str = None, limit: int = 5) -> list:
+    """
+    Nearest sections to `query`, optionally within one paper.
+
+    Returns:
+        [{section_id, arxiv_id, score}] best first
+    """
+    client = get_client()
+    if not client.collection_exists(section_collection):
+        return []
+    vector = next(iter(get_model().query_embed(query)))
+    points = client.query_points(
+        section_collection,
+        query=vector.tolist(),
+        query_filter=_paper_filter(arxiv_id) if arxiv_id else None,
+        limit=limit,
+        with_payload=["section_id", "arxiv_id"],
+    ).points
+    return [{**p.payload, "score": p.score} for p in points]
+
+
+def retrieve_sections(query: str, arxiv_id: str = None, limit: int = 5, max_chars: int = 2000) -> list:
+    """
+    Vector search over sections, expanded through the graph.
+
+    Two round trips: one Qdrant query, then one Cypher call fetching every
+    hit with its parent, neighbouring siblings and formulas.
+
+    Returns:
+        [{score, section, parent, siblings, formulas}] best first; hits
+        whose section is no longer in the graph are dropped
+    """
+    hits = search_section_vectors(query, arxiv_id, limit)
+    if not hits:
+        return []
+    neighborhoods = search_section_neighborhoods([hit["section_id"] for hit in hits], max_chars)
+    scores = {hit["section_id"]: hit["score"] for hit in hits}
+    return [{"score": scores[n["section"]["section_id"]], **n} for n in neighborhoods]
@@ -0,0 +1,406 @@
+"""
+Staged asyncio pipeline for bulk ingestion.
+
+    ids -> [download x N] -> queue -> [parse x P processes] -> queue -> [write x W]
+                                                  (with embed) -> queue -> [embed x E]
+
+Each stage is a set of asyncio workers built on the single-paper functions:
+`download_paper` runs in threads, `parse_paper` in a process pool, and
+`insert_paper_trees` in threads, batching several papers per transaction.
+Every stage gets its own thread pool sized to its worker count, so
+downloaders waiting on the rate limiter never hold threads the tree
+building or graph writes need.
+When sections are embedded into Qdrant, `embed_paper_trees` is a fourth
+stage after the write, so a Qdrant outage fails papers at "embed" without
+touching or retrying their graph writes.
+Downloads all go through the process-wide arXiv rate limiter, so adding
+downloaders adds concurrency but never raises the request rate.
+Stages are connected by bounded queues, so a slow stage applies backpressure
+upstream and memory stays flat however many ids are fed in. Each paper is
+parsed under `parse_timeout`, and a parse pool broken by a crashed worker is
+replaced so the run carries on; the papers it took down fail transiently.
+If any stage worker dies, the feeder and every other worker are cancelled
+instead of blocking on a queue nobody drains. Per-stage
+throughput, busy time and queue depths are tracked in `StageStats` so each
+stage can be sized independently. With a `JobLedger`, every stage
+transition and failure is recorded so an interrupted run can be resumed
+(see `ingestion.arxiv.ledger`).
+
+Usage:
+    python -m ingestion.arxiv.bulk --ids-file ids.txt --downloads 16 --parsers 8
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import sys
+import time
+
+from collections.abc import Callable, Iterable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from functools import partial
+
+from graph.insert.operations import insert_paper_trees, update_paper_trees
+from graph.schema import apply_schema
+from ingestion.arxiv.corpus import parse_paper_with_timeout
+from ingestion.arxiv.download import download_paper
+from ingestion.arxiv.ledger import JobLedger
+from ingestion.arxiv.pipeline import paper_tree
+
+_DONE = object()
+
+
+@dataclass
+class StageStats:
+    """Counters for one pipeline stage."""
+    name: str
+    concurrency: int
+    processed: int = 0
+    failed: int = 0
+    busy_seconds: float = 0.0
+    queue_depth: int = 0
+    max_queue_depth: int = 0
+    started: float = field(default_factory=time.monotonic)
+
+    def observe_queue(self, depth: int) -> None:
+        self.queue_depth = depth
+        self.max_queue_depth = max(self.max_queue_depth, depth)
+
+    def snapshot(self) -> dict:
+        elapsed = time.monotonic() - self.started
+        return {
+            "stage": self.name,
+            "concurrency": self.concurrency,
+            "processed": self.processed,
+            "failed": self.failed,
+            "per_second": self.processed / elapsed if elapsed else 0.0,
+            # Fraction of worker time spent doing work rather than waiting.
+            "utilization": self.busy_seconds / (elapsed * self.concurrency) if elapsed else 0.0,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+        }
+
+
+@dataclass
+class BulkReport:
+    """Outcome of a bulk ingestion run."""
+    ingested: list[str] = field(default_factory=list)
+    failures: dict[str, str] = field(default_factory=dict)
+    stages: list[dict] = field(default_factory=list)
+
+
+class BulkIngestor:
+    """Download, parse and write many papers with independently sized stages."""
+
+    def __init__(
+        self,
+        download_concurrency: int = 16,
+        parse_workers: int | None = None,
+        writer_concurrency: int = 2,
+        write_batch_size: int = 8,
+        embed_concurrency: int = 1,
+        queue_size: int = 64,
+        parse_timeout: float = 120.0,
+        incremental: bool = False,
+        ledger: JobLedger | None = None,
+        embed: bool = False,
+    ):
+        self.download_concurrency = download_concurrency
+        self.parse_workers = parse_workers or os.cpu_count() or 1
+        self.writer_concurrency = writer_concurrency
+        self.write_batch_size = write_batch_size
+        self.queue_size = queue_size
+        self.parse_timeout = parse_timeout
+        # Incremental mode diffs against stored section hashes (nightly refreshes).
+        self._write_graph = update_paper_trees if incremental else insert_paper_trees
+        self.embed = embed
+        self.embed_concurrency = embed_concurrency if embed else 0
+        self.ledger = ledger
+        # A paper is done once it clears the last stage.
+        self._last_stage = "embed" if embed else "write"
+        self.stats = {
+            "download": StageStats("download", download_concurrency),
+            "parse": StageStats("parse", self.parse_workers),
+            "write": StageStats("write", writer_concurrency),
+        }
+        if embed:
+            self.stats["embed"] = StageStats("embed", embed_concurrency)
+        self.report = BulkReport()
+        self._threads: dict[str, Executor] = {}
+        self._pool: ProcessPoolExecutor | None = None
+
+    def snapshot(self) -> list[dict]:
+        """Current per-stage statistics."""
+        return [stats.snapshot() for stats in self.stats.values()]
+
+    # Ledger commits go through their own single thread so SQLite never blocks the loop.
+    async def _start(self, stage: str, paper_id: str) -> None:
+        if self.ledger is not None:
+            await self._in_thread("ledger", self.ledger.start, paper_id, stage)
+
+    async def _complete(self, stage: str, paper_id: str) -> None:
+        if stage == self._last_stage:
+            self.report.ingested.append(paper_id)
+        if self.ledger is not None:
+            await self._in_thread("ledger", partial(self.ledger.complete, last_stage=self._last_stage), paper_id, stage)
+
+    async def _fail(self, stage: str, paper_id: str, error: Exception) -> None:
+        self.stats[stage].failed += 1
+        self.report.failures[paper_id] = f"{stage}: {type(error).__name__}: {error!s}"
+        if self.ledger is not None:
+            await self._in_thread("ledger", self.ledger.fail, paper_id, stage, error)
+
+    async def _in_thread(self, stage: str, func: Callable, *args):
+        """Run `func(*args)` on the thread pool reserved for `stage`."""
+        return await asyncio.get_running_loop().run_in_executor(self._threads[stage], func, *args)
+
+    async def _put(self, queue: asyncio.Queue, item, stage: str) -> None:
+        await queue.put(item)
+        self.stats[stage].observe_queue(queue.qsize())
+
+    async def _download(self, inbox: asyncio.Queue, outbox: asyncio.Queue) -> None:
+        stats = self.stats["download"]
+        while (paper_id := await inbox.get()) is not _DONE:
+            start = time.monotonic()
+            await self._start("download", paper_id)
+            try:
+                temp_dir, paper_path, _ = await self._in_thread("download", download_paper, paper_id)
+            except Exception as e:
+                await self._fail("download", paper_id, e)
+                continue
+            finally:
+                stats.busy_seconds += time.monotonic() - start
+            stats.processed += 1
+            await self._complete("download", paper_id)
+            await self._put(outbox, (paper_id, temp_dir, paper_path), "parse")
+
+    def _replace_pool(self, broken: ProcessPoolExecutor) -> None:
+        """Swap in a fresh parse pool, once, for a pool a crashed worker broke."""
+        if self._pool is broken:
+            broken.shutdown(wait=False, cancel_futures=True)
+            self._pool = ProcessPoolExecutor(max_workers=self.parse_workers)
+
+    async def _parse_in_pool(self, paper_path: str) -> dict:
+        pool = self._pool
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                pool, parse_paper_with_timeout, paper_path, self.parse_timeout
+            )
+        except BrokenProcessPool:
+            self._replace_pool(pool)
+            raise
+
+    async def _parse(self, inbox: asyncio.Queue, outbox: asyncio.Queue) -> None:
+        stats = self.stats["parse"]
+        while (item := await inbox.get()) is not _DONE:
+            paper_id, temp_dir, paper_path = item
+            start = time.monotonic()
+            await self._start("parse", paper_id)
+            try:
+                paper = await self._parse_in_pool(paper_path)
+                tree = await self._in_thread("parse", paper_tree, paper_id, paper)
+            except Exception as e:
+                await self._fail("parse", paper_id, e)
+                continue
+            finally:
+                shutil.rmtree(temp_dir, ignore_errors=True)
+                stats.busy_seconds += time.monotonic() - start
+            stats.processed += 1
+            await self._complete("parse", paper_id)
+            await self._put(outbox, tree, "write")
+
+    async def _run_batch(self, stage: str, func: Callable[[list[dict]], object], trees: list[dict]) -> list[dict]:
+        """Run `func` on `trees` as one batch, falling back to one by one; return the trees that passed."""
+        stats = self.stats[stage]
+        start = time.monotonic()
+        for tree in trees:
+            await self._start(stage, tree["paper"]["arxiv_id"])
+        try:
+            await self._in_thread(stage, func, trees)
+            ok = trees
+        except Exception:
+            # Isolate the failing paper(s) so one bad tree does not sink the batch.
+            ok = []
+            for tree in trees:
+                try:
+                    await self._in_thread(stage, func, [tree])
+                    ok.append(tree)
+                except Exception as e:
+                    await self._fail(stage, tree["paper"]["arxiv_id"], e)
+        finally:
+            stats.busy_seconds += time.monotonic() - start
+        stats.processed += len(ok)
+        for tree in ok:
+            await self._complete(stage, tree["paper"]["arxiv_id"])
+        return ok
+
+    async def _batches(self, inbox: asyncio.Queue):
+        """Yield up to `write_batch_size` queued trees at a time until _DONE."""
+        while True:
+            item = await inbox.get()
+            if item is _DONE:
+                return
+            batch = [item]
+            while len(batch) < self.write_batch_size and not inbox.empty():
+                item = inbox.get_nowait()
+                if item is _DONE:
+                    yield batch
+                    return
+                batch.append(item)
+            yield batch
+
+    async def _write(self, inbox: asyncio.Queue, outbox: asyncio.Queue | None) -> None:
+        async for batch in self._batches(inbox):
+            written = await self._run_batch("write", self._write_graph, batch)
+            if outbox is not None:
+                for tree in written:
+                    await self._put(outbox, tree, "embed")
+
+    async def _embed(self, inbox: asyncio.Queue) -> None:
+        from graph.vectors import embed_paper_trees
+
+        async for batch in self._batches(inbox):
+            await self._run_batch("embed", embed_paper_trees, batch)
+
+    async def _report_progress(self, callback: Callable[[list[dict]], None], interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            callback(self.snapshot())
+
+    async def run(
+        self,
+        paper_ids: Iterable[str],
+        on_progress: Callable[[list[dict]], None] | None = None,
+        progress_interval: float = 10.0,
+    ) -> BulkReport:
+        """
+        Ingest `paper_ids` through the staged pipeline.
+
+        Args:
+            paper_ids: arXiv ids, consumed lazily
+            on_progress: Called with `snapshot()` every `progress_interval` seconds
+
+        Returns:
+            BulkReport with ingested ids, per-paper failures and final stage stats
+        """
+        progress = None
+        if on_progress is not None:
+            progress = asyncio.create_task(self._report_progress(on_progress, progress_interval))
+
+        try:
+            await self._run_stages(paper_ids)
+        finally:
+            if progress is not None:
+                progress.cancel()
+        self.report.stages = self.snapshot()
+        return self.report
+
+    async def _run_stages(self, paper_ids: Iterable[str]) -> None:
+        downloads = asyncio.Queue(self.queue_size)
+        parses = asyncio.Queue(self.queue_size)
+        writes = asyncio.Queue(self.queue_size)
+        embeds = asyncio.Queue(self.queue_size) if self.embed else None
+        self._threads = {
+            stage: ThreadPoolExecutor(max_workers=stats.concurrency, thread_name_prefix=f"bulk-{stage}")
+            for stage, stats in self.stats.items()
+        }
+        self._threads["ledger"] = ThreadPoolExecutor(max_workers=1, thread_name_prefix="bulk-ledger")
+        self._pool = ProcessPoolExecutor(max_workers=self.parse_workers)
+        try:
+            await self._run_workers(paper_ids, downloads, parses, writes, embeds)
+        finally:
+            for threads in self._threads.values():
+                threads.shutdown(wait=False, cancel_futures=True)
+            self._pool.shutdown(cancel_futures=True)
+
+    async def _feed(self, paper_ids: Iterable[str], stages: list[tuple[list[asyncio.Task], asyncio.Queue]]) -> None:
+        """Queue every id, then close each stage once the one before it has drained."""
+        downloads = stages[0][1]
+        for paper_id in paper_ids:
+            await self._put(downloads, paper_id, "download")
+        for workers, queue in stages:
+            for _ in workers:
+                await queue.put(_DONE)
+            await asyncio.gather(*workers)
+
+    async def _run_workers(self, paper_ids: Iterable[str], downloads: asyncio.Queue, parses: asyncio.Queue,
+                           writes: asyncio.Queue, embeds: asyncio.Queue | None) -> None:
+        downloaders = [asyncio.create_task(self._download(downloads, parses))
+                       for _ in range(self.download_concurrency)]
+        parsers = [asyncio.create_task(self._parse(parses, writes))
+                   for _ in range(self.parse_workers)]
+        writers = [asyncio.create_task(self._write(writes, embeds))
+                   for _ in range(self.writer_concurrency)]
+        embedders = [asyncio.create_task(self._embed(embeds))
+                     for _ in range(self.embed_concurrency)]
+        stages = [(downloaders, downloads), (parsers, parses), (writers, writes), (embedders, embeds)]
+        feeder = asyncio.create_task(self._feed(paper_ids, stages))
+        tasks = [feeder, *downloaders, *parsers, *writers, *embedders]
+        try:
+            # The feeder finishes last on success; any task raising first means a
+            # stage died, and the rest would otherwise block on its queue forever.
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        for task in done:
+            if not task.cancelled() and task.exception() is not None:
+                raise task.exception()
+
+
+def ingest_papers(paper_ids: Iterable[str], **kwargs) -> BulkReport:
+    """Synchronous wrapper around `BulkIngestor(**kwargs).run(paper_ids)`."""
+    return asyncio.run(BulkIngestor(**kwargs).run(paper_ids))
+
+
+def _print_stages(stages: list[dict]) -> None:
+    for s in stages:
+        print(
+            f"{s['stage']:<9} x{s['concurrency']:<3} done {s['processed']:>7} "
+            f"failed {s['failed']:>5} {s['per_second']:>7.2f}/s "
+            f"util {s['utilization']:>5.0%} queue {s['queue_depth']:>4} (max {s['max_queue_depth']})",
+            file=sys.stderr,
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Bulk-ingest arXiv papers into Neo4j.")
+    parser.add_argument("--ids-file", required=True, help="file with one arXiv id per line")
+    parser.add_argument("--downloads", type=int, default=16)
+    parser.add_argument("--parsers", type=int, default=None)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--queue-size", type=int, default=64)
+    parser.add_argument("--parse-timeout", type=float, default=120.0, help="per-paper parse timeout in seconds")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only rewrite sections whose content hash changed")
+    parser.add_argument("--embed", action="store_true", help="also embed sections into Qdrant")
+    parser.add_argument("--embedders", type=int, default=1)
+    args = parser.parse_args()
+
+    apply_schema()
+    with open(args.ids_file) as f:
+        paper_ids = [line.strip() for line in f if line.strip()]
+    ingestor = BulkIngestor(
+        download_concurrency=args.downloads,
+        parse_workers=args.parsers,
+        writer_concurrency=args.writers,
+        write_batch_size=args.batch_size,
+        queue_size=args.queue_size,
+        parse_timeout=args.parse_timeout,
+        incremental=args.incremental,
+        embed=args.embed,
+        embed_concurrency=args.embedders,
+    )
+    report = asyncio.run(ingestor.run(paper_ids, on_progress=_print_stages))
+    _print_stages(report.stages)
+    print(f"ingested {len(report.ingested)}, failed {len(report.failures)}", file=sys.stderr)
+    for paper_id, error in report.failures.items():
+        print(f"  {paper_id}: {error}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+"""
+Persistent on-disk cache for arXiv source tarballs.
+
+Entries are keyed by versioned arXiv id (e.g. "2301.07041v2"), which is
+immutable on arXiv, so a cached tarball never goes stale. Unversioned ids are
+recorded as aliases pointing at the version that was current when the paper
+was downloaded. Aliases expire after `ALIAS_TTL_SECONDS`, after which the
+current version is looked up again, so re-ingestion picks up new versions.
+
+Layout under the cache root:
+    objects/<xx>/<sha256>.src   # raw source as served by arXiv
+    objects/<xx>/<sha256>.json  # {"key", "title", "size"}
+    aliases/<sha256>.json       # {"key", "created"} for unversioned ids
+    staging/                    # scratch space for in-flight writes
+
+Writes land in staging/ and are published with os.replace, so concurrent
+workers sharing the same root never observe a partially written entry.
+Recency is tracked through the entry mtime, which is bumped on every hit and
+used for LRU eviction once the byte budget is exceeded. Each cache keeps a
+running estimate of its size and only scans the directory when the estimate
+goes over budget; eviction then goes down to `EVICT_TARGET` of the budget so
+scans stay rare. Writes from other processes are picked up at the next scan.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+from dataclasses import dataclass
+from pathlib import Path
+
+
+DEFAULT_CACHE_DIR = os.getenv(
+    "ARXIV_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "research", "arxiv"),
+)
+DEFAULT_MAX_BYTES = int(os.getenv("ARXIV_CACHE_MAX_BYTES", str(5 * 1024**3)))
+ALIAS_TTL_SECONDS = float(os.getenv("ARXIV_ALIAS_TTL_SECONDS", str(24 * 3600)))
+# Fraction of the byte budget eviction frees down to.
+EVICT_TARGET = 0.9
+
+
+@dataclass(frozen=True)
+class CacheEntry:
+    """A cached arXiv source tarball."""
+    key: str
+    path: Path
+    title: str | None = None
+
+
+@dataclass
+class CacheStats:
+    """Per-process counters for a SourceCache."""
+    hits: int = 0
+    misses: int = 0
+    writes: int = 0
+    evictions: int = 0
+    evicted_bytes: int = 0
+
+
+def _digest(key: str) -> str:
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def write_atomic(target: Path, data: bytes, staging: Path) -> None:
+    """Write `data` to `target` via a temp file in `staging` and os.replace."""
+    fd, tmp_path = tempfile.mkstemp(dir=staging)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, target)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+
+
+def evict_lru(
+    directory: Path,
+    pattern: str,
+    max_bytes: int,
+    target_bytes: int | None = None,
+    keep: frozenset[Path] = frozenset(),
+) -> tuple[list[tuple[Path, int]], int]:
+    """Delete the least recently modified files matching `pattern` under
+    `directory` until their total size fits in `max_bytes`.
+
+    Once over `max_bytes`, files are removed until the total fits in
+    `target_bytes` (defaults to `max_bytes`). Files in `keep` are never
+    removed, and files removed concurrently by another process are skipped.
+
+    Returns:
+        (path, size) of every file this call removed, and the bytes remaining.
+    """
+    entries = []
+    total = 0
+    for path in directory.rglob(pattern):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+        total += stat.st_size
+
+    removed = []
+    if total <= max_bytes:
+        return removed, total
+    target = max_bytes if target_bytes is None else target_bytes
+    entries.sort()
+    for _, size, path in entries:
+        if total <= target:
+            break
+        if path in keep:
+            continue
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            continue
+        total -= size
+        removed.append((path, size))
+    return removed, total
+
+
+class SourceCache:
+    """LRU-bounded, multi-process safe cache of arXiv source tarballs."""
+
+    def __init__(self, root: str | None = None, max_bytes: int | None = None):
+        self.root = Path(root or DEFAULT_CACHE_DIR)
+        self.max_bytes = DEFAULT_MAX_BYTES if max_bytes is None else max_bytes
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        self._size: int | None = None
+        self._objects = self.root / "objects"
+        self._aliases = self.root / "aliases"
+        self.staging_dir = self.root / "staging"
+        for path in (self._objects, self._aliases, self.staging_dir):
+            path.mkdir(parents=True, exist_ok=True)
+
+    def _paths(self, key: str) -> tuple[Path, Path]:
+        digest = _digest(key)
+        shard = self._objects / digest[:2]
+        return shard / f"{digest}.src", shard / f"{digest}.json"
+
+    def _resolve(self, key: str) -> str:
+        try:
+            alias = json.loads((self._aliases / f"{_digest(key)}.json").read_text())
+        except (FileNotFoundError, ValueError):
+            return key
+        if time.time() - alias.get("created", 0) > ALIAS_TTL_SECONDS:
+            # Expired: make the caller look up the current version again.
+            return key
+        return alias.get("key", key)
+
+    def _load(self, key: str) -> CacheEntry | None:
+        key = self._resolve(key)
+        src_path, meta_path = self._paths(key)
+        if not src_path.exists():
+            return None
+        try:
+            meta = json.loads(meta_path.read_text())
+        except (FileNotFoundError, ValueError):
+            meta = {}
+        return CacheEntry(key=key, path=src_path, title=meta.get("title"))
+
+    def get(self, key: str) -> CacheEntry | None:
+        """Look up a versioned or aliased id, marking it recently used."""
+        entry = self._load(key)
+        if entry is not None:
+            try:
+                os.utime(entry.path)
+            except FileNotFoundError:
+                # Evicted by another worker between lookup and touch.
+                entry = None
+        with self._lock:
+            if entry is None:
+                self.stats.misses += 1
+            else:
+                self.stats.hits += 1
+        return entry
+
+    def alias(self, alias: str, key: str) -> CacheEntry | None:
+        """Point an unversioned id at a cached versioned key, if present.
+
+        The alias is valid for `ALIAS_TTL_SECONDS` from now.
+        """
+        entry = self._load(key)
+        if entry is not None and alias != key:
+            write_atomic(
+                self._aliases / f"{_digest(alias)}.json",
+                json.dumps({"key": key, "created": time.time()}).encode("utf-8"),
+                self.staging_dir,
+            )
+        return entry
+
+    def put_file(
+        self,
+        key: str,
+        source_path: str,
+        title: str | None = None,
+        aliases: list[str] | None = None,
+    ) -> CacheEntry:
+        """Move a downloaded tarball into the cache under `key`.
+
+        `source_path` should live in `staging_dir` so the final os.replace is
+        an atomic rename on the same filesystem. The new entry is never
+        evicted by its own write, even if it alone exceeds the byte budget.
+        """
+        src_path, meta_path = self._paths(key)
+        src_path.parent.mkdir(parents=True, exist_ok=True)
+        size = Path(source_path).stat().st_size
+        write_atomic(
+            meta_path,
+            json.dumps({"key": key, "title": title, "size": size}).encode("utf-8"),
+            self.staging_dir,
+        )
+        os.replace(source_path, src_path)
+        with self._lock:
+            self.stats.writes += 1
+            if self._size is not None:
+                self._size += size
+        for alias in aliases or []:
+            self.alias(alias, key)
+        if self._size is None or self._size > self.max_bytes:
+            self.evict(keep=frozenset([src_path]))
+        return CacheEntry(key=key, path=src_path, title=title)
+
+    def put(
+        self,
+        key: str,
+        data: bytes,
+        title: str | None = None,
+        aliases: list[str] | None = None,
+    ) -> CacheEntry:
+        """Store raw tarball bytes in the cache under `key`."""
+        fd, tmp_path = tempfile.mkstemp(dir=self.staging_dir)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            return self.put_file(key, tmp_path, title=title, aliases=aliases)
+        except BaseException:
+            # Already gone if put_file got as far as moving it into the cache.
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+
+    def size(self) -> int:
+        """Total bytes currently held by cached tarballs."""
+        return sum(path.stat().st_size for path in self._objects.rglob("*.src"))
+
+    def evict(self, keep: frozenset[Path] = frozenset()) -> int:
+        """Drop least recently used entries, other than `keep`, once over the byte budget.
+
+        Returns:
+            Number of bytes freed.
+        """
+        freed = 0
+        removed, remaining = evict_lru(
+            self._objects, "*.src", self.max_bytes, int(self.max_bytes * EVICT_TARGET), keep
+        )
+        with self._lock:
+            self._size = remaining
+        for path, size in removed:
+            path.with_suffix(".json").unlink(missing_ok=True)
+            freed += size
+            with self._lock:
+                self.stats.evictions += 1
+                self.stats.evicted_bytes += size
+        return freed
+
+
+_default_cache: SourceCache | None = None
+
+
+def default_cache() -> SourceCache:
+    """Process-wide cache configured from ARXIV_CACHE_DIR/ARXIV_CACHE_MAX_BYTES."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = SourceCache()
+    return _default_cache
@@ -0,0 +1,180 @@
+"""
+Bibliography parsing and corpus-wide citation resolution.
+
+`parse_bibliography` reads the bibliographies bundled with an arXiv source
+(BibTeX `.bib`, natbib/plain `.bbl` with `\\bibitem`, biblatex `.bbl` with
+`\\entry`, and inline `thebibliography` environments) into `BibEntry`
+records keyed by citation key.
+
+`canonical_citation_id` maps each entry to a canonical citation id shared
+across papers, in order of preference:
+    arxiv:<id>          # arXiv identifier, without version
+    doi:<doi>           # lowercased DOI
+    title:<hash>        # hash of the normalized title (or entry text)
+The id is a pure function of the entry, so nothing is persisted or cached,
+and a change to the resolution rules applies to every paper ingested
+afterwards.
+"""
+import hashlib
+import re
+
+from dataclasses import dataclass
+
+from ingestion.arxiv.scanner import read_group, skip_optional
+
+_ARXIV_ID = re.compile(
+    r"(?:arxiv\s*[:/]?\s*|arxiv\.org/(?:abs|pdf)/)"
+    r"(\d{4}\.\d{4,5}|[a-z\-]+(?:\.[a-z]{2})?/\d{7})(?:v\d+)?",
+    re.IGNORECASE,
+)
+_BARE_ARXIV_ID = re.compile(r"^\s*(\d{4}\.\d{4,5}|[a-z\-]+(?:\.[a-z]{2})?/\d{7})(?:v\d+)?\s*$", re.IGNORECASE)
+_DOI = re.compile(r"\b(10\.\d{4,9}/[^\s{}\",]+)", re.IGNORECASE)
+_BIB_ENTRY = re.compile(r"@\s*(\w+)\s*\{\s*([^,\s{}]+)\s*,")
+_BIB_FIELD = re.compile(r"\s*,?\s*([A-Za-z][\w\-]*)\s*=\s*")
+_BIBITEM = re.compile(r"\\bibitem(?![A-Za-z])")
+_BIBLATEX_ENTRY = re.compile(r"\\entry\s*\{([^}]+)\}")
+_BIBLATEX_FIELD = re.compile(r"\\field\s*\{(title|eprint|doi)\}")
+_BIBLATEX_VERB = re.compile(r"\\verb\s*\{(doi|eprint|url)\}\s*\\verb\s+(\S+)")
+_END_BIBLIOGRAPHY = re.compile(r"\\end\{thebibliography\}|\\endentry")
+_NEWBLOCK = re.compile(r"\\newblock(?![A-Za-z])")
+_COMMAND = re.compile(r"\\[A-Za-z@]+\*?|\\.")
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+@dataclass(frozen=True, slots=True)
+class BibEntry:
+    """A bibliography entry reduced to what citation resolution needs."""
+    key: str
+    fingerprint: str
+    title: str | None = None
+    doi: str | None = None
+    arxiv_id: str | None = None
+
+
+def normalize_title(title: str) -> str:
+    """Lowercase a title and strip LaTeX commands, braces and punctuation."""
+    title = _COMMAND.sub(" ", title.lower())
+    return _NON_WORD.sub(" ", title).strip()
+
+
+def _find_arxiv_id(*texts: str | None) -> str | None:
+    for text in texts:
+        if not text:
+            continue
+        match = _ARXIV_ID.search(text) or _BARE_ARXIV_ID.match(text)
+        if match:
+            return match.group(1).lower()
+    return None
+
+
+def _find_doi(*texts: str | None) -> str | None:
+    for text in texts:
+        if not text:
+            continue
+        match = _DOI.search(text)
+        if match:
+            return match.group(1).rstrip(".;)").lower()
+    return None
+
+
+def _entry(key: str, raw: str, title: str | None, fields: dict[str, str]) -> BibEntry:
+    fingerprint = hashlib.sha256(
+        " ".join(normalize_title(raw).split()).encode("utf-8")
+    ).hexdigest()
+    return BibEntry(
+        key=key,
+        fingerprint=fingerprint,
+        title=title.strip() if title else None,
+        doi=_find_doi(fields.get("doi"), raw),
+        arxiv_id=_find_arxiv_id(fields.get("eprint"), fields.get("arxiv"), raw),
+    )
+
+
+def _bib_value(text: str, pos: int) -> tuple[str, int]:
+    if pos < len(text) and text[pos] == "{":
+        group = read_group(text, pos)
+        if group:
+            return text[group[0]:group[1]], group[2]
+    if pos < len(text) and text[pos] == '"':
+        end = text.find('"', pos + 1)
+        end = len(text) if end < 0 else end
+        return text[pos + 1:end], end + 1
+    end = pos
+    while end < len(text) and text[end] not in ",}\n":
+        end += 1
+    return text[pos:end].strip(), end
+
+
+def parse_bib(text: str) -> dict[str, BibEntry]:
+    """Parse BibTeX entries."""
+    entries = {}
+    for match in _BIB_ENTRY.finditer(text):
+        kind, key = match.group(1).lower(), match.group(2)
+        if kind in ("string", "comment", "preamble"):
+            continue
+        group = read_group(text, text.index("{", match.start()))
+        body = text[match.end():group[1]] if group else text[match.end():]
+        fields = {}
+        pos = 0
+        while True:
+            field = _BIB_FIELD.match(body, pos)
+            if field is None:
+                break
+            value, pos = _bib_value(body, field.end())
+            fields[field.group(1).lower()] = value
+        entries[key] = _entry(key, body, fields.get("title"), fields)
+    return entries
+
+
+def parse_bbl(text: str) -> dict[str, BibEntry]:
+    """Parse `\\bibitem` (natbib/plain) and `\\entry` (biblatex) entries."""
+    entries = {}
+
+    items = list(_BIBITEM.finditer(text))
+    for idx, match in enumerate(items):
+        group = read_group(text, skip_optional(text, match.end()))
+        if group is None:
+            continue
+        key = text[group[0]:group[1]].strip()
+        stop = items[idx + 1].start() if idx + 1 < len(items) else len(text)
+        end = _END_BIBLIOGRAPHY.search(text, group[2], stop)
+        raw = text[group[2]:end.start() if end else stop]
+        blocks = [b.strip() for b in _NEWBLOCK.split(raw) if b.strip()]
+        title = blocks[1] if len(blocks) > 1 else None
+        entries[key] = _entry(key, raw, title, {})
+
+    for match in _BIBLATEX_ENTRY.finditer(text):
+        key = match.group(1).strip()
+        end = _END_BIBLIOGRAPHY.search(text, match.end())
+        raw = text[match.end():end.start() if end else len(text)]
+        fields = {}
+        for field in _BIBLATEX_FIELD.finditer(raw):
+            group = read_group(raw, field.end())
+            if group:
+                fields[field.group(1)] = raw[group[0]:group[1]]
+        for verb in _BIBLATEX_VERB.finditer(raw):
+            fields.setdefault(verb.group(1), verb.group(2))
+        entries[key] = _entry(key, raw, fields.get("title"), fields)
+
+    return entries
+
+
+def parse_bibliography(texts: list[str]) -> dict[str, BibEntry]:
+    """Parse every bibliography found in `texts`; earlier texts win on key clashes."""
+    entries = {}
+    for text in texts:
+        for key, entry in {**parse_bib(text), **parse_bbl(text)}.items():
+            entries.setdefault(key, entry)
+    return entries
+
+
+def canonical_citation_id(entry: BibEntry) -> str:
+    """Canonical, corpus-wide identifier for a bibliography entry."""
+    if entry.arxiv_id:
+        return f"arxiv:{entry.arxiv_id}"
+    if entry.doi:
+        return f"doi:{entry.doi}"
+    if entry.title and normalize_title(entry.title):
+        digest = hashlib.sha256(normalize_title(entry.title).encode("utf-8")).hexdigest()
+        return f"title:{digest[:24]}"
+    return f"title:{entry.fingerprint[:24]}"
@@ -0,0 +1,265 @@
+"""
+Parse a whole corpus of arXiv papers across a process pool.
+
+Usage:
+    python -m ingestion.arxiv.corpus --dir extracted/ [--format jsonl|cache]
+    python -m ingestion.arxiv.corpus --ids 2301.07041 2304.08467 ...
+    python -m ingestion.arxiv.corpus --ids-file ids.txt --output parsed.jsonl
+
+With `--dir`, every immediate subdirectory is one extracted paper. With
+`--ids`/`--ids-file`, sources are fetched through the source cache and
+extracted to scratch directories inside the workers.
+
+Papers are sent to workers in chunks; each paper gets its own timeout so a
+pathological file fails alone instead of stalling its chunk. With
+`--format jsonl` one JSON line per paper is written to `--output` (stdout by
+default); with `--format cache` results only land in the parse cache. A
+throughput summary and the slowest papers are printed to stderr at the end.
+"""
+import argparse
+import json
+import os
+import shutil
+import signal
+import sys
+import tempfile
+import time
+
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from ingestion.arxiv.download import download_papers
+from ingestion.arxiv.extract import extract_source
+from ingestion.arxiv.parse import parse_paper, serialize_paper
+
+
+@dataclass
+class ParseTask:
+    """One paper to parse: an extracted directory or a cached source tarball."""
+    paper_id: str
+    path: str
+    archive: bool = False
+
+
+@dataclass
+class ParseOutcome:
+    """Result of parsing one paper in a worker."""
+    paper_id: str
+    seconds: float
+    num_sections: int = 0
+    error: str | None = None
+    json_line: str | None = None
+
+
+@dataclass
+class CorpusReport:
+    """Aggregate statistics for a corpus parse."""
+    parsed: int = 0
+    failed: int = 0
+    timed_out: int = 0
+    seconds: float = 0.0
+    slowest: list[tuple[float, str]] = field(default_factory=list)
+
+    def add(self, outcome: ParseOutcome, keep_slowest: int) -> None:
+        if outcome.error is None:
+            self.parsed += 1
+        elif outcome.error.startswith("timeout"):
+            self.timed_out += 1
+        else:
+            self.failed += 1
+        self.slowest.append((outcome.seconds, outcome.paper_id))
+        self.slowest.sort(reverse=True)
+        del self.slowest[keep_slowest:]
+
+    def summary(self) -> str:
+        total = self.parsed + self.failed + self.timed_out
+        rate = total / self.seconds if self.seconds else 0.0
+        lines = [
+            f"{total} papers in {self.seconds:.1f}s ({rate:.1f} papers/sec): "
+            f"{self.parsed} parsed, {self.failed} failed, {self.timed_out} timed out",
+            "slowest:",
+        ]
+        lines += [f"  {seconds:8.2f}s  {paper_id}" for seconds, paper_id in self.slowest]
+        return "\n".join(lines)
+
+
+class _Timeout(BaseException):
+    """Raised by SIGALRM; a BaseException so parser `except Exception` blocks can't swallow it."""
+
+
+class ParseTimeout(Exception):
+    """A paper took longer than its per-paper timeout."""
+
+
+def _alarm(signum, frame) -> None:
+    raise _Timeout
+
+
+@contextmanager
+def time_limit(seconds: float):
+    """
+    Raise `ParseTimeout` if the block runs longer than `seconds`.
+
+    Uses SIGALRM, so it only applies in the main thread of a process (e.g. a
+    pool worker) and is a no-op where the signal is unavailable or `seconds`
+    is 0.
+    """
+    if seconds <= 0 or not hasattr(signal, "SIGALRM"):
+        yield
+        return
+    signal.signal(signal.SIGALRM, _alarm)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    except _Timeout:
+        raise ParseTimeout(f"timeout after {seconds}s") from None
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+def parse_paper_with_timeout(paper_path: str, timeout: float) -> dict:
+    """`parse_paper` under `time_limit(timeout)`, for running in a pool worker."""
+    with time_limit(timeout):
+        return parse_paper(paper_path)
+
+
+def _parse_one(task: ParseTask, timeout: float, emit_json: bool) -> ParseOutcome:
+    start = time.perf_counter()
+    scratch = None
+    try:
+        with time_limit(timeout):
+            path = task.path
+            if task.archive:
+                scratch = tempfile.mkdtemp(prefix="arxiv_corpus_")
+                extract_source(task.path, scratch)
+                path = scratch
+            paper = parse_paper(path)
+        json_line = None
+        if emit_json:
+            json_line = json.dumps({"paper_id": task.paper_id, **serialize_paper(paper)})
+        return ParseOutcome(
+            task.paper_id,
+            time.perf_counter() - start,
+            num_sections=paper["num_sections"],
+            json_line=json_line,
+        )
+    except ParseTimeout as e:
+        return ParseOutcome(task.paper_id, time.perf_counter() - start, error=str(e))
+    except Exception as e:
+        return ParseOutcome(task.paper_id, time.perf_counter() - start, error=f"{type(e).__name__}: {e!s}")
+    finally:
+        if scratch:
+            shutil.rmtree(scratch, ignore_errors=True)
+
+
+def _parse_chunk(tasks: list[ParseTask], timeout: float, emit_json: bool) -> list[ParseOutcome]:
+    return [_parse_one(task, timeout, emit_json) for task in tasks]
+
+
+def tasks_from_dir(directory: str) -> Iterator[ParseTask]:
+    """One task per extracted paper directory under `directory`."""
+    for path in sorted(Path(directory).iterdir()):
+        if path.is_dir():
+            yield ParseTask(path.name, str(path))
+
+
+def tasks_from_ids(paper_ids: Iterable[str]) -> Iterator[ParseTask]:
+    """One task per paper id, downloading sources into the cache as needed."""
+    for result in download_papers(paper_ids):
+        if result.entry is None:
+            print(f"skipping {result.paper_id}: {result.error}", file=sys.stderr)
+            continue
+        yield ParseTask(result.paper_id, str(result.entry.path), archive=True)
+
+
+def _chunks(tasks: Iterable[ParseTask], size: int) -> Iterator[list[ParseTask]]:
+    chunk = []
+    for task in tasks:
+        chunk.append(task)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def parse_corpus(
+    tasks: Iterable[ParseTask],
+    workers: int | None = None,
+    chunk_size: int = 8,
+    timeout: float = 120.0,
+    emit_json: bool = True,
+) -> Iterator[ParseOutcome]:
+    """
+    Fan `parse_paper` out over a process pool, yielding outcomes as they finish.
+
+    At most two chunks per worker are in flight, so memory stays bounded no
+    matter how many tasks `tasks` produces.
+
+    Args:
+        tasks: Papers to parse
+        workers: Number of worker processes, defaults to the CPU count
+        chunk_size: Papers per task sent to a worker
+        timeout: Per-paper timeout in seconds, 0 to disable
+        emit_json: Serialize each parsed paper to a JSON line in the worker
+    """
+    workers = workers or os.cpu_count() or 1
+    chunks = _chunks(tasks, chunk_size)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        for chunk in chunks:
+            pending.add(pool.submit(_parse_chunk, chunk, timeout, emit_json))
+            if len(pending) < workers * 2:
+                continue
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from future.result()
+        for future in pending:
+            yield from future.result()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Parse a corpus of arXiv papers in parallel.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--dir", help="directory with one extracted paper per subdirectory")
+    source.add_argument("--ids", nargs="+", help="arXiv ids to fetch and parse")
+    source.add_argument("--ids-file", help="file with one arXiv id per line")
+    parser.add_argument("--format", choices=["jsonl", "cache"], default="jsonl")
+    parser.add_argument("--output", help="JSON lines output file, defaults to stdout")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=8)
+    parser.add_argument("--timeout", type=float, default=120.0, help="per-paper timeout in seconds")
+    parser.add_argument("--slowest", type=int, default=10, help="number of slowest papers to report")
+    args = parser.parse_args()
+
+    if args.dir:
+        tasks = tasks_from_dir(args.dir)
+    elif args.ids:
+        tasks = tasks_from_ids(args.ids)
+    else:
+        with open(args.ids_file) as f:
+            tasks = tasks_from_ids([line.strip() for line in f if line.strip()])
+
+    emit_json = args.format == "jsonl"
+    out = open(args.output, "w") if emit_json and args.output else sys.stdout  # noqa: SIM115
+    report = CorpusReport()
+    start = time.perf_counter()
+    try:
+        for outcome in parse_corpus(tasks, args.workers, args.chunk_size, args.timeout, emit_json):
+            report.add(outcome, args.slowest)
+            if outcome.error:
+                print(f"{outcome.paper_id}: {outcome.error}", file=sys.stderr)
+            elif outcome.json_line:
+                out.write(outcome.json_line + "\n")
+    finally:
+        report.seconds = time.perf_counter() - start
+        if out is not sys.stdout:
+            out.close()
+    print(report.summary(), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
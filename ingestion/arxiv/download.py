@@ -1,50 +1,276 @@
 import os
+import re
+import shutil
 import tempfile
-import tarfile
+import threading
+import time
+
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+
+import requests
 
 from arxiv import (
     Client as ArxivClient,
     Search,
 )
+from requests.adapters import HTTPAdapter
+
+from ingestion.arxiv.cache import CacheEntry, SourceCache, default_cache
+from ingestion.arxiv.extract import PARSER_SUFFIXES, extract_source
+
+SOURCE_URL = os.getenv("ARXIV_SOURCE_URL", "https://export.arxiv.org/src/{}")
+MAX_REQUESTS_PER_SECOND = float(os.getenv("ARXIV_MAX_REQUESTS_PER_SECOND", "4"))
+MAX_RETRIES = 3
+RETRY_BACKOFF_SECONDS = 1.0
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
 
 def _normalize_paper_id(paper_id: str) -> str:
     return paper_id.replace("arxiv:", "").strip()
 
-def download_paper(paper_id: str) -> tuple[str, str, str]:
+def _strip_version(paper_id: str) -> str:
+    return re.sub(r"v\d+$", "", paper_id)
+
+
+@dataclass
+class DownloadResult:
+    """Outcome of one paper in a bulk download."""
+    paper_id: str
+    entry: CacheEntry | None = None
+    error: str | None = None
+
+
+class RateLimiter:
+    """Thread-safe limiter spacing request starts to a max rate."""
+
+    def __init__(self, max_per_second: float):
+        self.interval = 1.0 / max_per_second if max_per_second > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+_default_limiter: RateLimiter | None = None
+_default_limiter_lock = threading.Lock()
+
+
+def default_limiter() -> RateLimiter:
+    """Process-wide limiter shared by every single-paper download."""
+    global _default_limiter
+    with _default_limiter_lock:
+        if _default_limiter is None:
+            _default_limiter = RateLimiter(MAX_REQUESTS_PER_SECOND)
+    return _default_limiter
+
+
+def _session(pool_size: int) -> requests.Session:
+    # No adapter-level retries: they would bypass the rate limiter, so
+    # `_get_source` retries itself.
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+def _get_source(session: requests.Session, url: str, limiter: RateLimiter) -> requests.Response:
+    """GET `url` as a stream, retrying throttled and failed requests through `limiter`."""
+    for attempt in range(MAX_RETRIES + 1):
+        limiter.wait()
+        try:
+            response = session.get(url, stream=True, timeout=60)
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt == MAX_RETRIES:
+                raise
+            time.sleep(RETRY_BACKOFF_SECONDS * 2**attempt)
+            continue
+        if response.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+            if not response.ok:
+                # The error carries the response; release its pooled connection first.
+                response.close()
+                response.raise_for_status()
+            return response
+        delay = RETRY_BACKOFF_SECONDS * 2**attempt
+        retry_after = response.headers.get("Retry-After", "")
+        if retry_after.isdigit():
+            delay = max(delay, float(retry_after))
+        response.close()
+        time.sleep(delay)
+
+def fetch_source(paper_id: str, cache: SourceCache | None = None, limiter: RateLimiter | None = None):
+    """
+    Return the cached source tarball for a paper, downloading it on a miss.
+
+    Args:
+        paper_id: The arXiv paper ID, with or without a version suffix
+        cache: Source cache to use, defaults to the process-wide cache
+        limiter: Limiter spacing requests to arXiv, defaults to the
+            process-wide one so concurrent callers share one request budget
+
+    Returns:
+        CacheEntry: the cached tarball and the paper title
+    """
+    cache = cache or default_cache()
+    limiter = limiter or default_limiter()
+    paper_id = _normalize_paper_id(paper_id)
+
+    entry = cache.get(paper_id)
+    if entry is not None:
+        return entry
+
+    limiter.wait()
+    paper = next(ArxivClient(delay_seconds=0).results(Search(id_list=[paper_id])))
+    with _session(1) as session:
+        return _fetch_to_cache(paper_id, paper, session, limiter, cache)
+
+def _resolve_metadata(paper_ids: list[str], limiter: RateLimiter, batch_size: int) -> Iterator[tuple[str, object]]:
+    """Yield (requested_id, arxiv.Result | None) using batched id_list queries."""
+    client = ArxivClient(page_size=batch_size, delay_seconds=0)
+    for start in range(0, len(paper_ids), batch_size):
+        batch = paper_ids[start:start + batch_size]
+        limiter.wait()
+        found = {}
+        for paper in client.results(Search(id_list=batch, max_results=len(batch))):
+            short_id = paper.get_short_id()
+            found[short_id] = paper
+            found.setdefault(_strip_version(short_id), paper)
+        for paper_id in batch:
+            yield paper_id, found.get(paper_id)
+
+def _fetch_to_cache(
+    paper_id: str,
+    paper,
+    session: requests.Session,
+    limiter: RateLimiter,
+    cache: SourceCache,
+) -> CacheEntry:
+    key = paper.get_short_id()
+    entry = cache.alias(paper_id, key)
+    if entry is not None:
+        return entry
+
+    fd, tmp_path = tempfile.mkstemp(dir=cache.staging_dir)
+    try:
+        with os.fdopen(fd, "wb") as f, _get_source(session, SOURCE_URL.format(key), limiter) as response:
+            for chunk in response.iter_content(chunk_size=1 << 16):
+                f.write(chunk)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return cache.put_file(key, tmp_path, title=paper.title, aliases=[paper_id])
+
+def download_papers(
+    paper_ids: Iterable[str],
+    max_workers: int = 8,
+    batch_size: int = 100,
+    cache: SourceCache | None = None,
+    limiter: RateLimiter | None = None,
+) -> Iterator[DownloadResult]:
+    """
+    Download the sources of many arXiv papers into the source cache.
+
+    Cached papers are yielded immediately. The rest are resolved in batched
+    `id_list` queries and fetched concurrently over one pooled HTTP session,
+    with every request to arXiv spaced by the same rate limiter as
+    single-paper downloads, so running both never exceeds the arXiv budget. Results are
+    yielded in completion order; failures are reported, not raised.
+
+    Args:
+        paper_ids: arXiv paper IDs, with or without version suffix
+        max_workers: Number of concurrent source downloads
+        batch_size: Number of ids per metadata query
+        cache: Source cache to use, defaults to the process-wide cache
+        limiter: Limiter spacing requests to arXiv, defaults to the
+            process-wide one
+
+    Yields:
+        DownloadResult: one per requested id
+    """
+    cache = cache or default_cache()
+    limiter = limiter or default_limiter()
+
+    pending = []
+    for paper_id in dict.fromkeys(_normalize_paper_id(p) for p in paper_ids):
+        entry = cache.get(paper_id)
+        if entry is not None:
+            yield DownloadResult(paper_id, entry=entry)
+        else:
+            pending.append(paper_id)
+    if not pending:
+        return
+
+    with _session(max_workers) as session, ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {}
+        resolved = set()
+        try:
+            for paper_id, paper in _resolve_metadata(pending, limiter, batch_size):
+                resolved.add(paper_id)
+                if paper is None:
+                    yield DownloadResult(paper_id, error="Paper not found on arXiv")
+                    continue
+                futures[pool.submit(_fetch_to_cache, paper_id, paper, session, limiter, cache)] = paper_id
+        except Exception as e:
+            for paper_id in pending:
+                if paper_id not in resolved:
+                    yield DownloadResult(paper_id, error=f"Error resolving metadata: {e!s}")
+
+        for future in as_completed(futures):
+            paper_id = futures[future]
+            try:
+                yield DownloadResult(paper_id, entry=future.result())
+            except Exception as e:
+                yield DownloadResult(paper_id, error=f"Error downloading paper: {e!s}")
+
+def download_paper(
+    paper_id: str,
+    cache: SourceCache | None = None,
+    suffixes: tuple[str, ...] | None = PARSER_SUFFIXES,
+) -> tuple[str, str, str]:
     """
     Download the LaTeX source of an arXiv paper to a temporary directory.
+
+    The source tarball is served from the local source cache when available,
+    so only the first download of a given paper version touches the network.
+    It is decompressed in a single streaming pass and only members matching
+    `suffixes` are written out. The caller owns `temp_dir` and should remove
+    it once done.
     
     Args:
         paper_id: The arXiv paper ID (e.g., "2301.07041")
+        cache: Source cache to use, defaults to the process-wide cache
+        suffixes: File suffixes to extract, or None to extract everything
     
     Returns:
         Tuple[str, str, str]: (temp_dir, extracted_source_dir, paper_title)
     """
+    temp_dir = None
     try:    
-        paper = next(ArxivClient().results(Search(id_list=[_normalize_paper_id(paper_id)])))
+        entry = fetch_source(paper_id, cache)
 
         temp_dir = tempfile.mkdtemp(prefix="arxiv_latex_")
         
-        source_path = paper.download_source(dirpath=temp_dir, filename=f"{paper_id}_source.tar.gz")
-        
-        extract_subdir = os.path.join(temp_dir, paper_id)
+        extract_subdir = os.path.join(temp_dir, _normalize_paper_id(paper_id))
         os.makedirs(extract_subdir, exist_ok=True)
         
-        with tarfile.open(source_path, 'r:gz') as tar:
-            tar.extractall(path=extract_subdir, filter='data')
-        
-        with tarfile.open(source_path, 'r') as tar:
-            tar.extractall(path=extract_subdir, filter='data')
-        
-        os.remove(source_path)
+        extract_source(entry.path, extract_subdir, suffixes)
 
     except Exception as e:
+        if temp_dir is not None:
+            shutil.rmtree(temp_dir, ignore_errors=True)
         raise ValueError(f"Error downloading paper: {e!s}")
     else:
-        return temp_dir, extract_subdir, paper.title
+        return temp_dir, extract_subdir, entry.title
 
 if __name__ == "__main__":
-    temp_dir, extract_subdir, paper_title = download_arxiv_source("2304.08467")
+    temp_dir, extract_subdir, paper_title = download_paper("2304.08467")
     print(f"Downloaded paper to {temp_dir}")
     print(f"Extracted source to {extract_subdir}")
-    print(f"Paper title: {paper_title}")
\ No newline at end of file
+    print(f"Paper title: {paper_title}")
+    print(f"Cache stats: {default_cache().stats}")
@@ -0,0 +1,205 @@
+"""
+Export parsed papers as CSV files for Neo4j's offline bulk importer.
+
+Transactional MERGEs are the slowest way to do a first load. This writes the
+PAPER/SECTION/FORMULA/CITATION graph documented in `graph.insert.operations`
+as `neo4j-admin database import full` input instead:
+
+    papers.csv          arxiv_id:ID(PAPER), title, authors:string[], abstract, url, outline, ingested_at:datetime
+    sections.csv        section_id:ID(SECTION), paper_id, path, title, content, content_hash
+    formulas.csv        formula_id:ID(FORMULA), latex
+    citations.csv       citation_id:ID(CITATION), citation_key, title, doi, arxiv_id
+    within.csv          (:SECTION) - [:WITHIN] -> (:PAPER)
+    left_child.csv      (:SECTION) - [:LEFT_CHILD] -> (:SECTION)
+    right_sibling.csv   (:SECTION) - [:RIGHT_SIBLING] -> (:SECTION)
+    used_in.csv         (:FORMULA) - [:USED_IN] -> (:SECTION)
+    cited_in.csv        (:CITATION) - [:CITED_IN] -> (:SECTION)
+
+Rows come from `paper_tree`, so ids match what `ingest_paper` writes. Citation
+ids are a pure function of each entry, so workers build rows without shared
+state. Rows are streamed paper by paper and nothing is kept
+across papers: formulas and citations shared between papers are written once
+per paper and collapsed by the importer's --skip-duplicate-nodes. Run
+`python -m graph.schema apply` on the imported database afterwards.
+
+Usage:
+    python -m ingestion.arxiv.export --dir extracted/ --output import/ [--workers N]
+"""
+import argparse
+import csv
+import os
+import sys
+import time
+
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from datetime import UTC, datetime
+from pathlib import Path
+
+from ingestion.arxiv.corpus import tasks_from_dir
+from ingestion.arxiv.parse import parse_paper
+from ingestion.arxiv.pipeline import paper_tree
+
+ARRAY_DELIMITER = ";"
+
+NODE_FILES = {
+    "PAPER": ("papers.csv", ["arxiv_id:ID(PAPER)", "title", "authors:string[]", "abstract", "url", "outline", "ingested_at:datetime"]),
+    "SECTION": ("sections.csv", ["section_id:ID(SECTION)", "paper_id", "path", "title", "content", "content_hash"]),
+    "FORMULA": ("formulas.csv", ["formula_id:ID(FORMULA)", "latex"]),
+    "CITATION": ("citations.csv", ["citation_id:ID(CITATION)", "citation_key", "title", "doi", "arxiv_id"]),
+}
+RELATIONSHIP_FILES = {
+    "WITHIN": ("within.csv", [":START_ID(SECTION)", ":END_ID(PAPER)"]),
+    "LEFT_CHILD": ("left_child.csv", [":START_ID(SECTION)", ":END_ID(SECTION)"]),
+    "RIGHT_SIBLING": ("right_sibling.csv", [":START_ID(SECTION)", ":END_ID(SECTION)"]),
+    "USED_IN": ("used_in.csv", [":START_ID(FORMULA)", ":END_ID(SECTION)"]),
+    "CITED_IN": ("cited_in.csv", [":START_ID(CITATION)", ":END_ID(SECTION)"]),
+}
+
+
+class BulkImportWriter:
+    """Append paper trees to the bulk-import CSV files under `directory`."""
+
+    def __init__(self, directory: str | Path):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.counts = dict.fromkeys([*NODE_FILES, *RELATIONSHIP_FILES], 0)
+        self.exported_at = datetime.now(UTC).isoformat()
+        self._files = []
+        self._writers = {}
+        for name, (filename, header) in {**NODE_FILES, **RELATIONSHIP_FILES}.items():
+            f = open(self.directory / filename, "w", newline="", encoding="utf-8")  # noqa: SIM115
+            self._files.append(f)
+            writer = csv.writer(f, quoting=csv.QUOTE_MINIMAL)
+            writer.writerow(header)
+            self._writers[name] = writer
+
+    def _write(self, name: str, rows: list) -> None:
+        self._writers[name].writerows(rows)
+        self.counts[name] += len(rows)
+
+    def write_tree(self, tree: dict) -> None:
+        """Write the rows of one `paper_tree` result."""
+        paper = tree["paper"]
+        authors = ARRAY_DELIMITER.join(a.replace(ARRAY_DELIMITER, ",") for a in paper["authors"])
+        self._write("PAPER", [[
+            paper["arxiv_id"], paper["title"], authors, paper["abstract"],
+            f"https://arxiv.org/abs/{paper['arxiv_id']}", paper["outline"], self.exported_at,
+        ]])
+        self._write("SECTION", [
+            [s["section_id"], s["paper_id"], s["path"], s["title"], s["content"], s["content_hash"]]
+            for s in tree["sections"]
+        ])
+        self._write("WITHIN", [
+            [s["section_id"], paper["arxiv_id"]] for s in tree["sections"] if s["top_level"]
+        ])
+        self._write("LEFT_CHILD", [[r["parent"], r["child"]] for r in tree["children"]])
+        self._write("RIGHT_SIBLING", [[r["left"], r["right"]] for r in tree["siblings"]])
+
+        # Shared nodes are deduplicated within the paper; the importer drops
+        # repeats across papers.
+        formulas = {r["formula_id"]: r["latex"] for r in tree["formulas"]}
+        self._write("FORMULA", [[formula_id, latex] for formula_id, latex in formulas.items()])
+        self._write("USED_IN", sorted({(r["formula_id"], r["section_id"]) for r in tree["formulas"]}))
+
+        citations = {r["citation_id"]: r for r in tree["citations"]}
+        self._write("CITATION", [
+            [r["citation_id"], r["citation_key"], r["title"], r["doi"], r["arxiv_id"]]
+            for r in citations.values()
+        ])
+        self._write("CITED_IN", sorted({(r["citation_id"], r["section_id"]) for r in tree["citations"]}))
+
+    def import_command(self, database: str = "neo4j") -> str:
+        """The `neo4j-admin` invocation that loads the written files."""
+        args = ["neo4j-admin database import full", database]
+        args += [f"--nodes={label}={self.directory / f}" for label, (f, _) in NODE_FILES.items()]
+        args += [f"--relationships={rel}={self.directory / f}" for rel, (f, _) in RELATIONSHIP_FILES.items()]
+        args += [
+            f"--array-delimiter='{ARRAY_DELIMITER}'",
+            "--multiline-fields=true",
+            "--skip-duplicate-nodes=true",
+        ]
+        return " \\\n    ".join(args)
+
+    def close(self) -> None:
+        for f in self._files:
+            f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def export_papers(papers: Iterable[tuple[str, dict]], directory: str | Path) -> BulkImportWriter:
+    """
+    Write parsed papers as bulk-import CSV files.
+
+    Args:
+        papers: (arxiv_id, `parse_paper` output) pairs
+        directory: Output directory for the CSV files
+
+    Returns:
+        The closed writer, for its row counts and `import_command`
+    """
+    with BulkImportWriter(directory) as writer:
+        for paper_id, paper in papers:
+            if paper["sections"]:
+                writer.write_tree(paper_tree(paper_id, paper))
+    return writer
+
+
+def _tree(paper_id: str, path: str) -> dict | str:
+    try:
+        return paper_tree(paper_id, parse_paper(path))
+    except Exception as e:
+        return f"{paper_id}: {type(e).__name__}: {e!s}"
+
+
+def trees_from_dir(directory: str, workers: int | None = None) -> Iterator[dict | str]:
+    """
+    Parse every extracted paper under `directory` across a process pool,
+    yielding `paper_tree` rows, or an error string, in directory order.
+
+    At most a few trees per worker are in flight, so memory stays bounded
+    regardless of corpus size, and the output order is deterministic.
+    """
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        window = deque()
+        for task in tasks_from_dir(directory):
+            window.append(pool.submit(_tree, task.paper_id, task.path))
+            if len(window) >= workers * 4:
+                yield window.popleft().result()
+        while window:
+            yield window.popleft().result()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export parsed papers for neo4j-admin import.")
+    parser.add_argument("--dir", required=True, help="directory with one extracted paper per subdirectory")
+    parser.add_argument("--output", required=True, help="directory for the CSV files")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--database", default="neo4j")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    failed = 0
+    with BulkImportWriter(args.output) as writer:
+        for tree in trees_from_dir(args.dir, args.workers):
+            if isinstance(tree, str):
+                failed += 1
+                print(tree, file=sys.stderr)
+            else:
+                writer.write_tree(tree)
+    elapsed = time.perf_counter() - start
+
+    counts = ", ".join(f"{count} {name}" for name, count in writer.counts.items())
+    print(f"exported in {elapsed:.1f}s ({failed} failed): {counts}", file=sys.stderr)
+    print(writer.import_command(args.database))
+
+
+if __name__ == "__main__":
+    main()
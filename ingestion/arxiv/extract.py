@@ -0,0 +1,130 @@
+"""
+Single-pass, selective extraction of arXiv source archives.
+
+arXiv serves sources either as a gzipped tarball, a single gzipped .tex file,
+or (rarely) an uncompressed tarball. The format is sniffed from the first
+bytes, then the archive is decompressed exactly once as a stream and only the
+members the parser reads are kept. Figures and PDFs are skipped without being
+written anywhere.
+"""
+import gzip
+import io
+import posixpath
+import tarfile
+
+from collections.abc import Iterator
+from pathlib import Path
+
+
+PARSER_SUFFIXES = (".tex", ".bbl", ".bib", ".sty")
+SINGLE_FILE_NAME = "main.tex"
+
+_GZIP_MAGIC = b"\x1f\x8b"
+_PDF_MAGIC = b"%PDF"
+
+
+class _Prefixed(io.RawIOBase):
+    """Readable stream that replays already consumed bytes before the rest."""
+
+    def __init__(self, head: bytes, fileobj):
+        self._head = memoryview(head)
+        self._fileobj = fileobj
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if self._head:
+            n = min(len(buffer), len(self._head))
+            buffer[:n] = self._head[:n]
+            self._head = self._head[n:]
+            return n
+        data = self._fileobj.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+
+def _is_tar_header(block: bytes) -> bool:
+    if len(block) < tarfile.BLOCKSIZE:
+        return False
+    try:
+        tarfile.TarInfo.frombuf(block[:tarfile.BLOCKSIZE], "utf-8", "surrogateescape")
+    except tarfile.HeaderError:
+        return False
+    return True
+
+
+def _wanted(name: str, suffixes: tuple[str, ...] | None) -> bool:
+    return suffixes is None or name.lower().endswith(suffixes)
+
+
+def iter_source_members(
+    source_path: str,
+    suffixes: tuple[str, ...] | None = PARSER_SUFFIXES,
+) -> Iterator[tuple[str, bytes]]:
+    """
+    Stream the members of an arXiv source archive in one decompression pass.
+
+    Args:
+        source_path: Path to the source as downloaded from arXiv
+        suffixes: File suffixes to keep, or None to keep every regular file
+
+    Yields:
+        Tuple[str, bytes]: (relative member name, member contents)
+    """
+    with open(source_path, "rb") as raw:
+        magic = raw.read(len(_PDF_MAGIC))
+        raw.seek(0)
+        if magic.startswith(_PDF_MAGIC):
+            raise ValueError("arXiv only provides a PDF for this paper, no LaTeX source")
+
+        stream = gzip.GzipFile(fileobj=raw) if magic.startswith(_GZIP_MAGIC) else raw
+        head = stream.read(tarfile.BLOCKSIZE)
+
+        if not _is_tar_header(head):
+            if _wanted(SINGLE_FILE_NAME, suffixes):
+                yield SINGLE_FILE_NAME, head + stream.read()
+            return
+
+        with tarfile.open(fileobj=io.BufferedReader(_Prefixed(head, stream)), mode="r|") as tar:
+            for member in tar:
+                if not member.isfile() or not _wanted(member.name, suffixes):
+                    continue
+                name = posixpath.normpath(tarfile.data_filter(member, "/").name.lstrip("/"))
+                yield name, tar.extractfile(member).read()
+
+
+def read_source_members(
+    source_path: str,
+    suffixes: tuple[str, ...] | None = PARSER_SUFFIXES,
+) -> dict[str, bytes]:
+    """Load the parser-relevant members of an arXiv source archive in memory."""
+    return dict(iter_source_members(source_path, suffixes))
+
+
+def extract_source(
+    source_path: str,
+    dest_dir: str,
+    suffixes: tuple[str, ...] | None = PARSER_SUFFIXES,
+) -> list[Path]:
+    """
+    Extract the parser-relevant members of an arXiv source archive.
+
+    Args:
+        source_path: Path to the source as downloaded from arXiv
+        dest_dir: Directory to write the kept members into
+        suffixes: File suffixes to keep, or None to keep every regular file
+
+    Returns:
+        List[Path]: paths of the written files
+    """
+    dest = Path(dest_dir).resolve()
+    written = []
+    for name, data in iter_source_members(source_path, suffixes):
+        target = (dest / name).resolve()
+        if not target.is_relative_to(dest):
+            raise ValueError(f"Archive member {name!r} escapes {dest}")
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(data)
+        written.append(target)
+    return written
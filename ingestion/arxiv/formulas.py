@@ -0,0 +1,67 @@
+"""
+Formula extraction and normalization.
+
+Math spans come from `scan_latex` (inline `$...$`/`\\(...\\)`, display
+`$$...$$`/`\\[...\\]` and math environments such as `equation` and `align`).
+Each one is normalized so that cosmetic differences (spacing, labels,
+alignment markers, sizing macros, trailing punctuation) do not matter, and
+its `formula_id` is a hash of the normalized LaTeX. The same formula therefore
+maps to the same FORMULA node in every section and every paper.
+"""
+import hashlib
+import re
+
+from dataclasses import dataclass
+
+from ingestion.arxiv.scanner import MathSpan
+
+MIN_FORMULA_LENGTH = 3
+
+_LABEL = re.compile(r"\\(?:label|tag)\*?\s*\{[^{}]*\}")
+_NOISE = re.compile(
+    r"(?<!\\)\\(?:nonumber|notag|displaystyle|textstyle|scriptstyle|limits"
+    r"|nolimits|left|right|middle|[bB]igg?[lrm]?|q?quad)(?![A-Za-z])"
+    r"|(?<!\\)\\[,;:! ]|(?<!\\)[&~]"
+)
+_WHITESPACE = re.compile(r"\s+")
+_SPACE_BETWEEN_SYMBOLS = re.compile(r"(?<![A-Za-z]) | (?![A-Za-z])")
+_TRAILING_PUNCTUATION = re.compile(r"(?:\s|\\\\|[.,;])+$")
+
+
+@dataclass(frozen=True, slots=True)
+class Formula:
+    """A normalized formula and its content hash."""
+    formula_id: str
+    latex: str
+
+
+def normalize_formula(latex: str) -> str:
+    """Normalize formula LaTeX so equivalent spellings compare equal."""
+    latex = _LABEL.sub("", latex)
+    latex = _NOISE.sub(" ", latex)
+    latex = _TRAILING_PUNCTUATION.sub("", latex)
+    latex = _WHITESPACE.sub(" ", latex).strip()
+    return _SPACE_BETWEEN_SYMBOLS.sub("", latex)
+
+
+def formula_id(normalized: str) -> str:
+    """Stable id for a normalized formula."""
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()[:32]
+
+
+def extract_formula(text: str, span: MathSpan) -> Formula | None:
+    """Build the Formula for a math span, or None when it is trivial."""
+    normalized = normalize_formula(text[span.content_start:span.content_end])
+    if len(normalized) < MIN_FORMULA_LENGTH:
+        return None
+    return Formula(formula_id(normalized), normalized)
+
+
+def extract_formulas(text: str, spans: list[MathSpan]) -> list[Formula]:
+    """Extract the distinct formulas of `spans`, in first-occurrence order."""
+    formulas = {}
+    for span in spans:
+        formula = extract_formula(text, span)
+        if formula is not None:
+            formulas.setdefault(formula.formula_id, formula)
+    return list(formulas.values())
@@ -0,0 +1,346 @@
+"""
+Resumable job ledger for bulk ingestion.
+
+Every paper handed to the bulk pipeline gets a row in a local SQLite table
+recording which stage it reached, how often it failed and why:
+
+    jobs(paper_id, status, stage, attempts, error, next_attempt_at,
+         downloaded_at, parsed_at, written_at, embedded_at, updated_at)
+
+`status` is one of:
+    pending   # not started, or interrupted mid-flight
+    running   # currently in a pipeline stage
+    retry     # failed transiently, eligible again at next_attempt_at
+    failed    # failed permanently or ran out of attempts
+    done      # written to the graph (and embedded, when embedding)
+
+Restarting only re-runs papers that are not done. Downloads and parses are
+cached on disk (see `ingestion.arxiv.cache` and `ingestion.arxiv.parse_cache`),
+so a paper interrupted after parsing replays its first two stages from cache
+in milliseconds. Transient arXiv/Neo4j errors are retried with exponential
+backoff; deterministic failures such as unparseable sources are not.
+
+Usage:
+    python -m ingestion.arxiv.ledger run --ids-file ids.txt [bulk options]
+    python -m ingestion.arxiv.ledger run            # resume
+    python -m ingestion.arxiv.ledger summary
+    python -m ingestion.arxiv.ledger requeue        # give failed papers another go
+"""
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import sys
+import threading
+import time
+
+from collections.abc import Iterable
+from concurrent.futures.process import BrokenProcessPool
+
+from arxiv import HTTPError as ArxivHTTPError, UnexpectedEmptyPageError
+from neo4j.exceptions import ServiceUnavailable, SessionExpired, TransientError
+from requests.exceptions import ConnectionError as RequestsConnectionError, HTTPError, Timeout
+
+DEFAULT_LEDGER_PATH = os.getenv(
+    "INGEST_LEDGER_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "research", "ingest_ledger.sqlite3"),
+)
+DEFAULT_MAX_ATTEMPTS = int(os.getenv("INGEST_MAX_ATTEMPTS", "5"))
+BACKOFF_BASE_SECONDS = 30.0
+BACKOFF_MAX_SECONDS = 3600.0
+
+STAGES = ("download", "parse", "write", "embed")
+STAGE_COLUMNS = {
+    "download": "downloaded_at",
+    "parse": "parsed_at",
+    "write": "written_at",
+    "embed": "embedded_at",
+}
+TRANSIENT_ERRORS = (
+    ConnectionError,
+    TimeoutError,
+    UnexpectedEmptyPageError,
+    RequestsConnectionError,
+    Timeout,
+    ServiceUnavailable,
+    SessionExpired,
+    TransientError,
+    # A crashed parse worker takes down every paper in flight with it.
+    BrokenProcessPool,
+)
+
+
+def _http_status(error: BaseException) -> int | None:
+    if isinstance(error, ArxivHTTPError):
+        return error.status
+    if isinstance(error, HTTPError) and error.response is not None:
+        return error.response.status_code
+    return None
+
+
+def is_transient(error: BaseException) -> bool:
+    """
+    Whether `error`, or any exception it was raised from, is worth retrying.
+
+    HTTP errors only count for 429 and 5xx; any other 4xx will not change on retry.
+    """
+    seen = set()
+    while error is not None and id(error) not in seen:
+        if isinstance(error, TRANSIENT_ERRORS):
+            return True
+        status = _http_status(error)
+        if status is not None and (status == 429 or status >= 500):
+            return True
+        seen.add(id(error))
+        error = error.__cause__ or error.__context__
+    return False
+
+
+def backoff_seconds(attempts: int) -> float:
+    """Exponential backoff with full jitter for the given attempt count."""
+    return random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** (attempts - 1)))  # noqa: S311
+
+
+class JobLedger:
+    """SQLite-backed per-paper stage status for bulk ingestion."""
+
+    def __init__(self, path: str | None = None, max_attempts: int = DEFAULT_MAX_ATTEMPTS):
+        self.path = path or DEFAULT_LEDGER_PATH
+        self.max_attempts = max_attempts
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " paper_id TEXT PRIMARY KEY,"
+            " status TEXT NOT NULL DEFAULT 'pending',"
+            " stage TEXT,"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " error TEXT,"
+            " next_attempt_at REAL NOT NULL DEFAULT 0,"
+            " downloaded_at REAL,"
+            " parsed_at REAL,"
+            " written_at REAL,"
+            " embedded_at REAL,"
+            " updated_at REAL)"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        if "embedded_at" not in columns:
+            # Ledgers created before the embed stage existed.
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN embedded_at REAL")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, next_attempt_at)")
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def _execute(self, sql: str, params: tuple = ()) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(sql, params)
+
+    def add(self, paper_ids: Iterable[str]) -> int:
+        """Register papers as pending; ids already in the ledger are left alone."""
+        now = time.time()
+        with self._lock, self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO jobs (paper_id, updated_at) VALUES (?, ?)",
+                ((paper_id, now) for paper_id in paper_ids),
+            )
+            return self._conn.total_changes - before
+
+    def recover(self) -> int:
+        """Return papers left running by a crashed process to pending."""
+        with self._lock, self._conn:
+            return self._conn.execute(
+                "UPDATE jobs SET status = 'pending', updated_at = ? WHERE status = 'running'",
+                (time.time(),),
+            ).rowcount
+
+    def requeue(self) -> int:
+        """Reset permanently failed papers so the next run tries them again."""
+        with self._lock, self._conn:
+            return self._conn.execute(
+                "UPDATE jobs SET status = 'pending', attempts = 0, next_attempt_at = 0, updated_at = ?"
+                " WHERE status = 'failed'",
+                (time.time(),),
+            ).rowcount
+
+    def runnable(self, now: float | None = None) -> list[str]:
+        """Ids of papers that are pending or due for a retry."""
+        now = time.time() if now is None else now
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT paper_id FROM jobs WHERE status = 'pending'"
+                " OR (status = 'retry' AND next_attempt_at <= ?) ORDER BY paper_id",
+                (now,),
+            )
+            return [paper_id for (paper_id,) in rows]
+
+    def next_retry_in(self, now: float | None = None) -> float | None:
+        """Seconds until the earliest scheduled retry, or None if nothing is waiting."""
+        now = time.time() if now is None else now
+        with self._lock:
+            (due,) = self._conn.execute(
+                "SELECT MIN(next_attempt_at) FROM jobs WHERE status = 'retry'"
+            ).fetchone()
+        return None if due is None else max(0.0, due - now)
+
+    def start(self, paper_id: str, stage: str) -> None:
+        """Mark a paper as running `stage`."""
+        self._execute(
+            "UPDATE jobs SET status = 'running', stage = ?, updated_at = ? WHERE paper_id = ?",
+            (stage, time.time(), paper_id),
+        )
+
+    def complete(self, paper_id: str, stage: str, last_stage: str = "write") -> None:
+        """Record that a paper finished `stage`; finishing `last_stage` marks it done."""
+        column = STAGE_COLUMNS[stage]
+        status = "done" if stage == last_stage else "running"
+        now = time.time()
+        self._execute(
+            f"UPDATE jobs SET status = ?, {column} = ?, error = NULL, updated_at = ?"  # noqa: S608
+            " WHERE paper_id = ?",
+            (status, now, now, paper_id),
+        )
+
+    def fail(self, paper_id: str, stage: str, error: BaseException) -> str:
+        """
+        Record a failed stage and schedule a retry if the error is transient.
+
+        Returns:
+            The new status: "retry" or "failed"
+        """
+        now = time.time()
+        message = f"{type(error).__name__}: {error!s}"
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT attempts FROM jobs WHERE paper_id = ?", (paper_id,)).fetchone()
+            attempts = (row[0] if row else 0) + 1
+            status = "retry" if is_transient(error) and attempts < self.max_attempts else "failed"
+            next_attempt_at = now + backoff_seconds(attempts) if status == "retry" else 0
+            self._conn.execute(
+                "INSERT INTO jobs (paper_id, status, stage, attempts, error, next_attempt_at, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT(paper_id) DO UPDATE SET status = excluded.status, stage = excluded.stage,"
+                " attempts = excluded.attempts, error = excluded.error,"
+                " next_attempt_at = excluded.next_attempt_at, updated_at = excluded.updated_at",
+                (paper_id, status, stage, attempts, message, next_attempt_at, now),
+            )
+        return status
+
+    def summary(self, top_errors: int = 10) -> dict:
+        """Counts by status and by failing stage, plus the most common errors."""
+        with self._lock:
+            by_status = dict(self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status"))
+            by_stage = dict(self._conn.execute(
+                "SELECT stage, COUNT(*) FROM jobs WHERE status IN ('retry', 'failed') GROUP BY stage"
+            ))
+            errors = self._conn.execute(
+                "SELECT error, COUNT(*) AS n FROM jobs WHERE status IN ('retry', 'failed')"
+                " GROUP BY error ORDER BY n DESC LIMIT ?",
+                (top_errors,),
+            ).fetchall()
+            (attempts,) = self._conn.execute("SELECT COALESCE(SUM(attempts), 0) FROM jobs").fetchone()
+        return {
+            "total": sum(by_status.values()),
+            "by_status": by_status,
+            "failing_stage": by_stage,
+            "failed_attempts": attempts,
+            "top_errors": errors,
+        }
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def run_ledger(ledger: JobLedger, paper_ids: Iterable[str] = (), **ingestor_kwargs) -> dict:
+    """
+    Ingest every unfinished paper in the ledger, waiting out retry backoffs.
+
+    Args:
+        ledger: Ledger to resume from; `paper_ids` are added to it first
+        paper_ids: New papers to register
+        ingestor_kwargs: Passed to `BulkIngestor`
+
+    Returns:
+        The ledger summary once nothing is pending or waiting for a retry
+    """
+    from ingestion.arxiv.bulk import BulkIngestor
+
+    ledger.add(paper_ids)
+    ledger.recover()
+    while True:
+        batch = ledger.runnable()
+        if batch:
+            asyncio.run(BulkIngestor(ledger=ledger, **ingestor_kwargs).run(batch))
+            continue
+        wait = ledger.next_retry_in()
+        if wait is None:
+            return ledger.summary()
+        print(f"waiting {wait:.0f}s for the next retry", file=sys.stderr)
+        time.sleep(wait)
+
+
+def _print_summary(summary: dict) -> None:
+    print(f"{summary['total']} papers, {summary['failed_attempts']} failed attempts")
+    for status, count in sorted(summary["by_status"].items()):
+        print(f"  {status:<8} {count:>8}")
+    if summary["failing_stage"]:
+        print("failing stage:")
+        for stage, count in sorted(summary["failing_stage"].items()):
+            print(f"  {stage:<8} {count:>8}")
+    if summary["top_errors"]:
+        print("top errors:")
+        for error, count in summary["top_errors"]:
+            print(f"  {count:>8}  {error}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Resumable bulk ingestion of arXiv papers.")
+    parser.add_argument("--ledger", default=None, help="ledger database, defaults to INGEST_LEDGER_PATH")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="add ids (optional) and ingest everything unfinished")
+    run.add_argument("--ids-file", help="file with one arXiv id per line")
+    run.add_argument("--max-attempts", type=int, default=DEFAULT_MAX_ATTEMPTS)
+    run.add_argument("--downloads", type=int, default=16)
+    run.add_argument("--parsers", type=int, default=None)
+    run.add_argument("--writers", type=int, default=2)
+    run.add_argument("--batch-size", type=int, default=8)
+    run.add_argument("--incremental", action="store_true")
+    run.add_argument("--embed", action="store_true", help="also embed sections into Qdrant")
+    run.add_argument("--embedders", type=int, default=1)
+    commands.add_parser("summary", help="print per-status counts and top errors")
+    commands.add_parser("requeue", help="reset permanently failed papers to pending")
+    args = parser.parse_args()
+
+    if args.command == "run":
+        from graph.schema import apply_schema
+
+        apply_schema()
+        ledger = JobLedger(args.ledger, max_attempts=args.max_attempts)
+        paper_ids = []
+        if args.ids_file:
+            with open(args.ids_file) as f:
+                paper_ids = [line.strip() for line in f if line.strip()]
+        summary = run_ledger(
+            ledger,
+            paper_ids,
+            download_concurrency=args.downloads,
+            parse_workers=args.parsers,
+            writer_concurrency=args.writers,
+            write_batch_size=args.batch_size,
+            incremental=args.incremental,
+            embed=args.embed,
+            embed_concurrency=args.embedders,
+        )
+        _print_summary(summary)
+    elif args.command == "summary":
+        _print_summary(JobLedger(args.ledger).summary())
+    else:
+        print(f"requeued {JobLedger(args.ledger).requeue()} papers")
+
+
+if __name__ == "__main__":
+    main()
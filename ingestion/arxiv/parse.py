@@ -1,183 +1,243 @@
+import bisect
 import re
-from typing import List, Dict, Optional
+from dataclasses import asdict
+from typing import List, Dict, Optional, Sequence
 
-from ingestion.arxiv.read import read_paper
+from ingestion.arxiv.citations import parse_bibliography
+from ingestion.arxiv.formulas import Formula, extract_formula
+from ingestion.arxiv.parse_cache import ParseCache, default_parse_cache
+from ingestion.arxiv.read import read_bibliography, read_paper
+from ingestion.arxiv.scanner import (
+    CITE_COMMANDS,
+    GroupReader,
+    ScanResult,
+    read_group,
+    scan_latex,
+)
+from ingestion.arxiv.sections import Section
 
-#TODO: PARSE FORMULAS
-def extract_abstract(main_text: str) -> Optional[str]:
-    """Extract the abstract from the main LaTeX file."""
-    abstract_match = re.search(
-        r"\\begin\{abstract\}(.*?)\\end\{abstract\}", 
-        main_text, 
-        re.DOTALL
-    )
-    if abstract_match:
-        return abstract_match.group(1).strip()
-    return None
+# Bump whenever parse output changes so cached parses are invalidated.
+PARSER_VERSION = "3"
+
+_COMMAND = re.compile(r"\\([A-Za-z]+)\*?")
+_WHITESPACE = re.compile(r"\s+")
+
+# Commands dropped together with their argument when cleaning text.
+DROP_COMMANDS = frozenset({
+    "label", "ref", "eqref", "autoref", "cref", "Cref", "pageref",
+    "textsuperscript", "textsubscript", "vspace", "hspace",
+    "thanks", "footnote",
+}) | CITE_COMMANDS
+# Formatting commands replaced by their (cleaned) argument.
+UNWRAP_COMMANDS = frozenset({"textbf", "textit", "emph", "textsc", "texttt", "underline"})
 
 
 def extract_balanced_braces(text: str, start_pos: int) -> Optional[str]:
     """Extract content within balanced braces starting from start_pos."""
     if start_pos >= len(text) or text[start_pos] != '{':
         return None
-    
-    stack = []
-    for i in range(start_pos, len(text)):
-        if text[i] == '{':
-            stack.append(i)
-        elif text[i] == '}':
-            stack.pop()
-            if not stack:
-                return text[start_pos + 1:i]
-    
-    return None
+    group = read_group(text, start_pos)
+    return text[group[0]:group[1]] if group else None
+
+
+def clean_latex_text(text):
+    """Clean LaTeX commands from text while preserving content.
+
+    Walks the text once, dropping reference-like commands with their argument
+    and unwrapping formatting commands. Nested braces are handled.
+    """
+    out = []
+    pos = 0
+    groups = GroupReader(text)
+    while True:
+        m = _COMMAND.search(text, pos)
+        if m is None:
+            break
+        name = m.group(1)
+        if name not in DROP_COMMANDS and name not in UNWRAP_COMMANDS:
+            out.append(text[pos:m.end()])
+            pos = m.end()
+            continue
+        group = groups.read(groups.skip_optional(m.end()))
+        if group is None:
+            out.append(text[pos:m.end()])
+            pos = m.end()
+            continue
+        out.append(text[pos:m.start()])
+        if name in UNWRAP_COMMANDS:
+            out.append(clean_latex_text(text[group[0]:group[1]]))
+        pos = group[2]
+    out.append(text[pos:])
+    return "".join(out).strip()
+
+
+def _clean_title(title: str) -> str:
+    return _WHITESPACE.sub(" ", clean_latex_text(title)).strip()
+
+
+def _split_authors(authors_text: str) -> List[str]:
+    authors_text = re.sub(r"\\textsuperscript\{[^}]*\}", "", authors_text)
+    authors_text = re.sub(r"\\textsubscript\{[^}]*\}", "", authors_text)
+    authors_text = re.sub(r"\\textit\{[^}]*\}", "", authors_text)
+
+    ieee_authors = re.findall(r"\\IEEEauthorblockN\{([^}]+)\}", authors_text)
+    if ieee_authors:
+        authors_text = " ".join(ieee_authors)
+
+    authors_text = re.sub(r"\\(?:and|thanks|footnote)\{[^}]*\}", "", authors_text)
+    authors_text = re.sub(r"\\\\", ",", authors_text)
+    authors_text = re.sub(r"%.*$", "", authors_text, flags=re.MULTILINE)  # Remove comments
+    authors = [a.strip() for a in authors_text.split(",") if a.strip() and len(a.strip()) > 2]
+    return [a for a in authors if not any(x in a.lower() for x in ["university", "institute", "department", "equal"])]
+
+
+def extract_abstract(main_text: str) -> Optional[str]:
+    """Extract the abstract from the main LaTeX file."""
+    scan = scan_latex(main_text)
+    abstract = scan.slice(scan.abstract)
+    return abstract.strip() if abstract is not None else None
 
 
 def extract_title(main_text: str) -> Optional[str]:
     """Extract the paper title from the main LaTeX file."""
-    title_start = re.search(r"\\title\s*\{", main_text)
-    if title_start:
-        brace_pos = title_start.end() - 1
-        title = extract_balanced_braces(main_text, brace_pos)
-        
-        if title:
-            title = re.sub(r"\\vspace\*?\{[^}]*\}", "", title)
-            title = re.sub(r"\\hspace\*?\{[^}]*\}", "", title)
-            title = clean_latex_text(title)
-            title = re.sub(r"\s+", " ", title)
-            return title.strip()
-    return None
+    scan = scan_latex(main_text)
+    title = scan.slice(scan.title)
+    return _clean_title(title) if title else None
 
 
 def extract_authors(main_text: str) -> List[str]:
     """Extract author names from the main LaTeX file."""
-    author_start = re.search(r"\\author\s*\{", main_text)
-    if author_start:
-        brace_pos = author_start.end() - 1
-        authors_text = extract_balanced_braces(main_text, brace_pos)
-        
-        if authors_text:
-            authors_text = re.sub(r"\\textsuperscript\{[^}]*\}", "", authors_text)
-            authors_text = re.sub(r"\\textsubscript\{[^}]*\}", "", authors_text)
-            authors_text = re.sub(r"\\textit\{[^}]*\}", "", authors_text)
-            
-            ieee_authors = re.findall(r"\\IEEEauthorblockN\{([^}]+)\}", authors_text)
-            if ieee_authors:
-                authors_text = " ".join(ieee_authors)
-            
-            authors_text = re.sub(r"\\(?:and|thanks|footnote)\{[^}]*\}", "", authors_text)
-            authors_text = re.sub(r"\\\\", ",", authors_text)
-            authors_text = re.sub(r"%.*$", "", authors_text, flags=re.MULTILINE)  # Remove comments
-            authors = [a.strip() for a in authors_text.split(",") if a.strip() and len(a.strip()) > 2]
-            authors = [a for a in authors if not any(x in a.lower() for x in ["university", "institute", "department", "equal"])]
-            return authors
-    return []
+    scan = scan_latex(main_text)
+    authors_text = scan.slice(scan.authors)
+    return _split_authors(authors_text) if authors_text else []
+
+
+def _heading_ends(scan: ScanResult) -> List[int]:
+    """End offset of each heading's body: the next heading at the same or a higher level."""
+    ends = [scan.end] * len(scan.headings)
+    open_headings = []
+    for idx, heading in enumerate(scan.headings):
+        while open_headings and scan.headings[open_headings[-1]].level >= heading.level:
+            ends[open_headings.pop()] = heading.start
+        open_headings.append(idx)
+    return ends
+
+
+def build_sections(scan: ScanResult) -> List[Section]:
+    """Build the section/subsection tree from a scan.
+
+    Nodes hold offsets into `scan.text`; no section text is copied here.
+    """
+    text = scan.text
+    headings = scan.headings
+    ends = _heading_ends(scan)
+    sections = []
+    current = None
+    for idx, heading in enumerate(headings):
+        end = ends[idx]
+        has_children = idx + 1 < len(headings) and headings[idx + 1].level > heading.level
+        node = Section(
+            source=text,
+            level=heading.level,
+            title=clean_latex_text(text[heading.title_start:heading.title_end]),
+            start=heading.body_start,
+            intro_end=headings[idx + 1].start if has_children else end,
+            end=end,
+        )
+        if heading.level == 1:
+            if not node.title:
+                if not has_children:
+                    current = None
+                    continue
+                node.title = "[Untitled Section]"
+            current = node
+            sections.append(current)
+        elif heading.level == 2 and current is not None:
+            current.subsections.append(node)
+        elif heading.level == 3 and current is not None:
+            # A subsubsection with no enclosing subsection hangs off the section.
+            parent = current
+            if current.subsections and current.subsections[-1].level == 2:
+                parent = current.subsections[-1]
+            parent.subsections.append(node)
+    return sections
 
-def clean_latex_text(text):
-    """Clean LaTeX commands from text while preserving content."""
-    text = re.sub(r"\\label\{[^}]*\}", "", text)
-    text = re.sub(r"\\cite\{[^}]*\}", "", text)
-    text = re.sub(r"\\ref\{[^}]*\}", "", text)
-    text = re.sub(r"\\textsuperscript\{[^}]*\}", "", text)
-    text = re.sub(r"\\textsubscript\{[^}]*\}", "", text)
-    # Remove common formatting commands but keep their content
-    text = re.sub(r"\\textbf\{([^}]*)\}", r"\1", text)
-    text = re.sub(r"\\textit\{([^}]*)\}", r"\1", text)
-    text = re.sub(r"\\emph\{([^}]*)\}", r"\1", text)
-    return text.strip()
 
 def find_subsections(text):
     """Extract subsections from a section body."""
-    subsection_pattern = r"\\subsection\{([^}]*)\}(.*?)(?=\\subsection\{|$)"
-    matches = re.findall(subsection_pattern, text, re.DOTALL)
-    
-    subsections = []
-    for title, body in matches:
-        clean_title = clean_latex_text(title)
-        subsections.append({
-            "title": clean_title,
-            "body": body.strip()
-        })
-    
-    return subsections
+    return [
+        sub
+        for section in build_sections(scan_latex("\\section{_}" + text))
+        for sub in section.subsections
+    ]
+
 
 def find_sections(tex):
     """Extract all sections with their titles and bodies from LaTeX text."""
-    section_pattern = r"\\section\{([^}]*)\}(.*?)(?=\\section\{|$)"
-    matches = re.findall(section_pattern, tex, re.DOTALL)
-    
-    sections = []
-    for title, body in matches:
-        clean_title = clean_latex_text(title)
-        
-        if not clean_title or clean_title.strip() == "":
-            if "\\subsection" not in body and "\\subsubsection" not in body:
-                continue
-            clean_title = "[Untitled Section]"
-        
-        subsections = find_subsections(body)
-        
-        if subsections:
-            intro_pattern = r"^(.*?)\\subsection\{"
-            intro_match = re.search(intro_pattern, body, re.DOTALL)
-            intro_text = intro_match.group(1).strip() if intro_match else ""
-        else:
-            intro_text = body.strip()
-        
-        sections.append({
-            "title": clean_title,
-            "intro": intro_text,
-            "subsections": subsections,
-            "full_body": body.strip()
-        })
-    
-    return sections
+    return build_sections(scan_latex(tex))
 
-def extract_citations(text: str) -> List[str]:
-    """Extract all citation keys from the text."""
-    citations = re.findall(r"\\cite\{([^}]+)\}", text)
-    all_citations = []
-    for cite in citations:
-        all_citations.extend([c.strip() for c in cite.split(",")])
-    return list(set(all_citations))
 
+def _assign_spans(scan: ScanResult, sections: List[Section], registry: Dict[str, Formula]) -> None:
+    """Attach to each node the formulas and citation keys in its own text.
 
-def parse_paper(paper_path: str) -> Dict:
+    A node's own text runs from its body start to its first child heading.
+    `registry` deduplicates formulas across sections (and sources) so that
+    identical formulas share one Formula instance.
     """
-    Parse an ArXiv paper and extract structured information.
-    
-    Args:
-        paper_path: Path to the extracted LaTeX paper directory
-        
-    Returns:
-        Dictionary containing parsed paper structure with:
-        - title: Paper title
-        - abstract: Paper abstract
-        - authors: List of authors
-        - sections: List of parsed sections with subsections
-        - all_citations: List of all citation keys used
-    """
-    all_tex_texts = read_paper(paper_path)
+    math_starts = [span.start for span in scan.math]
+    cite_starts = [citation.start for citation in scan.citations]
+    for section in sections:
+        for node in section.walk():
+            lo = bisect.bisect_left(math_starts, node.start)
+            hi = bisect.bisect_left(math_starts, node.intro_end)
+            found = {}
+            for span in scan.math[lo:hi]:
+                formula = extract_formula(scan.text, span)
+                if formula is not None:
+                    found.setdefault(formula.formula_id, registry.setdefault(formula.formula_id, formula))
+            node.formulas = tuple(found.values())
 
-    title, abstract, authors = None, None, None
+            lo = bisect.bisect_left(cite_starts, node.start)
+            hi = bisect.bisect_left(cite_starts, node.intro_end)
+            node.citations = tuple(dict.fromkeys(
+                key for citation in scan.citations[lo:hi] for key in citation.keys
+            ))
 
-    for tex_text in all_tex_texts:
-        if title is None:
-            title = extract_title(tex_text)
-        if abstract is None:
-            abstract = extract_abstract(tex_text)
-        if authors is None:
-            authors = extract_authors(tex_text)
 
+def extract_citations(text: str) -> List[str]:
+    """Extract all citation keys from the text."""
+    keys = set()
+    for citation in scan_latex(text).citations:
+        keys.update(citation.keys)
+    return list(keys)
+
+
+def parse_texts(all_tex_texts: List[str], bib_texts: Sequence[str] = ()) -> Dict:
+    """Parse already-read LaTeX sources into the `parse_paper` structure.
+
+    `bib_texts` are the bundled `.bbl`/`.bib` files; inline
+    `thebibliography` environments in the LaTeX sources are read as well.
+    """
+    title, abstract, authors = None, None, None
     all_sections = []
     all_citations = set()
-    
+    all_formulas = {}
+
     for tex_text in all_tex_texts:
-        parsed_sections = find_sections(tex_text)
-        for section in parsed_sections:
-            citations = extract_citations(section["full_body"])
-            all_citations.update(citations)
-            all_sections.append(section)
+        scan = scan_latex(tex_text)
+
+        if title is None and scan.title:
+            title = _clean_title(scan.slice(scan.title)) or None
+        if abstract is None and scan.abstract:
+            abstract = scan.slice(scan.abstract).strip()
+        if authors is None and scan.authors:
+            authors = _split_authors(scan.slice(scan.authors))
+
+        sections = build_sections(scan)
+        _assign_spans(scan, sections, all_formulas)
+        all_sections.extend(sections)
+        for section in sections:
+            all_citations.update(section.all_citations())
 
     return {
         "title": title,
@@ -185,5 +245,61 @@ def parse_paper(paper_path: str) -> Dict:
         "authors": authors,
         "sections": all_sections,
         "all_citations": sorted(list(all_citations)),
+        "formulas": list(all_formulas.values()),
+        "bibliography": parse_bibliography([*bib_texts, *all_tex_texts]),
         "num_sections": len(all_sections)
-    }
\ No newline at end of file
+    }
+
+
+def serialize_paper(paper: Dict) -> Dict:
+    """Return a copy of a parsed paper with sections materialized as dicts."""
+    return {
+        **paper,
+        "sections": [section.to_dict() for section in paper["sections"]],
+        "formulas": [
+            {"formula_id": f.formula_id, "latex": f.latex}
+            for f in paper.get("formulas", [])
+        ],
+        "bibliography": {
+            key: asdict(entry) for key, entry in paper.get("bibliography", {}).items()
+        },
+    }
+
+
+def parse_paper(paper_path: str, cache: ParseCache | None = None, use_cache: bool = True) -> Dict:
+    """
+    Parse an ArXiv paper and extract structured information.
+
+    Each LaTeX source is scanned exactly once by `scan_latex`; title, authors,
+    abstract, sections and citations are all derived from that scan. Sections
+    are `Section` nodes sharing the source buffer; use `serialize_paper` to get
+    plain dicts. Results are cached on disk keyed by a hash of the sources and
+    PARSER_VERSION, so re-parsing an unchanged paper only costs the read.
+
+    Args:
+        paper_path: Path to the extracted LaTeX paper directory
+        cache: Parse cache to use, defaults to the process-wide cache
+        use_cache: Set to False to always parse and skip the cache
+
+    Returns:
+        Dictionary containing parsed paper structure with:
+        - title: Paper title
+        - abstract: Paper abstract
+        - authors: List of authors
+        - sections: List of parsed sections with subsections
+        - all_citations: List of all citation keys used
+        - formulas: List of distinct normalized formulas
+        - bibliography: Bundled bibliography entries by citation key
+    """
+    tex_texts = read_paper(paper_path)
+    bib_texts = read_bibliography(paper_path)
+    if not use_cache:
+        return parse_texts(tex_texts, bib_texts)
+
+    cache = cache or default_parse_cache()
+    key = cache.key(PARSER_VERSION, tex_texts, bib_texts)
+    paper = cache.get(key)
+    if paper is None:
+        paper = parse_texts(tex_texts, bib_texts)
+        cache.put(key, paper)
+    return paper
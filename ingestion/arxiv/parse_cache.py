@@ -0,0 +1,119 @@
+"""
+On-disk cache of `parse_paper` results.
+
+Entries are keyed by a hash of the parser version and the exact inputs the
+parser sees (the flattened LaTeX sources and bundled bibliographies), so an
+unchanged paper is never parsed twice and bumping `PARSER_VERSION` in
+`ingestion.arxiv.parse` invalidates every older entry without a sweep.
+
+Results are stored as zlib-compressed pickles. `Section` nodes share one
+source buffer, which pickle writes once per paper, so an entry is roughly
+the compressed size of the source plus a few offsets per section. Only load
+caches written by this code base: pickles are not safe against untrusted
+input.
+"""
+import hashlib
+import os
+import pickle
+import threading
+import zlib
+
+from dataclasses import dataclass
+from pathlib import Path
+
+from ingestion.arxiv.cache import evict_lru, write_atomic
+
+
+DEFAULT_PARSE_CACHE_DIR = os.getenv(
+    "PARSE_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "research", "parsed"),
+)
+DEFAULT_PARSE_CACHE_MAX_BYTES = int(os.getenv("PARSE_CACHE_MAX_BYTES", str(2 * 1024**3)))
+# Parsed entries are small and written often; only sweep every N writes.
+EVICT_EVERY = 64
+
+
+@dataclass
+class ParseCacheStats:
+    """Per-process counters for a ParseCache."""
+    hits: int = 0
+    misses: int = 0
+    writes: int = 0
+    evictions: int = 0
+
+
+class ParseCache:
+    """LRU-bounded cache of parsed papers keyed by source content hash."""
+
+    def __init__(self, root: str | None = None, max_bytes: int | None = None):
+        self.root = Path(root or DEFAULT_PARSE_CACHE_DIR)
+        self.max_bytes = DEFAULT_PARSE_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        self.stats = ParseCacheStats()
+        self._lock = threading.Lock()
+        self._objects = self.root / "objects"
+        self.staging_dir = self.root / "staging"
+        for path in (self._objects, self.staging_dir):
+            path.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def key(parser_version: str, tex_texts: list[str], bib_texts: list[str]) -> str:
+        """Content hash of the parser inputs."""
+        digest = hashlib.sha256(parser_version.encode("utf-8"))
+        for group in (tex_texts, bib_texts):
+            digest.update(b"\0%d\0" % len(group))
+            for text in group:
+                data = text.encode("utf-8", "surrogatepass")
+                digest.update(b"%d\0" % len(data))
+                digest.update(data)
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self._objects / key[:2] / f"{key}.pkl.z"
+
+    def get(self, key: str) -> dict | None:
+        """Return the cached parse for `key`, or None."""
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+            paper = pickle.loads(zlib.decompress(data))  # noqa: S301
+        except Exception as e:
+            # Corrupt entries, or pickles of classes that have since moved or
+            # changed, are dropped and re-parsed.
+            if not isinstance(e, FileNotFoundError):
+                path.unlink(missing_ok=True)
+            with self._lock:
+                self.stats.misses += 1
+            return None
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        with self._lock:
+            self.stats.hits += 1
+        return paper
+
+    def put(self, key: str, paper: dict) -> None:
+        """Store a parse result under `key`."""
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = zlib.compress(pickle.dumps(paper, protocol=pickle.HIGHEST_PROTOCOL))
+        write_atomic(path, data, self.staging_dir)
+        with self._lock:
+            self.stats.writes += 1
+            # Not on the first write: every pool worker would sweep at startup.
+            sweep = self.stats.writes % EVICT_EVERY == 0
+        if sweep:
+            removed, _ = evict_lru(self._objects, "*.pkl.z", self.max_bytes)
+            with self._lock:
+                self.stats.evictions += len(removed)
+
+
+_default_parse_cache: ParseCache | None = None
+
+
+def default_parse_cache() -> ParseCache:
+    """Process-wide cache configured from PARSE_CACHE_DIR/PARSE_CACHE_MAX_BYTES."""
+    global _default_parse_cache
+    if _default_parse_cache is None:
+        _default_parse_cache = ParseCache()
+    return _default_parse_cache
@@ -1,64 +1,167 @@
-from ingestion.arxiv.download import *
-from ingestion.arxiv.parse import *
-from graph.insert.operations import *
+import hashlib
+import json
+import shutil
 
-#TODO: FORMULAS AND CITATIONS
-def ingest_paper(paper_id: str):
+from ingestion.arxiv.citations import canonical_citation_id
+from ingestion.arxiv.download import download_paper
+from ingestion.arxiv.parse import parse_paper
+from graph.insert.operations import insert_paper_tree, update_paper_tree
+
+def citation_rows(paper_id: str, paper: dict, section_citations: list) -> list:
     """
-    Ingest a paper into Neo4j with a tree-like graph structure.
+    Resolve each (section_id, citation_key) pair to a canonical CITATION row.
+
+    Keys with a bundled bibliography entry resolve to their canonical id;
+    keys without one stay paper-local as `local:<paper_id>:<key>`.
+    """
+    bibliography = paper.get("bibliography", {})
+    entries = {key: bibliography[key] for _, key in section_citations if key in bibliography}
+    resolved = {key: canonical_citation_id(entry) for key, entry in entries.items()}
+
+    rows = []
+    for section_id, key in section_citations:
+        entry = entries.get(key)
+        rows.append({
+            "citation_id": resolved.get(key, f"local:{paper_id}:{key}"),
+            "citation_key": key,
+            "title": entry.title if entry else None,
+            "doi": entry.doi if entry else None,
+            "arxiv_id": entry.arxiv_id if entry else None,
+            "section_id": section_id,
+        })
+    return rows
+
+def section_hash(row: dict, formula_ids: list, citation_ids: list) -> str:
+    """
+    Content hash of a section row and the formulas and citations attached to it.
+
+    Stored on the SECTION node so re-ingestion can skip sections whose hash
+    did not change.
     """
-    temp_dir, paper_path, paper_title = download_paper(paper_id)
-    paper = parse_paper(paper_path)
-    
-    insert_paper(
-        arxiv_id=paper_id,
-        title=paper['title'],
-        authors=paper['authors'] or [],
-        abstract=paper['abstract']
+    payload = json.dumps(
+        [row["title"], row["content"], row["top_level"], sorted(formula_ids), sorted(citation_ids)],
+        ensure_ascii=False,
     )
-    
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def paper_outline(section_rows: list) -> list:
+    """
+    Nest section rows into the outline stored on the PAPER node.
+
+    Returns:
+        [{section_id, path, title, depth, chars, children}] in document order
+    """
+    outline, by_path = [], {}
+    for row in section_rows:
+        node = {
+            "section_id": row["section_id"],
+            "path": row["path"],
+            "title": row["title"],
+            "depth": row["path"].count(".") + 1,
+            "chars": len(row["content"] or ""),
+            "children": [],
+        }
+        parent = row["path"].rpartition(".")[0]
+        (by_path[parent]["children"] if parent else outline).append(node)
+        by_path[row["path"]] = node
+    return outline
+
+def paper_tree(paper_id: str, paper: dict) -> dict:
+    """
+    Flatten a parsed paper into the row batches written by `insert_paper_tree`.
+
+    Top-level sections are WITHIN the paper and chained with RIGHT_SIBLING;
+    each section points to its first subsection with LEFT_CHILD and the
+    subsections are chained with RIGHT_SIBLING. Every section also carries
+    its paper id and its 1-based path ("3", "3.2") for paper-scoped lookups.
+    """
     sections = paper["sections"]
-    
     if not sections:
         raise ValueError("No sections found in paper")
-        return
-    
+
+    section_rows, children, siblings, formula_rows, section_citations = [], [], [], [], []
+
+    def add(section_id: str, path: str, section, content: str, formulas: list, citations: list, top_level: bool):
+        section_rows.append({
+            "section_id": section_id,
+            "paper_id": paper_id,
+            "path": path,
+            "title": section.title,
+            "content": content,
+            "top_level": top_level,
+        })
+        formula_rows.extend(
+            {"formula_id": f.formula_id, "latex": f.latex, "section_id": section_id}
+            for f in formulas
+        )
+        section_citations.extend((section_id, key) for key in citations)
+
     for idx, section in enumerate(sections):
         section_id = f"{paper_id}_section_{idx}"
-        section['_id'] = section_id
-        
-        insert_section(
-            section_id=section_id,
-            title=section['title'],
-            content=section.get('intro', '') or section.get('full_body', '')
-        )
-        
-        if idx == 0:
-            link_section_within_paper(paper_id, section_id)
-        
+        add(section_id, f"{idx + 1}", section, section.intro or section.full_body,
+            section.formulas, section.citations, top_level=True)
         if idx > 0:
-            link_section_within_paper(paper_id, section_id)
-            prev_section_id = sections[idx - 1]['_id']
-            link_siblings(prev_section_id, section_id)
-        
-        subsections = section.get('subsections', [])
-        for sub_idx, subsection in enumerate(subsections):
+            siblings.append({"left": f"{paper_id}_section_{idx - 1}", "right": section_id})
+
+        for sub_idx, subsection in enumerate(section.subsections):
             subsection_id = f"{section_id}_subsection_{sub_idx}"
-            subsection['_id'] = subsection_id
-            
-            insert_section(
-                section_id=subsection_id,
-                title=subsection['title'],
-                content=subsection.get('body', '')
-            )
-            
+            add(subsection_id, f"{idx + 1}.{sub_idx + 1}", subsection, subsection.body,
+                subsection.all_formulas(), subsection.all_citations(), top_level=False)
             if sub_idx == 0:
-                link_child_to_parent(section_id, subsection_id)
-            
-            if sub_idx > 0:
-                prev_subsection_id = subsections[sub_idx - 1]['_id']
-                link_siblings(prev_subsection_id, subsection_id)
-    
+                children.append({"parent": section_id, "child": subsection_id})
+            else:
+                siblings.append({"left": f"{section_id}_subsection_{sub_idx - 1}", "right": subsection_id})
+
+    citations = []
+    if section_citations:
+        citations = citation_rows(paper_id, paper, section_citations)
+
+    attached = {row["section_id"]: ([], []) for row in section_rows}
+    for row in formula_rows:
+        attached[row["section_id"]][0].append(row["formula_id"])
+    for row in citations:
+        attached[row["section_id"]][1].append(row["citation_id"])
+    for row in section_rows:
+        row["content_hash"] = section_hash(row, *attached[row["section_id"]])
+
+    return {
+        "paper": {
+            "arxiv_id": paper_id,
+            "title": paper["title"],
+            "authors": paper["authors"] or [],
+            "abstract": paper["abstract"],
+            "outline": json.dumps(paper_outline(section_rows), ensure_ascii=False, separators=(",", ":")),
+        },
+        "sections": section_rows,
+        "children": children,
+        "siblings": siblings,
+        "formulas": formula_rows,
+        "citations": citations,
+    }
+
+def ingest_paper(paper_id: str, incremental: bool = False, embed: bool = False):
+    """
+    Ingest a paper into Neo4j with a tree-like graph structure.
+
+    The paper, its sections, formulas, citations and every edge between them
+    are written in a single transaction, so a failure leaves no partial tree.
+    With `incremental`, the parsed tree is diffed against the stored section
+    hashes: only changed sections are rewritten and removed ones are deleted.
+    With `embed`, the sections are also embedded into Qdrant (see `graph.vectors`).
+    """
+    temp_dir, paper_path, _ = download_paper(paper_id)
+    try:
+        paper = parse_paper(paper_path)
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    tree = paper_tree(paper_id, paper)
+    result = update_paper_tree(**tree) if incremental else insert_paper_tree(**tree)
+    if embed:
+        from graph.vectors import embed_paper_sections
+        embed_paper_sections(paper_id, tree["sections"])
+    return result
+
 
 if __name__ == "__main__":
-    ingest_paper("2508.15144")
\ No newline at end of file
+    ingest_paper("2508.15144")
@@ -1,17 +1,193 @@
-import os
+import bisect
+import re
+from dataclasses import dataclass, field
 from pathlib import Path
 import traceback
 
-def read_paper(paper_path: str) -> str:
-    try:        
+DOCUMENTCLASS = re.compile(r"^[^%\n]*\\documentclass", re.MULTILINE)
+BEGIN_DOCUMENT = re.compile(r"^[^%\n]*\\begin\{document\}", re.MULTILINE)
+END_DOCUMENT = re.compile(r"\\end\{document\}")
+COMMENT_LINE = re.compile(r"^[ \t]*%.*(?:\n|$)", re.MULTILINE)
+TRAILING_COMMENT = re.compile(r"(?<!\\)%.*")
+INCLUDE = re.compile(
+    r"\\(input|include|subfile)(?![A-Za-z@])\s*(?:\{([^}]*)\}|([^\s{}\\%]+))"
+)
+MAIN_FILE_NAMES = ("main.tex", "ms.tex", "paper.tex", "article.tex")
+MAX_INCLUDE_DEPTH = 16
+
+
+@dataclass
+class FlattenedSource:
+    """A paper's root document with every include resolved inline.
+
+    `spans` maps character ranges of `text` back to the file they came from,
+    as sorted, non-overlapping (start, end, relative_path) triples.
+    """
+    text: str
+    root: str
+    spans: list[tuple[int, int, str]] = field(default_factory=list)
+
+    def file_at(self, offset: int) -> str | None:
+        """Return the source file that produced the character at `offset`."""
+        idx = bisect.bisect_right(self.spans, (offset, float("inf"))) - 1
+        if idx >= 0 and self.spans[idx][0] <= offset < self.spans[idx][1]:
+            return self.spans[idx][2]
+        return None
+
+
+def _read_text(path: Path) -> str:
+    return path.read_text(encoding="utf-8", errors="replace")
+
+
+def _strip_comments(text: str) -> str:
+    text = COMMENT_LINE.sub("", text)
+    return TRAILING_COMMENT.sub("", text)
+
+
+def _included_names(text: str) -> set[str]:
+    return {
+        (m.group(2) or m.group(3)).strip().removesuffix(".tex")
+        for m in INCLUDE.finditer(_strip_comments(text))
+    }
+
+
+def find_main_file(paper_path: str) -> Path | None:
+    """
+    Find the root document of an extracted arXiv source tree.
+
+    Candidates must declare `\\documentclass` and `\\begin{document}` outside
+    comments. Ties go to files no other file includes, then to conventional
+    main file names, then to the largest file.
+    """
+    root = Path(paper_path)
+    tex_files = sorted(root.rglob("*.tex"))
+    texts = {path: _read_text(path) for path in tex_files}
+
+    candidates = [
+        path for path, text in texts.items()
+        if DOCUMENTCLASS.search(text) and BEGIN_DOCUMENT.search(text)
+    ]
+    if not candidates:
+        candidates = [path for path, text in texts.items() if BEGIN_DOCUMENT.search(text)]
+    if not candidates:
+        return None
+
+    included = set()
+    for text in texts.values():
+        included.update(_included_names(text))
+
+    def rank(path: Path) -> tuple:
+        rel = path.relative_to(root).with_suffix("").as_posix()
+        return (
+            rel in included or path.stem in included,
+            path.name.lower() not in MAIN_FILE_NAMES,
+            -len(texts[path]),
+        )
+
+    return min(candidates, key=rank)
+
+
+def _resolve_include(name: str, base_dirs: list[Path], root_dir: Path) -> Path | None:
+    """Find an included file, ignoring targets outside `root_dir`."""
+    root = root_dir.resolve()
+    for base in base_dirs:
+        for candidate in (base / name, base / f"{name}.tex"):
+            if candidate.is_file() and candidate.resolve().is_relative_to(root):
+                return candidate
+    return None
+
+
+def _subfile_body(text: str) -> str:
+    begin = BEGIN_DOCUMENT.search(text)
+    if not begin:
+        return text
+    end = END_DOCUMENT.search(text, begin.end())
+    return text[begin.end():end.start() if end else len(text)]
+
+
+def flatten_paper(paper_path: str) -> FlattenedSource | None:
+    """
+    Flatten the root document of a paper into one source string.
+
+    Comment-only lines and trailing comments are dropped, and every
+    `\\input`, `\\include` and `\\subfile` is resolved recursively relative
+    to the root directory (and the including file's directory). Unresolvable
+    includes, and includes pointing outside the paper directory, are left in
+    place.
+
+    Args:
+        paper_path: Path to the extracted LaTeX paper directory
+
+    Returns:
+        FlattenedSource, or None when no root document is found
+    """
+    root_dir = Path(paper_path)
+    main_file = find_main_file(paper_path)
+    if main_file is None:
+        return None
+
+    pieces = []
+    spans = []
+    length = 0
+
+    def emit(chunk: str, rel: str) -> None:
+        nonlocal length
+        if chunk:
+            pieces.append(chunk)
+            spans.append((length, length + len(chunk), rel))
+            length += len(chunk)
+
+    def visit(path: Path, text: str, stack: tuple[Path, ...]) -> None:
+        rel = path.resolve().relative_to(root_dir.resolve()).as_posix()
+        text = _strip_comments(text)
+        pos = 0
+        for match in INCLUDE.finditer(text):
+            emit(text[pos:match.start()], rel)
+            pos = match.end()
+            name = (match.group(2) or match.group(3)).strip()
+            target = _resolve_include(name, [root_dir, path.parent], root_dir)
+            if target is None or target in stack or len(stack) >= MAX_INCLUDE_DEPTH:
+                emit(match.group(0), rel)
+                continue
+            included = _read_text(target)
+            if match.group(1) == "subfile":
+                included = _subfile_body(included)
+            visit(target, included, (*stack, target))
+        emit(text[pos:], rel)
+
+    visit(main_file, _read_text(main_file), (main_file,))
+    return FlattenedSource(
+        text="".join(pieces),
+        root=main_file.relative_to(root_dir).as_posix(),
+        spans=spans,
+    )
+
+
+def read_bibliography(paper_path: str) -> list[str]:
+    """Read the bundled `.bbl` and `.bib` files, `.bbl` first."""
+    root = Path(paper_path)
+    files = sorted(root.rglob("*.bbl")) + sorted(root.rglob("*.bib"))
+    return [_read_text(path) for path in files]
+
+
+def read_paper(paper_path: str) -> list[str]:
+    """
+    Read the LaTeX sources of a paper.
+
+    Returns the flattened root document as a single-element list when one can
+    be identified, and falls back to every `.tex` file in the tree otherwise.
+    """
+    try:
+        flattened = flatten_paper(paper_path)
+        if flattened is not None:
+            return [flattened.text]
+
         all_tex_files = list(Path(paper_path).rglob("*.tex"))
         all_tex_texts = []
         for file in all_tex_files:
-            with open(file, "r") as f:
-                text = f.read()
-                all_tex_texts.append(text)
-    
+            all_tex_texts.append(_read_text(file))
+
     except Exception as e:
         raise Exception(f"Error reading paper: {e!s} {traceback.format_exc()}")
     else:
-        return all_tex_texts
\ No newline at end of file
+        return all_tex_texts
@@ -0,0 +1,366 @@
+"""
+Linear-time LaTeX scanner.
+
+`scan_latex` walks a LaTeX source once, left to right, and records the
+character offsets of everything `parse_paper` needs: title, authors, abstract,
+sectioning commands, citation keys and math spans. Nothing is copied out of
+the source; consumers slice `ScanResult.text` with the recorded offsets.
+
+The walk jumps between the only characters that can start a token (`\\`,
+`$` and `%`) with `str.find`, remembering the next position of each so no
+character is searched twice, and only descends into a construct (brace
+group, math span, verbatim block) to find where it ends. The whole scan is
+proportional to the source length and never backtracks. Brace groups are
+matched by depth, so arguments with nested braces such as
+`\\title{A {Nested} Title}` are captured whole.
+
+Unterminated constructs do not make the scan quadratic. Math, which TeX does
+not allow across a blank line, is only looked for up to the end of its
+paragraph, and a failed search is remembered so later openers in the same
+stretch do not repeat it; `GroupReader` does the same for unclosed brace
+groups and optional arguments.
+"""
+import re
+from dataclasses import dataclass, field
+
+SECTION_LEVELS = {"section": 1, "subsection": 2, "subsubsection": 3}
+MATH_ENVIRONMENTS = frozenset({
+    "equation", "equation*", "align", "align*", "alignat", "alignat*",
+    "gather", "gather*", "multline", "multline*", "eqnarray", "eqnarray*",
+    "flalign", "flalign*", "displaymath", "math",
+})
+VERBATIM_ENVIRONMENTS = frozenset({
+    "verbatim", "verbatim*", "Verbatim", "lstlisting", "minted", "comment",
+})
+CITE_COMMANDS = frozenset({
+    "cite", "citep", "citet", "citealp", "citealt", "citeauthor", "citeyear",
+    "citeyearpar", "citenum", "citetext", "parencite", "textcite", "autocite",
+    "footcite", "fullcite", "nocite", "Cite", "Citep", "Citet", "Citeauthor",
+    "Parencite", "Textcite", "Autocite",
+})
+
+_PARAGRAPH_BREAK = re.compile(r"\n[ \t]*\n")
+_COMMAND = re.compile(r"\\([A-Za-z@]+)(\*?)|\\(.)", re.DOTALL)
+_BRACE = re.compile(r"\\.|[{}]", re.DOTALL)
+_BRACKET = re.compile(r"\\.|[{}\[\]]", re.DOTALL)
+_SPACE = re.compile(r"\s*")
+
+
+@dataclass(slots=True)
+class Heading:
+    """A sectioning command. `start` is the backslash, `body_start` follows the title."""
+    level: int
+    start: int
+    title_start: int
+    title_end: int
+    body_start: int
+    starred: bool = False
+
+
+@dataclass(slots=True)
+class Citation:
+    """A citation command and the keys it references."""
+    command: str
+    start: int
+    end: int
+    keys: list[str]
+
+
+@dataclass(slots=True)
+class MathSpan:
+    """A math region. `kind` is "inline", "display" or the environment name."""
+    kind: str
+    start: int
+    end: int
+    content_start: int
+    content_end: int
+
+
+@dataclass
+class ScanResult:
+    """Offsets recorded by a single scan over `text`."""
+    text: str
+    title: tuple[int, int] | None = None
+    authors: tuple[int, int] | None = None
+    abstract: tuple[int, int] | None = None
+    document_end: int | None = None
+    headings: list[Heading] = field(default_factory=list)
+    citations: list[Citation] = field(default_factory=list)
+    math: list[MathSpan] = field(default_factory=list)
+
+    @property
+    def end(self) -> int:
+        """Offset where document content stops (`\\end{document}` or EOF)."""
+        return len(self.text) if self.document_end is None else self.document_end
+
+    def slice(self, span: tuple[int, int] | None) -> str | None:
+        """Return the text of an offset pair, or None."""
+        return None if span is None else self.text[span[0]:span[1]]
+
+
+def _close(pattern: re.Pattern, text: str, start: int) -> int | None:
+    """Offset of the bracket closing the one at `start`, or None if it is never closed."""
+    depth = 0
+    for m in pattern.finditer(text, start):
+        token = m.group()
+        if token in "[{":
+            depth += 1
+        elif token in "]}":
+            depth -= 1
+            if depth == 0:
+                return m.start()
+    return None
+
+
+def _match_all(pattern: re.Pattern, text: str, start: int) -> dict[int, int]:
+    """`_close` for every opening bracket from `start` on, in one pass; unclosed ones are left out."""
+    opened, matches = [], {}
+    for m in pattern.finditer(text, start):
+        token = m.group()
+        if token in "[{":
+            opened.append(m.start())
+        elif token in "]}" and opened:
+            matches[opened.pop()] = m.start()
+    return matches
+
+
+def read_group(text: str, pos: int) -> tuple[int, int, int] | None:
+    """
+    Match a balanced `{...}` group at `pos`, skipping leading whitespace.
+
+    Returns:
+        (content_start, content_end, position after the closing brace), or
+        None when no group starts at `pos` or it is never closed.
+    """
+    start = _SPACE.match(text, pos).end()
+    if start >= len(text) or text[start] != "{":
+        return None
+    close = _close(_BRACE, text, start)
+    return None if close is None else (start + 1, close, close + 1)
+
+
+def skip_optional(text: str, pos: int) -> int:
+    """Skip any `[...]` optional arguments at `pos`, returning the new position."""
+    while True:
+        start = _SPACE.match(text, pos).end()
+        if start >= len(text) or text[start] != "[":
+            return pos
+        close = _close(_BRACKET, text, start)
+        if close is None:
+            return pos
+        pos = close + 1
+
+
+class GroupReader:
+    """
+    `read_group` and `skip_optional` over one text, linear even when groups are left unclosed.
+
+    An unclosed group is only found out by scanning to the end of the text,
+    so a run of them would cost quadratic time. The first one found here
+    matches every later bracket in one pass instead, and lookups past it are
+    answered from those matches.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        # Per pattern: (offset the matches start at, {opening offset: closing offset}).
+        self._matched = {_BRACE: (len(text) + 1, {}), _BRACKET: (len(text) + 1, {})}
+
+    def _close(self, pattern: re.Pattern, start: int) -> int | None:
+        matched_from, matches = self._matched[pattern]
+        if start >= matched_from:
+            return matches.get(start)
+        close = _close(pattern, self.text, start)
+        if close is None:
+            self._matched[pattern] = (start, _match_all(pattern, self.text, start))
+        return close
+
+    def read(self, pos: int) -> tuple[int, int, int] | None:
+        """Same as `read_group(self.text, pos)`."""
+        start = _SPACE.match(self.text, pos).end()
+        if start >= len(self.text) or self.text[start] != "{":
+            return None
+        close = self._close(_BRACE, start)
+        return None if close is None else (start + 1, close, close + 1)
+
+    def skip_optional(self, pos: int) -> int:
+        """Same as `skip_optional(self.text, pos)`."""
+        while True:
+            start = _SPACE.match(self.text, pos).end()
+            if start >= len(self.text) or self.text[start] != "[":
+                return pos
+            close = self._close(_BRACKET, start)
+            if close is None:
+                return pos
+            pos = close + 1
+
+
+class _Finder:
+    """`str.find` for closing delimiters that remembers where a search came up empty."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self._misses: dict[str, tuple[int, int]] = {}
+
+    def find(self, needle: str, pos: int, end: int, unescaped: bool = False) -> int:
+        miss = self._misses.get(needle)
+        if miss is not None and miss[0] <= pos and end <= miss[1]:
+            return -1
+        idx = _find_unescaped(self.text, needle, pos, end) if unescaped else self.text.find(needle, pos, end)
+        if idx < 0:
+            self._misses[needle] = (pos, end)
+        return idx
+
+
+def _find_unescaped(text: str, needle: str, pos: int, end: int) -> int:
+    while True:
+        idx = text.find(needle, pos, end)
+        if idx < 0:
+            return -1
+        backslashes = 0
+        while idx - backslashes > 0 and text[idx - backslashes - 1] == "\\":
+            backslashes += 1
+        if backslashes % 2 == 0:
+            return idx
+        pos = idx + 1
+
+
+def _scan_environment(
+    result: ScanResult,
+    groups: GroupReader,
+    finder: _Finder,
+    start: int,
+    pos: int,
+    paragraph_end: int,
+) -> int:
+    text = result.text
+    group = groups.read(pos)
+    if group is None:
+        return pos
+    env = text[group[0]:group[1]]
+    pos = group[2]
+    if env in MATH_ENVIRONMENTS:
+        close = finder.find(f"\\end{{{env}}}", pos, paragraph_end)
+        if close < 0:
+            return pos
+        end = close + len(env) + 6
+        result.math.append(MathSpan(env, start, end, pos, close))
+        return end
+    if env in VERBATIM_ENVIRONMENTS:
+        close = text.find(f"\\end{{{env}}}", pos)
+        return len(text) if close < 0 else close + len(env) + 6
+    if env == "abstract" and result.abstract is None:
+        close = finder.find("\\end{abstract}", pos, len(text))
+        if close >= 0:
+            result.abstract = (pos, close)
+            return close + len("\\end{abstract}")
+    return pos
+
+
+def scan_latex(text: str) -> ScanResult:
+    """
+    Scan a LaTeX source once and record the offsets of its structure.
+
+    Args:
+        text: LaTeX source, ideally the flattened root document
+
+    Returns:
+        ScanResult with title, authors, abstract, headings, citations and
+        math spans in document order
+    """
+    result = ScanResult(text=text)
+    n = len(text)
+    pos = 0
+    groups = GroupReader(text)
+    finder = _Finder(text)
+    # Next known position of each token-starting character; "not found" is n.
+    next_backslash = next_dollar = next_percent = -1
+    # End of the paragraph the last math opener was in, reused until passed.
+    paragraph_end = -1
+
+    def end_of_paragraph(start: int) -> int:
+        nonlocal paragraph_end
+        if paragraph_end < start:
+            brk = _PARAGRAPH_BREAK.search(text, start)
+            paragraph_end = n if brk is None else brk.start()
+        return paragraph_end
+
+    while pos < n:
+        if next_backslash < pos:
+            next_backslash = text.find("\\", pos) % (n + 1)
+        if next_dollar < pos:
+            next_dollar = text.find("$", pos) % (n + 1)
+        if next_percent < pos:
+            next_percent = text.find("%", pos) % (n + 1)
+        start = min(next_backslash, next_dollar, next_percent)
+        if start >= n:
+            break
+
+        if start == next_percent:
+            newline = text.find("\n", start)
+            pos = n if newline < 0 else newline + 1
+            continue
+
+        if start == next_dollar:
+            dollar = "$$" if text.startswith("$$", start) else "$"
+            pos = start + len(dollar)
+            close = finder.find(dollar, pos, end_of_paragraph(start), unescaped=True)
+            if close >= 0:
+                kind = "display" if dollar == "$$" else "inline"
+                result.math.append(MathSpan(kind, start, close + len(dollar), pos, close))
+                pos = close + len(dollar)
+            continue
+
+        m = _COMMAND.match(text, start)
+        if m is None:
+            break
+        pos = m.end()
+        name, star, escaped = m.groups()
+
+        if escaped:
+            if escaped in "[(":
+                closing = "\\]" if escaped == "[" else "\\)"
+                close = finder.find(closing, pos, end_of_paragraph(start))
+                if close >= 0:
+                    kind = "display" if escaped == "[" else "inline"
+                    result.math.append(MathSpan(kind, start, close + 2, pos, close))
+                    pos = close + 2
+
+        elif name == "begin":
+            pos = _scan_environment(result, groups, finder, m.start(), pos, end_of_paragraph(start))
+
+        elif name == "end":
+            group = groups.read(pos)
+            if group and text[group[0]:group[1]] == "document":
+                result.document_end = m.start()
+                break
+
+        elif name in SECTION_LEVELS:
+            group = groups.read(groups.skip_optional(pos))
+            if group is not None:
+                result.headings.append(Heading(
+                    level=SECTION_LEVELS[name],
+                    start=m.start(),
+                    title_start=group[0],
+                    title_end=group[1],
+                    body_start=group[2],
+                    starred=bool(star),
+                ))
+                pos = group[2]
+
+        elif name in CITE_COMMANDS:
+            group = groups.read(groups.skip_optional(pos))
+            if group is not None:
+                keys = [k.strip() for k in text[group[0]:group[1]].split(",") if k.strip()]
+                result.citations.append(Citation(name, m.start(), group[2], keys))
+                pos = group[2]
+
+        elif name in ("title", "author", "abstract"):
+            attr = "authors" if name == "author" else name
+            if getattr(result, attr) is None:
+                group = groups.read(groups.skip_optional(pos))
+                if group is not None:
+                    setattr(result, attr, (group[0], group[1]))
+                    pos = group[2]
+
+    return result
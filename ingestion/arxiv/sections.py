@@ -0,0 +1,114 @@
+"""
+Compact, copy-free section tree for parsed papers.
+
+A `Section` stores (start, end) offsets into the paper's source buffer, which
+every node of the tree shares, instead of holding its own copies of intro,
+body and subsection text. Text is sliced out only when a consumer reads
+`intro`, `body` or `full_body`, and is not kept afterwards, so peak memory
+during bulk ingestion stays close to one copy of the source per paper.
+
+Sections still behave like the dicts `parse_paper` used to return
+(`section["title"]`, `section.get("intro", "")`, ...) and convert to plain
+dicts with `to_dict` for JSON or other serialization.
+"""
+from collections.abc import Iterator
+
+from ingestion.arxiv.formulas import Formula
+
+
+class Section:
+    """A section, subsection or subsubsection as offsets into `source`."""
+
+    __slots__ = (
+        "source", "level", "title", "start", "intro_end", "end", "subsections",
+        "formulas", "citations",
+    )
+
+    _KEYS = ("title", "intro", "body", "full_body", "subsections", "formulas", "citations")
+
+    def __init__(
+        self,
+        source: str,
+        level: int,
+        title: str,
+        start: int,
+        intro_end: int,
+        end: int,
+    ):
+        self.source = source
+        self.level = level
+        self.title = title
+        self.start = start
+        self.intro_end = intro_end
+        self.end = end
+        self.subsections: list[Section] = []
+        self.formulas: tuple[Formula, ...] = ()
+        self.citations: tuple[str, ...] = ()
+
+    @property
+    def intro(self) -> str:
+        """Text before the first child heading."""
+        return self.source[self.start:self.intro_end].strip()
+
+    @property
+    def body(self) -> str:
+        """Full text of the section, including its children."""
+        return self.source[self.start:self.end].strip()
+
+    full_body = body
+
+    def __getitem__(self, key: str):
+        if key not in self._KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default=None):
+        """Dict-style access kept for callers of the old dict sections."""
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._KEYS
+
+    def all_formulas(self) -> list[Formula]:
+        """Distinct formulas used anywhere in this subtree."""
+        formulas = {}
+        for node in self.walk():
+            for formula in node.formulas:
+                formulas.setdefault(formula.formula_id, formula)
+        return list(formulas.values())
+
+    def all_citations(self) -> list[str]:
+        """Distinct citation keys used anywhere in this subtree."""
+        return list(dict.fromkeys(key for node in self.walk() for key in node.citations))
+
+    def walk(self) -> Iterator["Section"]:
+        """Yield this section and all of its descendants in document order."""
+        yield self
+        for child in self.subsections:
+            yield from child.walk()
+
+    def to_dict(self) -> dict:
+        """Materialize the subtree in the shape `parse_paper` used to return."""
+        if self.level == 1:
+            return {
+                "title": self.title,
+                "intro": self.intro,
+                "subsections": [s.to_dict() for s in self.subsections],
+                "full_body": self.full_body,
+                "formulas": [f.formula_id for f in self.formulas],
+                "citations": list(self.citations),
+            }
+        return {
+            "title": self.title,
+            "body": self.body,
+            "intro": self.intro,
+            "subsections": [s.to_dict() for s in self.subsections],
+            "formulas": [f.formula_id for f in self.formulas],
+            "citations": list(self.citations),
+        }
+
+    def __repr__(self) -> str:
+        return f"Section(level={self.level}, title={self.title!r}, span=({self.start}, {self.end}))"
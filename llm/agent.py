@@ -1,10 +1,13 @@
+import asyncio
 import os
 
 import dspy
 
 from dotenv import load_dotenv
 
-from .tools import get_paper, get_sections, get_section, get_subsections
+from .intent import IntentRouter
+from .tools import get_paper, get_sections, get_section, get_subsections, search_sections, find_related_sections, get_key_references
+from .tools import paper_id_from, prefetch_paper
 
 from braintrust.wrappers.dspy import BraintrustDSpyCallback
 
@@ -48,18 +51,60 @@ class RequirementsInfoSignature(dspy.Signature):
     context: list[dict] = dspy.InputField(description='The context of the conversation.')
     response: str = dspy.OutputField(description='The response to the user query. Always give a comprehensive response.')
 
+class PrefetchedGenericInfoSignature(dspy.Signature):
+    """Provide generic information about the paper. You will use the abstract, outline, introduction and last section of the paper, given in paper, to answer the user query."""
+    user_input: str = dspy.InputField(description='The user query about the paper.')
+    context: list[dict] = dspy.InputField(description='The context of the conversation.')
+    paper: dict = dspy.InputField(description='The title, authors, abstract, outline, introduction and conclusion of the paper.')
+    response: str = dspy.OutputField(description='The response to the user query. Always give a comprehensive response.')
+
+class PrefetchedRequirementsInfoSignature(dspy.Signature):
+    """Provide information about the requirements for understanding the paper. You will use the abstract, outline and introduction of the paper, given in paper, to answer the user query."""
+    user_input: str = dspy.InputField(description='The user query about the paper.')
+    context: list[dict] = dspy.InputField(description='The context of the conversation.')
+    paper: dict = dspy.InputField(description='The title, authors, abstract, outline, introduction and conclusion of the paper.')
+    response: str = dspy.OutputField(description='The response to the user query. Always give a comprehensive response.')
+
+class PrefetchedAnswer(dspy.Module):
+    """Answer in a single LLM call from paper context fetched before the call."""
+    def __init__(self, signature: type[dspy.Signature], paper: dict):
+        super().__init__()
+        self.predict = dspy.Predict(signature)
+        self.paper = paper
+
+    def forward(self, user_input: str, context: list[dict]) -> dspy.Prediction:
+        return self.predict(user_input=user_input, context=context, paper=self.paper)
+
+    async def aforward(self, user_input: str, context: list[dict]) -> dspy.Prediction:
+        return await self.predict.acall(user_input=user_input, context=context, paper=self.paper)
+
+async def prefetched(signature: type[dspy.Signature], user_input: str) -> PrefetchedAnswer | None:
+    """Single-shot answerer for the paper named in the user input, None if there is no such paper in the graph."""
+    paper_id = paper_id_from(user_input)
+    paper = await prefetch_paper(paper_id) if paper_id else None
+    return PrefetchedAnswer(signature, paper) if paper else None
+
 intent_analyzer = dspy.Predict(IntentAnalyzerSignature)
+# Intents come from local prototype embeddings; only ambiguous input reaches the LLM.
+intent_router = IntentRouter(fallback=lambda user_input: intent_analyzer(user_input=user_input).intent)
+
+async def workflow(user_input: str) -> dspy.Module:
+    """Analyze the user query and determine the intent.
 
-def workflow(user_input: str) -> dspy.ReAct:
-    """Analyze the user query and determine the intent."""
-    intent = intent_analyzer(user_input=user_input)
+    Generic and requirements questions about a paper named by its arXiv id
+    are answered in one call from prefetched context; everything else goes
+    through a ReAct agent with the graph tools. Routing (a local embedding
+    and possibly an LLM call) runs in a thread and the prefetch on the async
+    driver, so neither blocks the event loop.
+    """
+    intent = await asyncio.to_thread(intent_router.route, user_input)
     if intent.intent == "generic":
-        return dspy.ReAct(GenericInfoSignature, tools=[get_paper, get_sections, get_section])
+        return await prefetched(PrefetchedGenericInfoSignature, user_input) or dspy.ReAct(GenericInfoSignature, tools=[get_paper, get_sections, get_section, search_sections, find_related_sections, get_key_references])
     elif intent.intent == "math":
-        return dspy.ReAct(MathInfoSignature, tools=[get_paper, get_sections, get_section, get_subsections])
+        return dspy.ReAct(MathInfoSignature, tools=[get_paper, get_sections, get_section, get_subsections, search_sections, find_related_sections, get_key_references])
     elif intent.intent == "section":
-        return dspy.ReAct(SectionInfoSignature, tools=[get_paper, get_sections, get_section, get_subsections])
+        return dspy.ReAct(SectionInfoSignature, tools=[get_paper, get_sections, get_section, get_subsections, search_sections, find_related_sections, get_key_references])
     elif intent.intent == "requirements":
-        return dspy.ReAct(RequirementsInfoSignature, tools=[get_paper, get_sections, get_section, get_subsections])
+        return await prefetched(PrefetchedRequirementsInfoSignature, user_input) or dspy.ReAct(RequirementsInfoSignature, tools=[get_paper, get_sections, get_section, get_subsections, search_sections, find_related_sections, get_key_references])
     else:
-        return dspy.ReAct(PaperAnalyzerSignature, tools=[get_paper, get_sections, get_section, get_subsections])
\ No newline at end of file
+        return dspy.ReAct(PaperAnalyzerSignature, tools=[get_paper, get_sections, get_section, get_subsections, search_sections, find_related_sections, get_key_references])
\ No newline at end of file
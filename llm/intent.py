@@ -0,0 +1,217 @@
+"""
+Local intent routing with fastembed prototype embeddings.
+
+The user input is embedded and compared (cosine) with labelled example
+queries for each intent. When the best intent is similar enough and clearly
+ahead of the runner-up it is used directly; otherwise the input is
+ambiguous and the LLM classifier passed as `fallback` decides. Every
+decision is appended to a JSONL log; `prototypes_from_log` turns the LLM
+decisions in it into extra prototypes.
+
+Usage:
+    python -m llm.intent retrain --log decisions.jsonl --output prototypes.json
+"""
+import argparse
+import json
+import math
+import os
+import threading
+import time
+
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+
+from fastembed import TextEmbedding
+from loguru import logger
+
+from graph import vectors
+
+INTENTS = ("generic", "math", "section", "requirements")
+
+DEFAULT_PROTOTYPES = {
+    "generic": [
+        "What is this paper about?",
+        "Summarize the paper.",
+        "What are the main contributions?",
+        "What problem does the paper solve and what are the results?",
+        "Give me an overview of this work.",
+        "What did the authors conclude?",
+    ],
+    "math": [
+        "Explain the loss function.",
+        "What does this equation mean?",
+        "Derive the update rule used in the paper.",
+        "How is the objective formulated mathematically?",
+        "What is the proof of the main theorem?",
+        "Walk me through the formulas in the method.",
+    ],
+    "section": [
+        "What does section 3 say?",
+        "Explain the related work section.",
+        "Summarize the experiments section.",
+        "What is in the methodology section?",
+        "Tell me about the ablation study in section 5.2.",
+        "What does the discussion section conclude?",
+    ],
+    "requirements": [
+        "What do I need to know before reading this paper?",
+        "What background is required to understand this work?",
+        "Which prerequisites should I study first?",
+        "What concepts should I be familiar with to follow the paper?",
+        "Is this paper suitable for a beginner?",
+        "What prior papers should I read first?",
+    ],
+}
+
+model_name = os.getenv("INTENT_EMBEDDING_MODEL", os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2"))
+DEFAULT_PROTOTYPES_PATH = os.getenv("INTENT_PROTOTYPES_PATH")
+DEFAULT_LOG_PATH = os.getenv(
+    "INTENT_LOG_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "research", "intent_decisions.jsonl"),
+)
+# Below either threshold the input is ambiguous and goes to the LLM.
+MIN_SIMILARITY = float(os.getenv("INTENT_MIN_SIMILARITY", "0.45"))
+MIN_MARGIN = float(os.getenv("INTENT_MIN_MARGIN", "0.05"))
+
+
+@dataclass
+class IntentDecision:
+    """Outcome of routing one user input."""
+    intent: str
+    source: str  # "embedding" or "llm"
+    similarity: float
+    margin: float
+    scores: dict[str, float] = field(default_factory=dict)
+
+
+def _normalize(vector) -> list[float]:
+    values = [float(x) for x in vector]
+    norm = math.sqrt(sum(x * x for x in values)) or 1.0
+    return [x / norm for x in values]
+
+
+def _dot(a: list[float], b: list[float]) -> float:
+    return sum(x * y for x, y in zip(a, b, strict=True))
+
+
+def load_prototypes(path: str | None = DEFAULT_PROTOTYPES_PATH) -> dict[str, list[str]]:
+    """Prototype queries per intent: the defaults, plus those in the JSON file at `path`."""
+    prototypes = {intent: list(examples) for intent, examples in DEFAULT_PROTOTYPES.items()}
+    if path and os.path.exists(path):
+        with open(path) as f:
+            for intent, examples in json.load(f).items():
+                prototypes.setdefault(intent, []).extend(e for e in examples if e not in prototypes[intent])
+    return prototypes
+
+
+class IntentRouter:
+    """Nearest-prototype intent classifier with an LLM fallback for ambiguous input."""
+
+    def __init__(
+        self,
+        fallback: Callable[[str], str] | None = None,
+        prototypes: dict[str, list[str]] | None = None,
+        min_similarity: float = MIN_SIMILARITY,
+        min_margin: float = MIN_MARGIN,
+        log_path: str | None = DEFAULT_LOG_PATH,
+        model: TextEmbedding | None = None,
+    ):
+        self.fallback = fallback
+        self.prototypes = prototypes or load_prototypes()
+        self.min_similarity = min_similarity
+        self.min_margin = min_margin
+        self.log_path = log_path
+        self._model = model
+        self._vectors: dict[str, list[list[float]]] | None = None
+        self._lock = threading.Lock()
+
+    def _embed(self, texts: list[str]) -> list[list[float]]:
+        if self._model is None:
+            # Share the section embedding model when it is the same one.
+            if model_name == vectors.model_name:
+                self._model = vectors.get_model()
+            else:
+                self._model = TextEmbedding(model_name=model_name)
+        return [_normalize(vector) for vector in self._model.embed(texts)]
+
+    def _prototype_vectors(self) -> dict[str, list[list[float]]]:
+        # Embedded once, on first use, so importing the agent stays cheap.
+        with self._lock:
+            if self._vectors is None:
+                vectors = iter(self._embed([e for examples in self.prototypes.values() for e in examples]))
+                self._vectors = {
+                    intent: [next(vectors) for _ in examples] for intent, examples in self.prototypes.items()
+                }
+        return self._vectors
+
+    def scores(self, user_input: str) -> dict[str, float]:
+        """Highest cosine similarity between `user_input` and each intent's prototypes."""
+        query = self._embed([user_input])[0]
+        return {
+            intent: max(_dot(query, vector) for vector in vectors)
+            for intent, vectors in self._prototype_vectors().items()
+        }
+
+    def route(self, user_input: str) -> IntentDecision:
+        """Classify `user_input`, asking `fallback` when the prototypes are not decisive."""
+        scores = self.scores(user_input)
+        ranked = sorted(scores, key=scores.get, reverse=True)
+        best = ranked[0]
+        similarity = scores[best]
+        margin = similarity - scores[ranked[1]] if len(ranked) > 1 else similarity
+        decision = IntentDecision(best, "embedding", similarity, margin, scores)
+        if self.fallback is not None and (similarity < self.min_similarity or margin < self.min_margin):
+            decision.intent = self.fallback(user_input)
+            decision.source = "llm"
+        self._log(user_input, decision)
+        return decision
+
+    def _log(self, user_input: str, decision: IntentDecision) -> None:
+        if not self.log_path:
+            return
+        entry = {"time": time.time(), "input": user_input, **asdict(decision)}
+        try:
+            os.makedirs(os.path.dirname(self.log_path) or ".", exist_ok=True)
+            with self._lock, open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        except OSError as e:
+            logger.warning("Error logging intent decision: {}", e)
+
+
+def prototypes_from_log(log_path: str = DEFAULT_LOG_PATH) -> dict[str, list[str]]:
+    """Inputs the LLM fallback labelled with a known intent, grouped by intent."""
+    prototypes = {intent: [] for intent in INTENTS}
+    with open(log_path, encoding="utf-8") as f:
+        for line in f:
+            entry = json.loads(line)
+            if entry["source"] == "llm" and entry["intent"] in prototypes:
+                if entry["input"] not in prototypes[entry["intent"]]:
+                    prototypes[entry["intent"]].append(entry["input"])
+    return prototypes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Maintain the intent router prototypes.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    retrain = sub.add_parser("retrain", help="add LLM-labelled inputs from the decision log to a prototypes file")
+    retrain.add_argument("--log", default=DEFAULT_LOG_PATH)
+    retrain.add_argument("--output", default=DEFAULT_PROTOTYPES_PATH, required=DEFAULT_PROTOTYPES_PATH is None)
+    args = parser.parse_args()
+
+    existing = {}
+    if os.path.exists(args.output):
+        with open(args.output) as f:
+            existing = json.load(f)
+    added = 0
+    for intent, examples in prototypes_from_log(args.log).items():
+        current = existing.setdefault(intent, [])
+        new = [e for e in examples if e not in current]
+        current.extend(new)
+        added += len(new)
+    with open(args.output, "w") as f:
+        json.dump(existing, f, indent=2, ensure_ascii=False)
+    print(f"added {added} prototypes to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,110 @@
-from graph.traverse.operations import *
+import asyncio
+import re
 
-def get_paper(paper_id: str) -> str:
+from graph.traverse.async_operations import (
+    search_key_references,
+    search_paper,
+    search_paper_context,
+    search_paper_outline,
+    search_paper_sections,
+    search_section_at,
+    search_sections_fulltext,
+    search_sections_titled,
+)
+from graph.vectors import retrieve_sections
+
+# Longest section text handed to the model in one tool call.
+MAX_SECTION_CHARS = 8000
+
+# Ranked hits returned by one search_sections call.
+MAX_SEARCH_HITS = 8
+
+SECTION_PATH = re.compile(r'\d+(?:\.\d+)*')
+
+# New-style (2508.15144v2) and old-style (hep-th/9901001) arXiv ids.
+ARXIV_ID = re.compile(r'(?<![\w.])(\d{4}\.\d{4,5}|[a-z\-]+(?:\.[A-Z]{2})?/\d{7})(?:v\d+)?(?!\w|\.\d)')
+
+# The tools are coroutines on the async driver; dspy awaits them under `acall`.
+
+async def get_paper(paper_id: str) -> str:
     """Get the text of a paper from a paper id."""
-    paper = search_paper(paper_id)
+    paper = await search_paper(paper_id)
+    if paper is None:
+        return f'No paper {paper_id} in the graph.'
     return paper['p']['title'], paper['p']['abstract'], paper['p']['authors']
 
-def get_sections(paper_id: str) -> list[str]:
-    """Get the sections of a paper from a paper id."""
-    sections = search_sections_in_paper(paper_id)
-    return [section['s']['title'] for section in sections]
+def _outline_lines(outline: list) -> list[str]:
+    lines = []
+    for section in outline:
+        indent = '  ' * (section['depth'] - 1)
+        lines.append(f"{indent}{section['path']} {section['title']} ({section['chars']} chars)")
+        lines.extend(_outline_lines(section['children']))
+    return lines
+
+async def get_sections(paper_id: str) -> list[str]:
+    """Get the full outline of a paper from a paper id, one indented "path title (length)" entry per section and subsection (e.g. "  3.2 Training (4120 chars)")."""
+    outline = await search_paper_outline(paper_id)
+    if outline is not None:
+        return _outline_lines(outline)
+    # Papers ingested before outlines were stored.
+    sections = await search_paper_sections(paper_id, properties=('path', 'title'))
+    return [f"{section['path']} {section['title']}" for section in sections]
+
+async def _section_path(paper_id: str, section: str) -> str | None:
+    if SECTION_PATH.fullmatch(section.strip()):
+        return section.strip()
+    matches = await search_sections_titled(paper_id, section.strip(), properties=('path',))
+    return matches[0]['path'] if matches else None
+
+async def get_section(paper_id: str, section: str) -> str:
+    """Get the text of a section of a paper, given its path (e.g. "3.2") or its title."""
+    path = await _section_path(paper_id, section)
+    found = await search_section_at(paper_id, path, ('content',), MAX_SECTION_CHARS) if path else None
+    if found is None:
+        return f'No section "{section}" in paper {paper_id}.'
+    return found['content']
+
+async def get_subsections(paper_id: str, section: str) -> list[str]:
+    """Get the subsections of a section of a paper, given its path or title, as "path title" entries."""
+    path = await _section_path(paper_id, section)
+    if path is None:
+        return []
+    subsections = await search_paper_sections(
+        paper_id, properties=('path', 'title'), under=path, depth=path.count('.') + 2
+    )
+    return [f"{subsection['path']} {subsection['title']}" for subsection in subsections]
+
+async def search_sections(query: str, paper_id: str | None = None) -> list[str]:
+    """Search section titles and text for a query, optionally within one paper, best match first. Each entry is "paper_id path title (score): snippet" with matching words in **bold**; use get_section for the full text."""
+    hits = await search_sections_fulltext(query, paper_id or None, MAX_SEARCH_HITS)
+    return [f"{hit['paper_id']} {hit['path']} {hit['title']} ({hit['score']:.2f}): {hit['snippet']}" for hit in hits]
+
+async def find_related_sections(query: str, paper_id: str | None = None) -> list[dict]:
+    """Find the sections semantically closest to a query, optionally within one paper, best match first. Each hit has its score, the section (id, paper, path, title, text), its parent and neighbouring sections, and the formulas it uses."""
+    # Qdrant and the embedding model are synchronous; keep them off the event loop.
+    return await asyncio.to_thread(retrieve_sections, query, paper_id or None, limit=5)
+
+async def get_key_references(paper_id: str) -> list[str]:
+    """Get the most influential prior works a paper cites, most influential first, with how many ingested papers cite each."""
+    references = await search_key_references(paper_id, limit=10)
+    return [
+        f"{ref['title'] or ref['citation_key']} ({ref['arxiv_id'] or ref['doi'] or ref['citation_id']}): "
+        f"cited by {ref['cited_by_count'] or 0} papers, influence {ref['influence'] or 0:.2f}"
+        for ref in references
+    ]
 
-def get_section(title: str) -> str:
-    """Get the text of a section from a section id."""
-    section = search_section(title)
-    return section['s']['content']
+def paper_id_from(text: str) -> str | None:
+    """First arXiv id mentioned in `text`, without version suffix."""
+    match = ARXIV_ID.search(text)
+    return match.group(1) if match else None
 
-def get_subsections(title: str) -> list[str]:
-    """Get the subsections from a section"""
-    subsections = search_subsections(title)
-    return [subsection['subsection']['title'] for subsection in subsections]
\ No newline at end of file
+async def prefetch_paper(paper_id: str) -> dict | None:
+    """Fetch a paper's abstract, outline, introduction and conclusion in one graph query, None if it is not in the graph."""
+    paper = await search_paper_context(paper_id, MAX_SECTION_CHARS)
+    if paper is None:
+        return None
+    if paper['outline'] is not None:
+        paper['outline'] = _outline_lines(paper['outline'])
+    else:
+        paper['outline'] = await get_sections(paper_id)
+    return paper
@@ -0,0 +1,18 @@
+import os
+
+import pytest
+
+
+@pytest.fixture(scope="session")
+def neo4j_driver():
+    """The configured graph driver, for tests that need a live, disposable Neo4j.
+
+    Set NEO4J_INTEGRATION_TESTS=1 (plus NEO4J_URL/NEO4J_USER/NEO4J_PASSWORD)
+    to run them; they write and delete their own test papers.
+    """
+    if not os.getenv("NEO4J_INTEGRATION_TESTS"):
+        pytest.skip("set NEO4J_INTEGRATION_TESTS=1 to run tests against Neo4j")
+    from graph.config import driver
+
+    driver.verify_connectivity()
+    return driver
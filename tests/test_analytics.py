@@ -0,0 +1,22 @@
+from graph.analytics import co_citation_counts, pagerank
+
+
+def test_co_citation_counts_pairs_ordered_and_thresholded():
+    citing = {
+        "x": ["p1", "p2", "p3"],
+        "y": ["p1", "p2"],
+        "z": ["p3"],
+    }
+    assert list(co_citation_counts(citing, min_count=2)) == [(("x", "y"), 2)]
+    assert dict(co_citation_counts(citing, min_count=1)) == {("x", "y"): 2, ("x", "z"): 1}
+
+
+def test_co_citation_counts_ignores_repeated_papers():
+    citing = {"x": ["p1", "p1", "p2"], "y": ["p1", "p2", "p2"]}
+    assert dict(co_citation_counts(citing, min_count=1)) == {("x", "y"): 2}
+
+
+def test_pagerank_mean_is_one_and_cited_work_ranks_highest():
+    scores = pagerank({"a": ["c"], "b": ["c"], "c": []})
+    assert abs(sum(scores.values()) / len(scores) - 1.0) < 1e-6
+    assert max(scores, key=scores.get) == "c"
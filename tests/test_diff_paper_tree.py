@@ -0,0 +1,61 @@
+from graph.insert.cyphers import diff_paper_tree
+
+
+def _section(section_id, content_hash):
+    return {"section_id": section_id, "content_hash": content_hash}
+
+
+def test_unchanged_tree_writes_nothing():
+    stored = {"p_0": "h0", "p_1": "h1"}
+    diff = diff_paper_tree(
+        stored,
+        [_section("p_0", "h0"), _section("p_1", "h1")],
+        [{"parent": "p_0", "child": "p_1"}],
+        [{"left": "p_0", "right": "p_1"}],
+        [{"section_id": "p_0", "formula_id": "f"}],
+        [{"section_id": "p_1", "citation_id": "c"}],
+    )
+    assert diff == {
+        "stale": [], "removed": [], "sections": [], "children": [], "siblings": [],
+        "formulas": [], "citations": [],
+    }
+
+
+def test_changed_section_rewrites_its_rows_but_not_edges():
+    diff = diff_paper_tree(
+        {"p_0": "h0", "p_1": "h1"},
+        [_section("p_0", "h0"), _section("p_1", "new")],
+        [{"parent": "p_0", "child": "p_1"}],
+        [],
+        [{"section_id": "p_0", "formula_id": "f0"}, {"section_id": "p_1", "formula_id": "f1"}],
+        [{"section_id": "p_1", "citation_id": "c"}],
+    )
+    assert diff["stale"] == ["p_1"]
+    assert diff["removed"] == []
+    assert diff["sections"] == [_section("p_1", "new")]
+    assert diff["children"] == []
+    assert diff["formulas"] == [{"section_id": "p_1", "formula_id": "f1"}]
+    assert diff["citations"] == [{"section_id": "p_1", "citation_id": "c"}]
+
+
+def test_new_sections_get_edges_and_missing_ones_are_removed():
+    diff = diff_paper_tree(
+        {"p_0": "h0", "p_1": "h1", "p_2": "h2"},
+        [_section("p_0", "h0"), _section("p_3", "h3")],
+        [{"parent": "p_0", "child": "p_3"}],
+        [{"left": "p_0", "right": "p_3"}],
+    )
+    assert diff["removed"] == ["p_1", "p_2"]
+    assert diff["stale"] == ["p_1", "p_2"]
+    assert diff["sections"] == [_section("p_3", "h3")]
+    assert diff["children"] == [{"parent": "p_0", "child": "p_3"}]
+    assert diff["siblings"] == [{"left": "p_0", "right": "p_3"}]
+    assert diff["formulas"] == diff["citations"] == []
+
+
+def test_first_ingest_writes_everything():
+    sections = [_section("p_0", "h0"), _section("p_1", "h1")]
+    diff = diff_paper_tree({}, sections, [{"parent": "p_0", "child": "p_1"}], [])
+    assert diff["stale"] == []
+    assert diff["sections"] == sections
+    assert diff["children"] == [{"parent": "p_0", "child": "p_1"}]
@@ -0,0 +1,114 @@
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+import requests
+
+from arxiv import HTTPError as ArxivHTTPError
+
+from ingestion.arxiv.ledger import JobLedger, is_transient
+
+
+@pytest.fixture
+def ledger():
+    ledger = JobLedger(":memory:", max_attempts=3)
+    yield ledger
+    ledger.close()
+
+
+def _status(ledger):
+    return ledger.summary()["by_status"]
+
+
+def _http_error(status):
+    response = requests.Response()
+    response.status_code = status
+    return requests.HTTPError(f"{status} error", response=response)
+
+
+def test_add_ignores_known_papers(ledger):
+    assert ledger.add(["a", "b"]) == 2
+    assert ledger.add(["b", "c"]) == 1
+    assert ledger.runnable() == ["a", "b", "c"]
+
+
+def test_paper_is_done_after_its_last_stage(ledger):
+    ledger.add(["a"])
+    ledger.start("a", "download")
+    assert _status(ledger) == {"running": 1}
+    ledger.complete("a", "download")
+    ledger.complete("a", "parse")
+    assert _status(ledger) == {"running": 1}
+    ledger.complete("a", "write")
+    assert _status(ledger) == {"done": 1}
+    assert ledger.runnable() == []
+
+
+def test_last_stage_can_be_embed(ledger):
+    ledger.add(["a"])
+    ledger.complete("a", "write", last_stage="embed")
+    assert _status(ledger) == {"running": 1}
+    ledger.complete("a", "embed", last_stage="embed")
+    assert _status(ledger) == {"done": 1}
+
+
+def test_transient_failure_is_retried_after_backoff(ledger):
+    ledger.add(["a"])
+    assert ledger.fail("a", "download", ConnectionError("reset")) == "retry"
+    assert ledger.runnable(now=0) == []
+    wait = ledger.next_retry_in()
+    assert wait is not None
+    assert "a" in ledger.runnable(now=1e12)
+
+
+def test_permanent_failure_is_not_retried(ledger):
+    ledger.add(["a"])
+    assert ledger.fail("a", "parse", ValueError("bad source")) == "failed"
+    assert ledger.runnable(now=1e12) == []
+    assert ledger.next_retry_in() is None
+    assert ledger.summary()["failing_stage"] == {"parse": 1}
+
+
+def test_transient_failures_give_up_after_max_attempts(ledger):
+    ledger.add(["a"])
+    assert [ledger.fail("a", "write", TimeoutError()) for _ in range(3)] == ["retry", "retry", "failed"]
+    assert ledger.summary()["failed_attempts"] == 3
+
+
+def test_requeue_resets_failed_papers(ledger):
+    ledger.add(["a", "b"])
+    ledger.fail("a", "parse", ValueError())
+    assert ledger.requeue() == 1
+    assert ledger.runnable() == ["a", "b"]
+    assert ledger.fail("a", "parse", TimeoutError()) == "retry"
+
+
+def test_recover_returns_running_papers_to_pending(ledger):
+    ledger.add(["a", "b"])
+    ledger.start("a", "parse")
+    assert ledger.runnable() == ["b"]
+    assert ledger.recover() == 1
+    assert ledger.runnable() == ["a", "b"]
+
+
+@pytest.mark.parametrize("error, transient", [
+    (_http_error(404), False),
+    (_http_error(403), False),
+    (_http_error(429), True),
+    (_http_error(503), True),
+    (ArxivHTTPError("https://export.arxiv.org", 0, 400), False),
+    (ArxivHTTPError("https://export.arxiv.org", 0, 500), True),
+    (BrokenProcessPool(), True),
+    (KeyError("x"), False),
+])
+def test_is_transient(error, transient):
+    assert is_transient(error) is transient
+
+
+def test_is_transient_follows_the_cause_chain():
+    try:
+        try:
+            raise ConnectionError("reset")
+        except ConnectionError as e:
+            raise RuntimeError("download failed") from e
+    except RuntimeError as e:
+        assert is_transient(e)
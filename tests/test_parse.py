@@ -0,0 +1,90 @@
+from ingestion.arxiv.citations import canonical_citation_id, parse_bibliography
+from ingestion.arxiv.formulas import extract_formulas, normalize_formula
+from ingestion.arxiv.parse import parse_texts
+from ingestion.arxiv.scanner import scan_latex
+
+TEX = r"""
+\title{A \emph{Small}\thanks{Draft.} Paper}
+\author{Ada Lovelace \and Alan Turing}
+\begin{document}
+\begin{abstract}
+Short abstract.
+\end{abstract}
+\section{Introduction}
+Intro text \cite{knuth}.
+\subsection{Background}
+We use $a + b = c$ and \begin{equation}\label{eq:1} a+b=c \end{equation}.
+\subsubsection{Detail}
+Detail text \citep{arx}.
+\section{Results}
+Results text.
+\end{document}
+"""
+
+BIB = r"""
+@book{knuth,
+  title = {The Art of Computer Programming},
+  author = {Knuth, Donald},
+}
+@article{arx,
+  title = {Attention Is All You Need},
+  eprint = {1706.03762v5},
+}
+"""
+
+
+def test_sections_nest_by_level():
+    paper = parse_texts([TEX], [BIB])
+    assert paper["title"] == "A Small Paper"
+    assert paper["abstract"] == "Short abstract."
+    assert [s["title"] for s in paper["sections"]] == ["Introduction", "Results"]
+    intro = paper["sections"][0]
+    background = intro["subsections"][0]
+    assert background.title == "Background"
+    assert [s.title for s in background.subsections] == ["Detail"]
+    assert intro.intro.endswith(r"Intro text \cite{knuth}.")
+    assert "Detail text" in intro.full_body
+    assert intro.all_citations() == ["knuth", "arx"]
+    assert paper["all_citations"] == ["arx", "knuth"]
+
+
+def test_section_behaves_like_a_dict():
+    section = parse_texts([TEX], [])["sections"][1]
+    assert section
+    assert "intro" in section and "missing" not in section
+    assert section.get("missing", "default") == "default"
+    assert section["subsections"] == []
+    assert section.to_dict()["full_body"].endswith("Results text.")
+
+
+def test_equivalent_formulas_share_one_id():
+    paper = parse_texts([TEX], [])
+    assert [f.latex for f in paper["formulas"]] == ["a+b=c"]
+    background = paper["sections"][0].subsections[0]
+    assert [f.formula_id for f in background.formulas] == [paper["formulas"][0].formula_id]
+
+
+def test_normalize_formula_drops_labels_spacing_and_alignment():
+    assert normalize_formula(r"\left( x \right) &= y \, , \label{eq}\\") == "(x)=y"
+    assert normalize_formula(r"a \cdot b") == r"a\cdot b"
+
+
+def test_trivial_formulas_are_skipped():
+    text = "$x$ and $i$ and $x^2$"
+    assert [f.latex for f in extract_formulas(text, scan_latex(text).math)] == ["x^2"]
+
+
+def test_canonical_citation_ids_prefer_arxiv_then_doi_then_title():
+    bbl = r"""
+\begin{thebibliography}{9}
+\bibitem{doi} A. Author. \newblock A Title. \newblock doi:10.1000/XYZ.1.
+\bibitem[Smith(2020)]{plain} B. Smith. \newblock Some Title. \newblock Journal, 2020.
+\end{thebibliography}
+"""
+    entries = parse_bibliography([BIB, bbl])
+    assert canonical_citation_id(entries["arx"]) == "arxiv:1706.03762"
+    assert canonical_citation_id(entries["doi"]) == "doi:10.1000/xyz.1"
+    assert entries["plain"].title == "Some Title."
+    plain = canonical_citation_id(entries["plain"])
+    assert plain.startswith("title:") and len(plain) == len("title:") + 24
+    assert canonical_citation_id(entries["knuth"]) != plain
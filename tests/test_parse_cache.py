@@ -0,0 +1,57 @@
+from ingestion.arxiv import parse_cache
+from ingestion.arxiv.parse import parse_texts, serialize_paper
+from ingestion.arxiv.parse_cache import ParseCache
+
+TEX = r"""
+\title{Cached}
+\begin{document}
+\section{Intro}
+We cite \cite{a} and write $E = mc^2$.
+\subsection{More}
+Details.
+\end{document}
+"""
+
+
+def test_parsed_paper_round_trips(tmp_path):
+    cache = ParseCache(str(tmp_path))
+    paper = parse_texts([TEX], [])
+    key = ParseCache.key("1", [TEX], [])
+    assert cache.get(key) is None
+    cache.put(key, paper)
+
+    cached = cache.get(key)
+    assert serialize_paper(cached) == serialize_paper(paper)
+    section = cached["sections"][0]
+    assert section.subsections[0].source is section.source
+    assert (cache.stats.hits, cache.stats.misses, cache.stats.writes) == (1, 1, 1)
+
+
+def test_key_depends_on_version_and_every_input():
+    key = ParseCache.key("1", ["a"], ["b"])
+    assert key == ParseCache.key("1", ["a"], ["b"])
+    assert key != ParseCache.key("2", ["a"], ["b"])
+    assert key != ParseCache.key("1", ["a", ""], ["b"])
+    assert key != ParseCache.key("1", ["ab"], [])
+    assert key != ParseCache.key("1", [], ["a", "b"])
+
+
+def test_corrupt_entry_is_a_miss_and_removed(tmp_path):
+    cache = ParseCache(str(tmp_path))
+    key = ParseCache.key("1", [TEX], [])
+    cache.put(key, {"title": "x"})
+    path = cache._path(key)
+    path.write_bytes(b"not a pickle")
+    assert cache.get(key) is None
+    assert not path.exists()
+    assert cache.stats.misses == 1
+
+
+def test_sweeps_every_evict_every_writes(tmp_path, monkeypatch):
+    monkeypatch.setattr(parse_cache, "EVICT_EVERY", 3)
+    cache = ParseCache(str(tmp_path), max_bytes=0)
+    for i in range(2):
+        cache.put(ParseCache.key("1", [str(i)], []), {"n": i})
+    assert cache.stats.evictions == 0
+    cache.put(ParseCache.key("1", ["2"], []), {"n": 2})
+    assert cache.stats.evictions == 3
@@ -0,0 +1,62 @@
+"""Refreshing a paper after citation analytics has linked its citations."""
+import pytest
+
+from graph.insert import cyphers
+from graph.schema import _CapturingTx
+from ingestion.arxiv.parse import parse_texts
+from ingestion.arxiv.pipeline import paper_tree
+
+PAPERS = ("9999.00001", "9999.00002")
+WORKS = {"x": "9999.90001", "y": "9999.90002"}
+
+
+def _tree(paper_id: str, keys: list[str]) -> dict:
+    tex = (
+        "\\title{Test}\\begin{document}"
+        f"\\section{{Intro}} See \\cite{{{','.join(keys)}}}.\\end{{document}}"
+    )
+    bib = "".join(f"@article{{{key}, title={{Work {key}}}, eprint={{{WORKS[key]}}}}}" for key in keys)
+    return paper_tree(paper_id, parse_texts([tex], [bib]))
+
+
+def _cleanup(driver) -> None:
+    driver.execute_query(
+        "MATCH (n) WHERE n.arxiv_id IN $papers OR n.paper_id IN $papers OR n.citation_id IN $works "
+        "DETACH DELETE n",
+        papers=list(PAPERS), works=[f"arxiv:{work}" for work in WORKS.values()],
+    )
+
+
+def test_orphan_citations_are_detached():
+    tx = _CapturingTx()
+    cyphers.delete_orphan_citations(tx, ["arxiv:9999.90001"])
+    (query, _), = tx.queries
+    assert "DETACH DELETE c" in query
+
+
+@pytest.fixture
+def papers(neo4j_driver):
+    _cleanup(neo4j_driver)
+    yield neo4j_driver
+    _cleanup(neo4j_driver)
+
+
+def test_refresh_drops_co_cited_citation(papers):
+    from graph.analytics import run_citation_analytics
+    from graph.insert.operations import insert_paper_trees, update_paper_trees
+
+    insert_paper_trees([_tree(paper_id, ["x", "y"]) for paper_id in PAPERS])
+    run_citation_analytics(papers, full=True)
+    records, _, _ = papers.execute_query(
+        "MATCH (:CITATION {citation_id: $x})-[r:CO_CITED]-(:CITATION {citation_id: $y}) RETURN r.count AS count",
+        x=f"arxiv:{WORKS['x']}", y=f"arxiv:{WORKS['y']}",
+    )
+    assert [r["count"] for r in records] == [2]
+
+    # Both papers drop x, which leaves it with CO_CITED edges only.
+    update_paper_trees([_tree(paper_id, ["y"]) for paper_id in PAPERS])
+
+    records, _, _ = papers.execute_query(
+        "MATCH (c:CITATION {citation_id: $x}) RETURN c", x=f"arxiv:{WORKS['x']}"
+    )
+    assert records == []
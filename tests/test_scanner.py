@@ -0,0 +1,80 @@
+import pytest
+
+from ingestion.arxiv.scanner import GroupReader, read_group, scan_latex, skip_optional
+
+
+def test_title_with_nested_braces_is_captured_whole():
+    scan = scan_latex(r"\title{A {Nested} \emph{Title}} \author{Ada}")
+    assert scan.slice(scan.title) == r"A {Nested} \emph{Title}"
+    assert scan.slice(scan.authors) == "Ada"
+
+
+def test_headings_keep_level_star_and_skip_optional_title():
+    scan = scan_latex(r"\section[Short]{Intro} x \subsection*{Setup} y \subsubsection{Detail}")
+    assert [(h.level, h.starred, scan.text[h.title_start:h.title_end]) for h in scan.headings] == [
+        (1, False, "Intro"),
+        (2, True, "Setup"),
+        (3, False, "Detail"),
+    ]
+
+
+def test_citations_with_optional_arguments_and_spaced_keys():
+    scan = scan_latex(r"see \citep[p.~3][{see} also]{a, b ,c} and \cite{d}")
+    assert [(c.command, c.keys) for c in scan.citations] == [("citep", ["a", "b", "c"]), ("cite", ["d"])]
+
+
+def test_math_kinds_and_escaped_dollar():
+    text = r"cost \$5 and $x+y$ then $$a=b$$ \(c\) \[d\] \begin{align}e&=f\end{align}"
+    scan = scan_latex(text)
+    assert [(m.kind, text[m.content_start:m.content_end]) for m in scan.math] == [
+        ("inline", "x+y"),
+        ("display", "a=b"),
+        ("inline", "c"),
+        ("display", "d"),
+        ("align", "e&=f"),
+    ]
+
+
+def test_comments_and_verbatim_are_skipped():
+    text = "% \\section{Commented}\n\\begin{verbatim}\\section{Code} $x$\\end{verbatim}\n\\section{Real}"
+    scan = scan_latex(text)
+    assert [scan.text[h.title_start:h.title_end] for h in scan.headings] == ["Real"]
+    assert scan.math == []
+
+
+def test_scan_stops_at_end_of_document():
+    scan = scan_latex("\\section{A}\n\\end{document}\n\\section{B}")
+    assert len(scan.headings) == 1
+    assert scan.end == scan.text.index("\\end{document}")
+
+
+def test_math_does_not_cross_a_paragraph_break():
+    scan = scan_latex("an unpaired $ sign\n\nand later $x$ here")
+    assert [scan.text[m.content_start:m.content_end] for m in scan.math] == ["x"]
+
+
+@pytest.mark.parametrize("text", [
+    "x \\(" * 2000,
+    "x \\[" * 2000,
+    "\\cite{" * 2000,
+    "\\cite[" * 2000,
+    "\\begin{equation} " * 2000,
+], ids=["inline", "display", "group", "optional", "environment"])
+def test_unterminated_openers_record_nothing(text):
+    scan = scan_latex(text)
+    assert scan.math == []
+    assert scan.citations == []
+
+
+@pytest.mark.parametrize("text", [
+    "{a}{b {c}} [x] {",
+    "[a [b] {c]} ] {d}",
+    "{ \\{ } [ \\] ] { [ } ]",
+    "{{{{ } [[ ] {z}",
+    "  [opt]  {arg} trailing",
+])
+def test_group_reader_matches_read_group_and_skip_optional(text):
+    groups = GroupReader(text)
+    for pos in range(len(text) + 1):
+        assert groups.read(pos) == read_group(text, pos)
+        assert groups.skip_optional(pos) == skip_optional(text, pos)
@@ -9,9 +9,10 @@ memory = RawMemory()
 async def chat_interaction(user_input: str, user_id: str, session_id: str) -> str:
     context = await memory.retrieve(user_input, user_id)
 
-    agent = workflow(user_input=user_input)
+    agent = await workflow(user_input=user_input)
     
-    response = agent(user_input=user_input, context=context)
+    # acall awaits the LLM calls instead of blocking the event loop on them.
+    response = await agent.acall(user_input=user_input, context=context)
 
     await memory.save(user_id, user_input, response.response)
 